@@ -0,0 +1,400 @@
+"""Local stand-ins for a Roku TV and the ESP32 blaster used by the benchmarks."""
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROKU_DEVICE_INFO = """<?xml version="1.0" encoding="UTF-8" ?>
+<device-info>
+    <udn>28001240-0000-1000-8000-000000000001</udn>
+    <serial-number>BENCH0000001</serial-number>
+    <vendor-name>TCL</vendor-name>
+    <model-name>55S425</model-name>
+    <wifi-mac>02:00:00:00:00:01</wifi-mac>
+    <user-device-name>Bench TV</user-device-name>
+    <power-mode>PowerOn</power-mode>
+</device-info>"""
+
+ROKU_APPS = """<?xml version="1.0" encoding="UTF-8" ?>
+<apps>
+    <app id="tvinput.hdmi1" type="tvin" version="1.0.0">HDMI 1</app>
+    <app id="12" type="appl" version="5.1.120">Netflix</app>
+    <app id="837" type="appl" version="2.21.100">YouTube</app>
+    <app id="13" type="appl" version="14.1.2">Prime Video</app>
+</apps>"""
+
+# Smallest valid PNG (1x1 transparent pixel) served as every app icon
+ICON_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082")
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    # Keep-alive like a real TV so pooled connections are exercised
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, body=b"", content_type="text/plain"):
+        time.sleep(self.server.latency_ms / 1000.0)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _route(self, method):
+        self.server.requests.append((method, self.path))
+        routes = self.server.routes
+        for prefix, handler in routes:
+            if self.path.startswith(prefix):
+                status, body, content_type = handler(self)
+                return self._reply(status, body, content_type)
+        self._reply(404, b"not found")
+
+    def do_GET(self):
+        self.body = b""
+        self._route("GET")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        self._route("POST")
+
+    def log_message(self, *args):
+        pass
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, routes, latency_ms=0.0, host="127.0.0.1"):
+        super().__init__((host, port), _MockHandler)
+        self.routes = routes
+        self.latency_ms = latency_ms
+        self.requests = []
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class MockEcpServer(MockHTTPServer):
+    """Roku ECP emulator: device-info, apps, icons, keypress/keydown/keyup and launch."""
+
+    def __init__(self, port=8060, latency_ms=0.0, host="127.0.0.1"):
+        ok = lambda h: (200, b"", "text/plain")
+        routes = [
+            ("/query/device-info", lambda h: (200, ROKU_DEVICE_INFO.encode(), "text/xml")),
+            ("/query/apps", lambda h: (200, ROKU_APPS.encode(), "text/xml")),
+            ("/query/icon/", lambda h: (200, ICON_PNG, "image/png")),
+            ("/keypress/", ok),
+            ("/keydown/", ok),
+            ("/keyup/", ok),
+            ("/launch/", ok),
+        ]
+        super().__init__(port, routes, latency_ms, host)
+
+
+class MockBlasterServer(MockHTTPServer):
+    """ESP32 emulator answering /ping, /ir and the code slot cache like the firmware.
+
+    With udp_port set (0 picks a free port) it also runs the binary UDP
+    command channel and advertises it in /caps. drop_udp frames are
+    silently dropped first, to exercise retransmits.
+    """
+
+    def __init__(self, port=8080, latency_ms=0.0, host="127.0.0.1", udp_port=None, drop_udp=0):
+        self.slots = {}
+        self.signature = ""
+        self.sent = []
+        self.udp_frames = 0
+        self.drop_udp = drop_udp
+        self._udp = None
+        if udp_port is not None:
+            self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp.bind((host, udp_port))
+            self._udp.settimeout(0.2)
+        routes = [
+            ("/ping", lambda h: (200, b"pong", "text/plain")),
+            ("/caps", self._caps),
+            ("/ir/store", self._store),
+            ("/ir/sig", self._sig),
+            ("/ir/batch", self._batch),
+            ("/ir", self._ir),
+        ]
+        super().__init__(port, routes, latency_ms, host)
+
+    @property
+    def udp_port(self):
+        return self._udp.getsockname()[1] if self._udp else None
+
+    def start(self):
+        if self._udp:
+            threading.Thread(target=self._serve_udp, daemon=True).start()
+        return super().start()
+
+    def stop(self):
+        super().stop()
+        if self._udp:
+            self._udp.close()
+            self._udp = None
+
+    def _caps(self, handler):
+        if not self._udp:
+            return 404, b"Not found", "text/plain"
+        return 200, f"udp={self.udp_port} slots=64 batch=1".encode(), "text/plain"
+
+    def _serve_udp(self):
+        last_seq, last_status = None, 0
+        sock = self._udp
+        while self._udp is sock:
+            try:
+                data, addr = sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if len(data) != 7 or data[:3] != b"IR\x01":
+                continue
+            self.udp_frames += 1
+            if self.drop_udp > 0:
+                self.drop_udp -= 1
+                continue
+            seq, slot, repeat = struct.unpack("<HBB", data[3:])
+            if seq != last_seq:
+                code = self.slots.get(slot)
+                last_seq, last_status = seq, 0 if code is not None else 1
+                if code is not None:
+                    self.sent.extend([code] * max(1, repeat))
+            sock.sendto(struct.pack("<2sHB", b"IA", seq, last_status), addr)
+
+    @staticmethod
+    def _args(handler):
+        return {k: v[0] for k, v in parse_qs(urlsplit(handler.path).query).items()}
+
+    def _store(self, handler):
+        args = self._args(handler)
+        self.slots[int(args["slot"])] = args["code"]
+        return 200, b"Stored", "text/plain"
+
+    def _sig(self, handler):
+        args = self._args(handler)
+        if "set" in args:
+            self.signature = args["set"]
+        return 200, self.signature.encode(), "text/plain"
+
+    def _batch(self, handler):
+        args = self._args(handler)
+        gap = int(args.get("gap", 100)) / 1000.0
+        items = []
+        for line in handler.body.decode().splitlines():
+            count, _, ref = line.strip().partition(" ")
+            code = self.slots.get(int(ref[1:])) if ref.startswith("#") else ref
+            if code is None:
+                return 404, b"Empty slot", "text/plain"
+            items.append((int(count), code))
+        sent = 0
+        for count, code in items:
+            for _ in range(count):
+                if sent:
+                    time.sleep(gap)
+                self.sent.append(code)
+                sent += 1
+        return 200, f"Sent {sent}".encode(), "text/plain"
+
+    def _ir(self, handler):
+        args = self._args(handler)
+        if "slot" in args:
+            code = self.slots.get(int(args["slot"]))
+            if code is None:
+                return 404, b"Empty slot", "text/plain"
+        else:
+            code = args.get("code")
+        self.sent.append(code)
+        return 200, b"Sent", "text/plain"
+
+
+class MockSSDPResponder:
+    """Answers M-SEARCH on loopback multicast as a Roku would.
+
+    reply_ip (e.g. "127.0.0.2") sends the answer from another loopback
+    address, so several responders look like several TVs.
+    """
+
+    SSDP_ADDR = "239.255.255.250"
+
+    def __init__(self, port=1901, ecp_port=8060, latency_ms=0.0, interface_ip="127.0.0.1", reply_ip=None):
+        self.port = port
+        self.ecp_port = ecp_port
+        self.latency_ms = latency_ms
+        self.interface_ip = interface_ip
+        self.reply_ip = reply_ip
+        self._sock = None
+        self._reply = None
+        self._running = False
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("", self.port))
+        mreq = struct.pack("4s4s", socket.inet_aton(self.SSDP_ADDR), socket.inet_aton(self.interface_ip))
+        self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        self._sock.settimeout(0.2)
+        if self.reply_ip:
+            self._reply = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._reply.bind((self.reply_ip, 0))
+        self._running = True
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def _serve(self):
+        answered = set()
+        while self._running:
+            try:
+                data, addr = self._sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data.startswith(b"M-SEARCH") or addr in answered:
+                continue
+            answered.add(addr)
+            time.sleep(self.latency_ms / 1000.0)
+            response = (
+                "HTTP/1.1 200 OK\r\n"
+                "Cache-Control: max-age=3600\r\n"
+                "ST: roku:ecp\r\n"
+                f"LOCATION: http://{self.reply_ip or self.interface_ip}:{self.ecp_port}/\r\n"
+                "USN: uuid:roku:ecp:BENCH0000001\r\n"
+                "Server: Roku/12.0.0 UPnP/1.0 Roku/12.0.0\r\n"
+                "\r\n"
+            ).encode()
+            (self._reply or self._sock).sendto(response, addr)
+
+    def stop(self):
+        self._running = False
+        if self._sock:
+            self._sock.close()
+        if self._reply:
+            self._reply.close()
+
+
+class MockAndroidTVServer:
+    """Plain TCP stand-in for an Android TV's remote (6466) or pairing (6467) port.
+
+    The remote side runs the configure / set-active handshake, pings the
+    client once and records injected keys and app links. The pairing side
+    acks each pairing step with status 200.
+    """
+
+    def __init__(self, port=0, pairing=False, host="127.0.0.1"):
+        self.pairing = pairing
+        self.keys = []          # (key_code, direction)
+        self.links = []
+        self.pongs = []
+        self.messages = []      # Every decoded client message
+        self.connections = 0
+        self._clients = []
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(4)
+        self._running = False
+
+    @property
+    def port(self):
+        return self._sock.getsockname()[1]
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._sock.close()
+        self.drop_clients()
+
+    def drop_clients(self):
+        """Hang up on every client, like a TV going to sleep."""
+        for client in self._clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+                client.close()
+            except OSError:
+                pass
+        self._clients = []
+
+    def _accept(self):
+        while self._running:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                break
+            self.connections += 1
+            self._clients.append(client)
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        from controllers import androidtv_proto as proto
+
+        reader = proto.FrameReader()
+        send = lambda message: client.sendall(proto.frame(message))
+        try:
+            if not self.pairing:
+                info = proto.field_bytes(1, "BRAVIA 4K") + proto.field_bytes(2, "Sony")
+                send(proto.field_bytes(proto.REMOTE_CONFIGURE,
+                                       proto.field_varint(1, 639) + proto.field_bytes(2, info)))
+            while self._running:
+                data = client.recv(4096)
+                if not data:
+                    break
+                for message in reader.feed(data):
+                    fields = proto.parse_message(message)
+                    self.messages.append(fields)
+                    for reply in self._replies(proto, fields):
+                        send(reply)
+        except OSError:
+            pass
+        finally:
+            client.close()
+
+    def _replies(self, proto, fields):
+        if self.pairing:
+            for step, ack in ((proto.PAIRING_REQUEST, proto.PAIRING_REQUEST_ACK),
+                              (proto.PAIRING_OPTIONS, proto.PAIRING_OPTIONS),
+                              (proto.PAIRING_CONFIGURATION, proto.PAIRING_CONFIGURATION_ACK),
+                              (proto.PAIRING_SECRET, proto.PAIRING_SECRET_ACK)):
+                if step in fields:
+                    return [proto.field_varint(1, 2) + proto.field_varint(2, proto.STATUS_OK) +
+                            proto.field_bytes(ack, b"")]
+            return []
+        nested = lambda number: proto.parse_message(proto.first(fields, number))
+        if proto.REMOTE_CONFIGURE in fields:
+            return [proto.field_bytes(proto.REMOTE_SET_ACTIVE, b"")]
+        if proto.REMOTE_SET_ACTIVE in fields:
+            return [proto.field_bytes(proto.REMOTE_START, proto.field_varint(1, 1)),
+                    proto.field_bytes(proto.REMOTE_PING_REQUEST, proto.field_varint(1, 42))]
+        if proto.REMOTE_PING_RESPONSE in fields:
+            self.pongs.append(proto.first(nested(proto.REMOTE_PING_RESPONSE), 1))
+        elif proto.REMOTE_KEY_INJECT in fields:
+            inject = nested(proto.REMOTE_KEY_INJECT)
+            self.keys.append((proto.first(inject, 1), proto.first(inject, 2)))
+        elif proto.REMOTE_APP_LINK in fields:
+            self.links.append(proto.first(nested(proto.REMOTE_APP_LINK), 1).decode())
+        return []
@@ -0,0 +1,230 @@
+"""Hot-path benchmarks against local mock servers.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output bench_results.json
+
+Measures key-press round trips (p50/p99), discovery time-to-first-device
+and time-to-complete, and peak thread count / RSS, and writes everything
+as JSON so runs can be compared for regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import threading
+import time
+
+from benchmarks.mock_servers import MockBlasterServer, MockEcpServer, MockSSDPResponder
+from controllers.ir_controller import IRController
+from controllers.roku_controller import RokuController
+from discovery.esp32_discovery import ESP32Discovery
+from discovery.ssdp_discovery import SSDPDiscovery
+from services.http_pool import HttpTransport
+
+
+class ResourceSampler:
+    """Samples thread count and RSS in the background while benchmarks run."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss_kb = _current_rss_kb()
+        self._running = False
+
+    def __enter__(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._running = False
+        self._thread.join()
+
+    def _run(self):
+        while self._running:
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss_kb = max(self.peak_rss_kb, _current_rss_kb())
+            time.sleep(self.interval)
+
+    def as_dict(self):
+        return {'peak_threads': self.peak_threads, 'peak_rss_kb': self.peak_rss_kb}
+
+
+def _current_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # Fallback: peak RSS (KB on Linux, bytes on macOS)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _latency_summary(samples_ms):
+    return {
+        'count': len(samples_ms),
+        'p50_ms': round(_percentile(samples_ms, 50), 3),
+        'p99_ms': round(_percentile(samples_ms, 99), 3),
+        'mean_ms': round(statistics.mean(samples_ms), 3),
+        'max_ms': round(max(samples_ms), 3),
+    }
+
+
+def _time_presses(send, keys, presses):
+    samples = []
+    for i in range(presses):
+        start = time.perf_counter()
+        send(keys[i % len(keys)])
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return _latency_summary(samples)
+
+
+def bench_keypress(ecp, blaster, presses):
+    keys = ["up", "down", "left", "right", "select"]
+    results = {}
+
+    roku = RokuController("127.0.0.1", port=ecp.port, transport=HttpTransport())
+    roku.connect()
+    results['ecp_keypress_pooled'] = _time_presses(roku.send_key, keys, presses)
+    # A 20 character search typed as Lit_ keys on the same connection
+    results['ecp_text_20_chars'] = _time_presses(roku.send_text, ["stranger things 2016"], max(1, presses // 20))
+
+    def unpooled(key):
+        # A fresh transport per press reproduces the old connect-per-key behaviour
+        transport = HttpTransport()
+        RokuController("127.0.0.1", port=ecp.port, transport=transport).send_key(key)
+        transport.close()
+    results['ecp_keypress_unpooled'] = _time_presses(unpooled, keys, presses)
+
+    ir = IRController(f"127.0.0.1:{blaster.port}", transport=HttpTransport())
+    results['ir_keypress_pooled'] = _time_presses(ir.send_key, keys, presses)
+    return results
+
+
+def bench_ir_sequence(blaster, runs):
+    # A ten step volume ramp, one request per press vs one batched request
+    ramp = ["vol_up"] * 10
+    ir = IRController(f"127.0.0.1:{blaster.port}", transport=HttpTransport())
+    ir.connect()
+
+    def per_key(keys):
+        for key in keys:
+            ir.send_key(key)
+    return {
+        'ir_ramp_per_key': _time_presses(per_key, [ramp], runs),
+        'ir_ramp_batched': _time_presses(lambda keys: ir.send_batch(keys, gap_ms=0), [ramp], runs),
+    }
+
+
+def bench_ir_udp(presses, latency_ms):
+    # Slot presses over the acked UDP channel vs the same slots over HTTP
+    keys = ["up", "down", "left", "right", "select"]
+    blaster = MockBlasterServer(port=0, latency_ms=latency_ms, udp_port=0).start()
+    transport = HttpTransport()
+    try:
+        ir = IRController(f"127.0.0.1:{blaster.port}", transport=transport)
+        ir.connect()
+        results = {'ir_keypress_udp': _time_presses(ir.send_key, keys, presses)}
+        ir._drop_udp()
+        results['ir_keypress_slot_http'] = _time_presses(ir.send_key, keys, presses)
+        return results
+    finally:
+        transport.close()
+        blaster.stop()
+
+
+def bench_ssdp(ssdp_port, timeout):
+    start = time.perf_counter()
+    first = []
+
+    def on_device(dev):
+        if not first:
+            first.append((time.perf_counter() - start) * 1000.0)
+
+    devices = SSDPDiscovery(ssdp_port=ssdp_port, interface_ip="127.0.0.1").discover(
+        timeout=timeout, on_device=on_device)
+    return {
+        'devices': len(devices),
+        'time_to_first_device_ms': round(first[0], 3) if first else None,
+        'time_to_complete_ms': round((time.perf_counter() - start) * 1000.0, 3),
+    }
+
+
+def bench_esp32(blaster, host_count):
+    # One real blaster among host_count loopback addresses that refuse connections
+    hosts = [f"127.0.0.{i}" for i in range(1, host_count + 1)]
+    start = time.perf_counter()
+    first = []
+
+    def on_device(dev):
+        if not first:
+            first.append((time.perf_counter() - start) * 1000.0)
+
+    devices = ESP32Discovery(port=blaster.port).discover(on_device=on_device, hosts=hosts)
+    return {
+        'hosts': host_count,
+        'devices': len(devices),
+        'time_to_first_device_ms': round(first[0], 3) if first else None,
+        'time_to_complete_ms': round((time.perf_counter() - start) * 1000.0, 3),
+    }
+
+
+def run(args):
+    ecp = MockEcpServer(port=args.ecp_port, latency_ms=args.latency_ms).start()
+    blaster = MockBlasterServer(port=args.blaster_port, latency_ms=args.latency_ms).start()
+    ssdp = MockSSDPResponder(port=args.ssdp_port, ecp_port=ecp.port, latency_ms=args.latency_ms).start()
+
+    report = {
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': vars(args),
+    }
+    try:
+        with ResourceSampler() as sampler:
+            report['keypress'] = bench_keypress(ecp, blaster, args.presses)
+            report['ir_sequence'] = bench_ir_sequence(blaster, max(1, args.presses // 10))
+            report['ir_udp'] = bench_ir_udp(args.presses, args.latency_ms)
+            report['ssdp_discovery'] = bench_ssdp(args.ssdp_port, args.ssdp_timeout)
+            report['esp32_discovery'] = bench_esp32(blaster, args.scan_hosts)
+        report['resources'] = sampler.as_dict()
+    finally:
+        ssdp.stop()
+        blaster.stop()
+        ecp.stop()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartRemote hot-path benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--presses", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected server latency")
+    parser.add_argument("--ecp-port", type=int, default=8060)
+    parser.add_argument("--blaster-port", type=int, default=8080)
+    parser.add_argument("--ssdp-port", type=int, default=1901)
+    parser.add_argument("--ssdp-timeout", type=float, default=1.0)
+    parser.add_argument("--scan-hosts", type=int, default=254)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Results written to {os.path.abspath(args.output)}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,7 @@ package.domain = com.ahab.projectremote
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,atlas,txt,md
+source.include_exts = py,png,jpg,kv,atlas,txt,md,bin
 
 # (str) Application version
 version = 0.1
@@ -0,0 +1,389 @@
+import os
+import select
+import socket
+import ssl
+import threading
+import time
+from controllers import androidtv_proto as proto
+from controllers.base_controller import RemoteController
+from utils.constants import ANDROID_APP_LINKS, KEY_MAP_ANDROID
+from utils.logger import logger
+from utils.telemetry import telemetry
+
+REMOTE_PORT = 6466
+PAIRING_PORT = 6467
+
+def certificate_numbers(data):
+    """(modulus, exponent) of the RSA key in a PEM or DER certificate."""
+    try:
+        from cryptography import x509
+    except ImportError:
+        raise RuntimeError("Android TV pairing needs the 'cryptography' package")
+
+    if data.lstrip().startswith(b"-----BEGIN"):
+        cert = x509.load_pem_x509_certificate(data)
+    else:
+        cert = x509.load_der_x509_certificate(data)
+    numbers = cert.public_key().public_numbers()
+    return numbers.n, numbers.e
+
+
+class AndroidTVCredentials:
+    """The client certificate an Android TV is paired with, kept in cert_dir.
+
+    Created on first use; that needs the optional `cryptography` package.
+    Once paired, the same certificate must be presented on every connect.
+    """
+
+    def __init__(self, cert_dir, common_name="smartremote"):
+        self.cert_dir = cert_dir
+        self.common_name = common_name
+        self.certfile = os.path.join(cert_dir, "androidtv_cert.pem")
+        self.keyfile = os.path.join(cert_dir, "androidtv_key.pem")
+
+    def exists(self):
+        return os.path.exists(self.certfile) and os.path.exists(self.keyfile)
+
+    def ensure(self):
+        if self.exists():
+            return
+        try:
+            import datetime
+            from cryptography import x509
+            from cryptography.hazmat.primitives import hashes, serialization
+            from cryptography.hazmat.primitives.asymmetric import rsa
+            from cryptography.x509.oid import NameOID
+        except ImportError:
+            raise RuntimeError("Android TV pairing needs the 'cryptography' package")
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, self.common_name)])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder()
+                .subject_name(name).issuer_name(name)
+                .public_key(key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=3650))
+                .sign(key, hashes.SHA256()))
+        os.makedirs(self.cert_dir, exist_ok=True)
+        fd = os.open(self.keyfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key.private_bytes(serialization.Encoding.PEM,
+                                      serialization.PrivateFormat.TraditionalOpenSSL,
+                                      serialization.NoEncryption()))
+        with open(self.certfile, 'wb') as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        logger.info(f"Created Android TV client certificate in {self.cert_dir}")
+
+    def public_numbers(self):
+        self.ensure()
+        with open(self.certfile, 'rb') as f:
+            return certificate_numbers(f.read())
+
+
+def tls_socket_factory(credentials):
+    """socket_factory(host, port, timeout) opening TLS with the client certificate."""
+    def connect(host, port, timeout):
+        credentials.ensure()
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        # TVs present a self-signed certificate; trust comes from pairing
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        context.load_cert_chain(credentials.certfile, credentials.keyfile)
+        raw = socket.create_connection((host, port), timeout=timeout)
+        try:
+            return context.wrap_socket(raw)
+        except Exception:
+            raw.close()
+            raise
+    return connect
+
+
+class AndroidTVController(RemoteController):
+    """Controls Android TV / Google TV sets over the Android TV Remote v2 protocol.
+
+    One TLS session to port 6466 stays open; a reader thread answers the
+    TV's configure, set-active and ping messages, and each press is a
+    single key-inject message written on that socket. The TV only accepts
+    a client certificate it has paired with (see AndroidTVPairing);
+    needs_pairing is set when it turns us away. socket_factory(host, port,
+    timeout) returns the connected socket, which tests use to talk to a
+    plain TCP stand-in.
+    """
+
+    def __init__(self, ip_address, cert_dir=None, port=REMOTE_PORT, socket_factory=None,
+                 transport=None, timeout=3.0):
+        super().__init__(ip_address, "Android TV", transport)
+        self.port = port
+        self.timeout = timeout
+        self.credentials = AndroidTVCredentials(cert_dir) if cert_dir else None
+        if socket_factory is None and self.credentials:
+            socket_factory = tls_socket_factory(self.credentials)
+        self._socket_factory = socket_factory
+        self.needs_pairing = False
+        self.is_on = None
+        self.model_name = None
+        self._sock = None
+        # All reads and writes on the socket are serialised: SSL sockets
+        # must not be read and written from two threads at once
+        self._io_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+
+    def connect(self):
+        with self._connect_lock:
+            self._close_socket()
+            if self._socket_factory is None:
+                logger.error("Android TV controller has no certificate directory")
+                return False
+            try:
+                with telemetry.span("androidtv.connect"):
+                    sock = self._socket_factory(self.ip_address, self.port, self.timeout)
+            except ssl.SSLError as e:
+                # The TV rejects certificates it hasn't paired with
+                logger.warning(f"Android TV {self.ip_address} refused TLS session: {e}")
+                self.needs_pairing = True
+                self.is_connected = False
+                return False
+            except (OSError, RuntimeError) as e:
+                logger.error(f"Android TV connect failed for {self.ip_address}: {e}")
+                self.is_connected = False
+                return False
+
+            # Short timeout so a partial TLS record never holds the I/O lock for long
+            sock.settimeout(0.5)
+            ready = threading.Event()
+            self._sock = sock
+            threading.Thread(target=self._read_loop, args=(sock, ready), daemon=True,
+                             name="androidtv-reader").start()
+            deadline = time.monotonic() + self.timeout
+            while not ready.wait(0.05):
+                # Give up early if the TV hangs up mid-handshake
+                if self._sock is not sock or time.monotonic() > deadline:
+                    break
+            self.is_connected = ready.is_set() and self._sock is sock
+            if self.is_connected:
+                self.needs_pairing = False
+            else:
+                logger.error(f"Android TV {self.ip_address} did not complete the remote handshake")
+                self._close_socket(sock)
+            return self.is_connected
+
+    def warm_up(self):
+        # Reconnecting would tear down a live session
+        return self.is_connected or self.connect()
+
+    def close(self):
+        self._close_socket()
+
+    def _close_socket(self, sock=None):
+        current = self._sock
+        if sock is None:
+            sock = current
+        if sock is None:
+            return
+        if sock is current:
+            self._sock = None
+            self.is_connected = False
+        with self._io_lock:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    # -- reader thread -------------------------------------------------------
+
+    def _read_loop(self, sock, ready):
+        reader = proto.FrameReader()
+        try:
+            while self._sock is sock:
+                pending = isinstance(sock, ssl.SSLSocket) and sock.pending()
+                if not pending and not select.select([sock], [], [], 1.0)[0]:
+                    continue
+                with self._io_lock:
+                    try:
+                        data = sock.recv(4096)
+                    except (socket.timeout, ssl.SSLWantReadError):
+                        continue
+                if not data:
+                    break
+                for message in reader.feed(data):
+                    self._handle(sock, proto.parse_message(message), ready)
+        except (OSError, ValueError) as e:
+            if self._sock is sock:
+                logger.debug(f"Android TV session error: {e}")
+        finally:
+            if not ready.is_set() and isinstance(sock, ssl.SSLSocket):
+                # TLS 1.3 servers drop unknown client certificates after the handshake
+                self.needs_pairing = True
+            if self._sock is sock:
+                logger.info(f"Android TV {self.ip_address} closed the remote session")
+                self._close_socket(sock)
+
+    def _handle(self, sock, fields, ready):
+        if proto.REMOTE_CONFIGURE in fields:
+            configure = proto.parse_message(proto.first(fields, proto.REMOTE_CONFIGURE))
+            info = proto.parse_message(proto.first(configure, 2, b""))
+            model = proto.first(info, 1)
+            if model:
+                self.model_name = model.decode('utf-8', 'replace')
+                self.name = self.model_name
+            self._write(sock, proto.remote_configure("SmartRemote", "TCL", "com.smartremote", "1.0"))
+        elif proto.REMOTE_SET_ACTIVE in fields:
+            self._write(sock, proto.remote_set_active())
+            ready.set()
+        elif proto.REMOTE_PING_REQUEST in fields:
+            ping = proto.parse_message(proto.first(fields, proto.REMOTE_PING_REQUEST))
+            self._write(sock, proto.remote_ping_response(proto.first(ping, 1, 0)))
+        elif proto.REMOTE_START in fields:
+            start = proto.parse_message(proto.first(fields, proto.REMOTE_START))
+            self.is_on = bool(proto.first(start, 1, 0))
+        elif proto.REMOTE_ERROR in fields:
+            logger.warning("Android TV %s reported a remote error", self.ip_address)
+
+    def _write(self, sock, message):
+        with self._io_lock:
+            sock.sendall(proto.frame(message))
+
+    def _send(self, message):
+        """Write one message on the live session, reconnecting once if it dropped."""
+        for _ in range(2):
+            sock = self._sock
+            if sock is None:
+                if not self.connect():
+                    return False
+                sock = self._sock
+                if sock is None:
+                    return False
+            try:
+                self._write(sock, message)
+                return True
+            except OSError as e:
+                logger.warning("Android TV write to %s failed: %s", self.ip_address, e)
+                self._close_socket(sock)
+        return False
+
+    # -- commands --------------------------------------------------------------
+
+    def send_key(self, key_code):
+        return self._inject(key_code, proto.DIRECTION_SHORT)
+
+    def send_keydown(self, key_code):
+        """Press and hold a key until send_keyup."""
+        return self._inject(key_code, proto.DIRECTION_START_LONG)
+
+    def send_keyup(self, key_code):
+        return self._inject(key_code, proto.DIRECTION_END_LONG)
+
+    def _inject(self, key_code, direction):
+        android_key = KEY_MAP_ANDROID.get(key_code)
+        if android_key is None:
+            logger.warning("Key %s not mapped for Android TV", key_code)
+            return False
+        return self._send(proto.remote_key_inject(android_key, direction))
+
+    def send_sequence(self, keys, inter_key_ms=100):
+        """Stream keys on the open session. (key, hold_ms) items are held."""
+        for i, item in enumerate(keys):
+            if i and inter_key_ms:
+                time.sleep(inter_key_ms / 1000.0)
+            if isinstance(item, (tuple, list)):
+                key_code, hold_ms = item
+                if not self.send_keydown(key_code):
+                    return False
+                time.sleep(hold_ms / 1000.0)
+                if not self.send_keyup(key_code):
+                    return False
+            elif not self.send_key(item):
+                return False
+        return True
+
+    def launch_app(self, app_id):
+        link = ANDROID_APP_LINKS.get(app_id, app_id)
+        if "://" not in link:
+            logger.warning(f"No Android TV app link for {app_id}")
+            return False
+        return self._send(proto.remote_app_link(link))
+
+
+class AndroidTVPairing:
+    """One pairing attempt with an Android TV on port 6467.
+
+    start() asks the TV to show a six character code; finish(code) sends
+    the secret derived from it and both certificates. After that the TV
+    accepts the credentials' certificate on the remote port.
+    """
+
+    def __init__(self, ip_address, credentials, port=PAIRING_PORT, socket_factory=None,
+                 client_name="TCL Smart Remote", timeout=10.0):
+        self.ip_address = ip_address
+        self.credentials = credentials
+        self.port = port
+        self.client_name = client_name
+        self.timeout = timeout
+        self._socket_factory = socket_factory or tls_socket_factory(credentials)
+        self._sock = None
+        self._reader = proto.FrameReader()
+        self._inbox = []
+
+    @property
+    def in_progress(self):
+        """True while the pairing session is open, e.g. after a mistyped code."""
+        return self._sock is not None
+
+    def start(self):
+        """Returns True once the TV is showing the pairing code."""
+        self.close()
+        try:
+            self._sock = self._socket_factory(self.ip_address, self.port, self.timeout)
+            self._sock.settimeout(self.timeout)
+            self._exchange(proto.pairing_request(self.client_name), proto.PAIRING_REQUEST_ACK)
+            self._exchange(proto.pairing_options(), proto.PAIRING_OPTIONS)
+            self._exchange(proto.pairing_configuration(), proto.PAIRING_CONFIGURATION_ACK)
+            return True
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.error(f"Android TV pairing with {self.ip_address} failed to start: {e}")
+            self.close()
+            return False
+
+    def finish(self, code):
+        """Send the secret for the code shown on the TV. False if it doesn't match."""
+        if self._sock is None:
+            return False
+        try:
+            server_numbers = certificate_numbers(self._sock.getpeercert(binary_form=True) or b"")
+            secret = proto.pin_secret(self.credentials.public_numbers(), server_numbers, code)
+            if secret is None:
+                logger.warning("Android TV pairing code does not match")
+                return False  # Session stays open so the user can retype it
+            self._exchange(proto.pairing_secret(secret), proto.PAIRING_SECRET_ACK)
+            logger.info(f"Paired with Android TV {self.ip_address}")
+            self.close()
+            return True
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.error(f"Android TV pairing with {self.ip_address} failed: {e}")
+            self.close()
+            return False
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        self._reader = proto.FrameReader()
+        self._inbox = []
+
+    def _exchange(self, message, expected):
+        self._sock.sendall(proto.frame(message))
+        while not self._inbox:
+            data = self._sock.recv(4096)
+            if not data:
+                raise ValueError("TV closed the pairing session")
+            self._inbox.extend(self._reader.feed(data))
+        reply = proto.parse_message(self._inbox.pop(0))
+        status = proto.first(reply, 2)
+        if status != proto.STATUS_OK or expected not in reply:
+            raise ValueError(f"TV answered pairing step {expected} with status {status}")
+        return reply
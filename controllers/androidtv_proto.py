@@ -0,0 +1,197 @@
+"""Wire format for the Android TV Remote v2 protocol.
+
+Both the pairing channel (port 6467) and the remote channel (port 6466)
+carry protobuf messages, each prefixed with its varint length. Only the
+few messages the app needs are encoded here, by hand, so there is no
+protobuf dependency. Decoded messages are {field_number: [values]} where
+a value is an int (varint fields) or bytes (length-delimited fields,
+including nested messages, which parse_message can decode in turn).
+"""
+import hashlib
+
+# RemoteMessage fields (remote channel)
+REMOTE_CONFIGURE = 1
+REMOTE_SET_ACTIVE = 2
+REMOTE_ERROR = 3
+REMOTE_PING_REQUEST = 8
+REMOTE_PING_RESPONSE = 9
+REMOTE_KEY_INJECT = 10
+REMOTE_START = 40
+REMOTE_APP_LINK = 90
+
+# RemoteKeyInject.direction
+DIRECTION_START_LONG = 1
+DIRECTION_END_LONG = 2
+DIRECTION_SHORT = 3
+
+# Ping, key, power, volume and app-link features, as the TV's own remote app reports
+FEATURES = 622
+
+# OuterMessage fields (pairing channel)
+PROTOCOL_VERSION = 1
+STATUS_OK = 200
+PAIRING_REQUEST = 10
+PAIRING_REQUEST_ACK = 11
+PAIRING_OPTIONS = 20
+PAIRING_CONFIGURATION = 30
+PAIRING_CONFIGURATION_ACK = 31
+PAIRING_SECRET = 40
+PAIRING_SECRET_ACK = 41
+
+ENCODING_HEXADECIMAL = 3
+ROLE_INPUT = 1
+PIN_LENGTH = 6
+
+# -- protobuf primitives -------------------------------------------------
+
+def encode_varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def decode_varint(data, pos=0):
+    """(value, next_pos). Raises ValueError on a truncated varint."""
+    result = shift = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("Varint too long")
+    raise ValueError("Truncated varint")
+
+def field_varint(number, value):
+    return encode_varint(number << 3) + encode_varint(value)
+
+def field_bytes(number, payload):
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    return encode_varint((number << 3) | 2) + encode_varint(len(payload)) + payload
+
+def parse_message(data):
+    fields = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = decode_varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = decode_varint(data, pos)
+        elif wire_type == 2:
+            length, pos = decode_varint(data, pos)
+            value = bytes(data[pos:pos + length])
+            if len(value) != length:
+                raise ValueError("Truncated field")
+            pos += length
+        elif wire_type in (1, 5):
+            size = 8 if wire_type == 1 else 4
+            value = int.from_bytes(data[pos:pos + size], 'little')
+            pos += size
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        fields.setdefault(number, []).append(value)
+    return fields
+
+def first(fields, number, default=None):
+    values = fields.get(number)
+    return values[0] if values else default
+
+def frame(message):
+    return encode_varint(len(message)) + message
+
+
+class FrameReader:
+    """Splits a byte stream into length-prefixed messages."""
+
+    MAX_FRAME = 64 * 1024
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes; returns the complete messages now available."""
+        self._buffer += data
+        messages = []
+        while self._buffer:
+            try:
+                length, start = decode_varint(self._buffer)
+            except ValueError:
+                break  # Length prefix not complete yet
+            if length > self.MAX_FRAME:
+                raise ValueError(f"Frame of {length} bytes")
+            if len(self._buffer) < start + length:
+                break
+            messages.append(bytes(self._buffer[start:start + length]))
+            del self._buffer[:start + length]
+        return messages
+
+# -- remote channel --------------------------------------------------------
+
+def remote_configure(model, vendor, package_name, app_version):
+    device_info = (field_bytes(1, model) + field_bytes(2, vendor) + field_varint(3, 1) +
+                   field_bytes(4, "1") + field_bytes(5, package_name) + field_bytes(6, app_version))
+    return field_bytes(REMOTE_CONFIGURE, field_varint(1, FEATURES) + field_bytes(2, device_info))
+
+def remote_set_active():
+    return field_bytes(REMOTE_SET_ACTIVE, field_varint(1, FEATURES))
+
+def remote_ping_response(value):
+    return field_bytes(REMOTE_PING_RESPONSE, field_varint(1, value))
+
+def remote_key_inject(key_code, direction=DIRECTION_SHORT):
+    return field_bytes(REMOTE_KEY_INJECT, field_varint(1, key_code) + field_varint(2, direction))
+
+def remote_app_link(link):
+    return field_bytes(REMOTE_APP_LINK, field_bytes(1, link))
+
+# -- pairing channel -------------------------------------------------------
+
+def _outer(number, payload):
+    return field_varint(1, PROTOCOL_VERSION) + field_varint(2, STATUS_OK) + field_bytes(number, payload)
+
+def _hex_encoding():
+    return field_varint(1, ENCODING_HEXADECIMAL) + field_varint(2, PIN_LENGTH)
+
+def pairing_request(client_name, service_name="atvremote"):
+    return _outer(PAIRING_REQUEST, field_bytes(1, service_name) + field_bytes(2, client_name))
+
+def pairing_options():
+    return _outer(PAIRING_OPTIONS, field_bytes(1, _hex_encoding()) + field_varint(3, ROLE_INPUT))
+
+def pairing_configuration():
+    return _outer(PAIRING_CONFIGURATION, field_bytes(1, _hex_encoding()) + field_varint(2, ROLE_INPUT))
+
+def pairing_secret(secret):
+    return _outer(PAIRING_SECRET, field_bytes(1, secret))
+
+def _int_bytes(n):
+    return n.to_bytes((n.bit_length() + 7) // 8, 'big')
+
+def pin_secret(client_numbers, server_numbers, pin):
+    """Secret proving both sides saw the PIN shown on the TV.
+
+    client_numbers/server_numbers are (modulus, exponent) of each side's
+    RSA certificate key. Returns None when the PIN's check byte doesn't
+    match, i.e. the PIN was mistyped.
+    """
+    pin = pin.strip().upper()
+    if len(pin) != PIN_LENGTH:
+        return None
+    try:
+        check, nonce = int(pin[:2], 16), bytes.fromhex(pin[2:])
+    except ValueError:
+        return None
+    digest = hashlib.sha256()
+    for n in (*client_numbers, *server_numbers):
+        digest.update(_int_bytes(n))
+    digest.update(nonce)
+    secret = digest.digest()
+    return secret if secret[0] == check else None
@@ -1,13 +1,17 @@
+import time
 from abc import ABC, abstractmethod
+from services.http_pool import get_default_transport
 
 class RemoteController(ABC):
     """Abstract base class for all remote control implementations."""
     
-    def __init__(self, ip_address, name="Generic Device"):
+    def __init__(self, ip_address, name="Generic Device", transport=None):
         self.ip_address = ip_address
         self.name = name
         self.is_connected = False
         self.mac_address = None
+        # Shared keep-alive HTTP layer so every press reuses a warm connection
+        self.transport = transport or get_default_transport()
 
     @abstractmethod
     def connect(self):
@@ -23,3 +27,24 @@ class RemoteController(ABC):
     def launch_app(self, app_id):
         """Launch a specific application."""
         pass
+
+    def warm_up(self):
+        """Make sure the next command goes out on a live connection."""
+        return self.connect()
+
+    def send_repeat(self, key_code, count):
+        """Press one key count times in a row, as fast as the device takes them."""
+        return self.send_sequence([key_code] * count, inter_key_ms=0)
+
+    def close(self):
+        """Release any persistent connection to the device."""
+        pass
+
+    def send_sequence(self, keys, inter_key_ms=100):
+        """Send several keys in order. Stops at the first failed key."""
+        for i, key_code in enumerate(keys):
+            if i and inter_key_ms:
+                time.sleep(inter_key_ms / 1000.0)
+            if not self.send_key(key_code):
+                return False
+        return True
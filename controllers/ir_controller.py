@@ -1,39 +1,290 @@
-import requests
+import hashlib
+import threading
+import time
 from controllers.base_controller import RemoteController
-from utils.constants import TCL_IR_CODES
+from controllers.ir_udp import STATUS_EMPTY_SLOT, STATUS_OK, UdpCommandChannel, parse_caps
+from services.transport_manager import UNCONFIRMED
+from utils.ir_codes import default_code_table
 from utils.logger import logger
+from utils.telemetry import telemetry
+
+# Slot tables pushed to each blaster this session: blaster_ip -> {key: slot} (None = unsupported)
+_blaster_slots = {}
+_slots_lock = threading.Lock()
+# Negotiated UDP channels: blaster_ip -> UdpCommandChannel (None = HTTP only)
+_udp_channels = {}
+_udp_lock = threading.Lock()
 
 class IRController(RemoteController):
-    """Fallback controller that sends commands to an ESP32-based IR blaster."""
-    
-    def __init__(self, blaster_ip):
-        super().__init__(blaster_ip, "IR Blaster")
+    """Fallback controller that sends commands to an ESP32-based IR blaster.
+
+    Codes come from the compiled IR code table. They are pushed to the
+    blaster's slot cache once, after which each press only sends a short
+    slot number. Older firmware without slot support gets the full code.
+    When the blaster advertises a UDP port in /caps, slot presses go out
+    as single acked datagrams and HTTP is only the fallback.
+    """
+
+    MAX_SLOTS = 64  # Must match kMaxSlots in the firmware
+    # Must match kMaxBatchItems / kMaxBatchSends in the firmware
+    MAX_BATCH_ITEMS = 32
+    MAX_BATCH_SENDS = 64
+    # A held key repeats about once per NEC frame
+    REPEAT_INTERVAL_MS = 110
+    # Firing these twice undoes them, so an unacked UDP press is not resent
+    TOGGLE_KEYS = {'power', 'mute', 'play', 'pause'}
+
+    def __init__(self, blaster_ip, transport=None, brand="tcl", model="default", code_table=None):
+        super().__init__(blaster_ip, "IR Blaster", transport)
         self.blaster_ip = blaster_ip
+        self.brand = brand
+        self.model = model
+        self.codes = code_table or default_code_table()
 
     def connect(self):
         try:
             # Simple ping to check if ESP32 is alive
-            resp = requests.get(f"http://{self.blaster_ip}/ping", timeout=2)
+            resp = self.transport.get(f"http://{self.blaster_ip}/ping", timeout=2)
             self.is_connected = resp.status_code == 200
-            return self.is_connected
         except:
             self.is_connected = False
+        if self.is_connected:
+            self.prepare_blaster()
+        return self.is_connected
+
+    def prepare_blaster(self):
+        """Fill the blaster's slot cache, then open the UDP channel that presses those slots."""
+        slots = self.sync_codes()
+        if slots:
+            self.negotiate_udp()
+        return slots
+
+    def negotiate_udp(self, force=False):
+        """Open the UDP channel if the firmware offers one. Returns it or None."""
+        with _udp_lock:
+            if not force and self.blaster_ip in _udp_channels:
+                return _udp_channels[self.blaster_ip]
+            channel = None
+            try:
+                resp = self.transport.get(f"http://{self.blaster_ip}/caps", timeout=1)
+                port = parse_caps(resp.text).get('udp') if resp.status_code == 200 else None
+                if port:
+                    host = self.blaster_ip.rsplit(':', 1)[0]
+                    channel = UdpCommandChannel(host, port)
+                    logger.info(f"Using UDP command channel on {host}:{port}")
+            except Exception as e:
+                logger.debug(f"UDP negotiation failed: {e}")
+            old = _udp_channels.pop(self.blaster_ip, None)
+            if old:
+                old.close()
+            _udp_channels[self.blaster_ip] = channel
+            return channel
+
+    def _drop_udp(self):
+        # Back to HTTP until the next connect renegotiates
+        with _udp_lock:
+            channel = _udp_channels.pop(self.blaster_ip, None)
+        if channel:
+            channel.close()
+
+    def _send_udp(self, slot, repeat=1):
+        """True once acked, None when the press surely didn't fire (use HTTP).
+
+        False when no ack came: the frame may still have fired the code.
+        """
+        channel = _udp_channels.get(self.blaster_ip)
+        if channel is None:
+            return None
+        status = channel.send(slot, repeat)
+        if status == STATUS_OK:
+            return True
+        if status is None:
+            telemetry.incr("ir.udp.no_ack")
+            logger.warning("No UDP ack from blaster %s, switching to HTTP", self.blaster_ip)
+            self._drop_udp()
             return False
+        if status == STATUS_EMPTY_SLOT:
+            telemetry.incr("ir.slot_miss")
+            with _slots_lock:
+                _blaster_slots.pop(self.blaster_ip, None)
+        return None
+
+    def _slot_plan(self):
+        keys = self.codes.keys(self.brand, self.model)[:self.MAX_SLOTS]
+        return [(slot, key, self.codes.lookup(self.brand, self.model, key)) for slot, key in enumerate(keys)]
+
+    def sync_codes(self, force=False):
+        """Make sure the blaster caches this code set. Returns {key: slot} or None.
+
+        The signature is only set once every slot is stored, so a push that
+        failed part way is redone on the next connect. The HTTP calls run
+        outside _slots_lock, which presses take on a slot miss.
+        """
+        with _slots_lock:
+            if not force and self.blaster_ip in _blaster_slots:
+                return _blaster_slots[self.blaster_ip]
+
+        plan = self._slot_plan()
+        signature = hashlib.sha1(
+            "\n".join(f"{slot}={code}" for slot, _, code in plan).encode()).hexdigest()[:12]
+        base = f"http://{self.blaster_ip}/ir"
+        slots = None
+        try:
+            resp = self.transport.get(f"{base}/sig", timeout=1)
+            if resp.status_code == 200:
+                if resp.text.strip() != signature:
+                    logger.info(f"Pushing {len(plan)} IR codes to blaster {self.blaster_ip}")
+                    with telemetry.span("ir.sync_codes"):
+                        for slot, _, code in plan:
+                            status = self.transport.get(f"{base}/store", params={"slot": slot, "code": code},
+                                                        timeout=1).status_code
+                            if status != 200:
+                                # Don't remember a partial push, the next connect retries
+                                logger.warning(f"Blaster {self.blaster_ip} rejected IR code slot {slot} (HTTP {status})")
+                                return None
+                    self.transport.get(f"{base}/sig", params={"set": signature}, timeout=1)
+                slots = {key: slot for slot, key, _ in plan}
+            else:
+                logger.info("Blaster firmware has no code slots, sending full codes")
+        except Exception as e:
+            # Don't remember failures, the next connect retries
+            logger.warning(f"IR code sync failed: {e}")
+            return None
+        with _slots_lock:
+            _blaster_slots[self.blaster_ip] = slots
+        return slots
 
     def send_key(self, key_code):
-        code = TCL_IR_CODES.get(key_code)
+        code = self.codes.lookup(self.brand, self.model, key_code)
         if not code:
-            logger.warning(f"IR Code for {key_code} not found.")
+            logger.warning("IR Code for %s not found.", key_code)
             return False
 
+        slots = _blaster_slots.get(self.blaster_ip)
+        slot = slots.get(key_code) if slots else None
+        sent = self._send_udp(slot) if slot is not None else None
+        if sent:
+            return True
+        if sent is False and key_code in self.TOGGLE_KEYS:
+            # Only the acks may have been lost; a second copy would undo the press
+            logger.warning("%s may not have reached the TV, not resending it", key_code)
+            return UNCONFIRMED
+        slots = _blaster_slots.get(self.blaster_ip)
+        slot = slots.get(key_code) if slots else None
         try:
             url = f"http://{self.blaster_ip}/ir"
-            requests.get(url, params={"code": code}, timeout=1)
+            if slot is not None:
+                if self.transport.get(url, params={"slot": slot}, timeout=1).status_code == 200:
+                    return True
+                # Blaster lost its slot cache (reflash/reset): resync on next connect
+                telemetry.incr("ir.slot_miss")
+                with _slots_lock:
+                    _blaster_slots.pop(self.blaster_ip, None)
+            self.transport.get(url, params={"code": code}, timeout=1)
             return True
         except Exception as e:
-            logger.error(f"Failed to send IR command: {e}")
+            logger.error("Failed to send IR command: %s", e)
+            return False
+
+    def send_repeat(self, key_code, count):
+        """Repeat frames for a held key: one UDP frame with a repeat count, or one batch."""
+        slots = _blaster_slots.get(self.blaster_ip)
+        slot = slots.get(key_code) if slots else None
+        sent = self._send_udp(slot, count) if slot is not None and count <= 255 else None
+        if sent:
+            return True
+        if sent is False and key_code in self.TOGGLE_KEYS:
+            return UNCONFIRMED
+        return self.send_batch([key_code] * count, gap_ms=0)
+
+    @classmethod
+    def coalesce(cls, keys):
+        """Collapse runs of the same key into [key, count] pairs.
+
+        A (key, hold_ms) tuple, as used by RokuController.send_sequence,
+        becomes a run of repeats spanning the hold.
+        """
+        runs = []
+        for key in keys:
+            count = 1
+            if isinstance(key, (tuple, list)):
+                key, hold_ms = key
+                count = max(1, int(hold_ms // cls.REPEAT_INTERVAL_MS))
+            if runs and runs[-1][0] == key:
+                runs[-1][1] += count
+            else:
+                runs.append([key, count])
+        return runs
+
+    def _batch_chunks(self, runs):
+        # Split so no single request exceeds the firmware's limits
+        chunk, sends = [], 0
+        for key, count in runs:
+            while count:
+                take = min(count, self.MAX_BATCH_SENDS)
+                if len(chunk) >= self.MAX_BATCH_ITEMS or sends + take > self.MAX_BATCH_SENDS:
+                    yield chunk
+                    chunk, sends = [], 0
+                chunk.append((key, take))
+                sends += take
+                count -= take
+        if chunk:
+            yield chunk
+
+    def _post_batch(self, chunk, gap_ms, use_slots):
+        slots = _blaster_slots.get(self.blaster_ip) if use_slots else None
+        lines = []
+        for key, count in chunk:
+            slot = slots.get(key) if slots else None
+            ref = f"#{slot}" if slot is not None else self.codes.lookup(self.brand, self.model, key)
+            lines.append(f"{count} {ref}")
+        # The blaster runs the whole chunk locally, so allow for its gaps
+        sends = sum(count for _, count in chunk)
+        timeout = 2 + sends * (gap_ms + self.REPEAT_INTERVAL_MS) / 1000.0
+        return self.transport.post(f"http://{self.blaster_ip}/ir/batch", params={"gap": gap_ms},
+                                   data="\n".join(lines), timeout=timeout).status_code
+
+    def send_batch(self, keys, gap_ms=100):
+        """Send a key sequence in as few blaster requests as possible.
+
+        Repeated presses are coalesced into repeat counts and the blaster
+        paces them itself, so Wi-Fi jitter doesn't leak into the gaps.
+        Falls back to one request per press on firmware without /ir/batch.
+        """
+        runs = self.coalesce(keys)
+        missing = [key for key, _ in runs if not self.codes.lookup(self.brand, self.model, key)]
+        if missing:
+            logger.warning(f"IR Code for {missing[0]} not found.")
             return False
 
+        chunks = list(self._batch_chunks(runs))
+        telemetry.incr("ir.batch")
+        for index, chunk in enumerate(chunks):
+            if index and gap_ms:
+                time.sleep(gap_ms / 1000.0)
+            try:
+                status = self._post_batch(chunk, gap_ms, use_slots=True)
+                if status == 404 and _blaster_slots.get(self.blaster_ip):
+                    # Slot cache lost on the blaster: retry with full codes
+                    with _slots_lock:
+                        _blaster_slots.pop(self.blaster_ip, None)
+                    status = self._post_batch(chunk, gap_ms, use_slots=False)
+            except Exception as e:
+                logger.error(f"Failed to send IR batch: {e}")
+                return False
+            if status == 404:
+                logger.info("Blaster firmware has no batch endpoint, sending keys one by one")
+                telemetry.incr("ir.batch.unsupported")
+                rest = [key for later in chunks[index:] for key, count in later for _ in range(count)]
+                return super().send_sequence(rest, gap_ms)
+            if status != 200:
+                logger.error(f"IR batch rejected by blaster (HTTP {status})")
+                return False
+        return True
+
+    def send_sequence(self, keys, inter_key_ms=100):
+        return self.send_batch(keys, inter_key_ms)
+
     def launch_app(self, app_id):
         # IR fallback usually can't launch apps directly, might use 'Home' as fallback
         logger.info("Direct app launch not supported via IR. Routing to Home.")
@@ -0,0 +1,93 @@
+"""Binary UDP command channel for the ESP32 blaster.
+
+One 7-byte datagram per press instead of an HTTP request:
+
+    frame  <2sBHBB  magic b"IR", version, sequence, code slot, repeat count
+    ack    <2sHB    magic b"IA", sequence, status
+
+The blaster acks as soon as a frame is validated and then emits the code,
+and it remembers the last sequence number so a retransmitted frame is
+re-acked without firing the code twice.
+"""
+import socket
+import struct
+import threading
+import time
+from utils.logger import logger
+
+FRAME = struct.Struct("<2sBHBB")
+ACK = struct.Struct("<2sHB")
+FRAME_MAGIC = b"IR"
+ACK_MAGIC = b"IA"
+VERSION = 1
+
+STATUS_OK = 0
+STATUS_EMPTY_SLOT = 1
+STATUS_BAD_FRAME = 2
+
+def pack_frame(seq, slot, repeat=1):
+    return FRAME.pack(FRAME_MAGIC, VERSION, seq & 0xFFFF, slot, repeat)
+
+def unpack_ack(data):
+    """(seq, status) or None for anything that isn't an ack."""
+    if len(data) != ACK.size:
+        return None
+    magic, seq, status = ACK.unpack(data)
+    return (seq, status) if magic == ACK_MAGIC else None
+
+def parse_caps(text):
+    """Parse the blaster's /caps reply, e.g. "udp=4210 slots=64 batch=1"."""
+    caps = {}
+    for token in text.split():
+        key, _, value = token.partition('=')
+        caps[key] = int(value) if value.isdigit() else value
+    return caps
+
+
+class UdpCommandChannel:
+    """Sends slot frames to one blaster with ack and retransmit.
+
+    send() returns the blaster's status, or None when no ack arrived after
+    `attempts` tries (initial_timeout doubling each time), in which case the
+    caller should fall back to HTTP.
+    """
+
+    def __init__(self, host, port, initial_timeout=0.05, attempts=3):
+        self.address = (host, port)
+        self.initial_timeout = initial_timeout
+        self.attempts = attempts
+        self._seq = int(time.monotonic() * 1000) & 0xFFFF
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.connect(self.address)
+
+    def send(self, slot, repeat=1):
+        with self._lock:
+            self._seq = (self._seq + 1) & 0xFFFF
+            seq = self._seq
+            frame = pack_frame(seq, slot, repeat)
+            timeout = self.initial_timeout
+            for attempt in range(self.attempts):
+                try:
+                    self._sock.send(frame)
+                    deadline = time.monotonic() + timeout
+                    while True:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._sock.settimeout(remaining)
+                        ack = unpack_ack(self._sock.recv(16))
+                        # Late acks for earlier frames are ignored
+                        if ack and ack[0] == seq:
+                            return ack[1]
+                except socket.timeout:
+                    pass
+                except OSError as e:
+                    logger.debug("UDP send to %s failed: %s", self.address, e)
+                    return None
+                timeout *= 2
+            logger.debug("No UDP ack from %s for seq %s", self.address, seq)
+            return None
+
+    def close(self):
+        self._sock.close()
@@ -1,69 +1,222 @@
-import requests
+import queue
+import threading
+import time
+from urllib.parse import quote
 from controllers.base_controller import RemoteController
+from services.device_info import fetch_device_info
 from utils.constants import KEY_MAP_ROKU
 from utils.logger import logger
+from utils.telemetry import telemetry
 
 class RokuController(RemoteController):
     """Controls Roku-based TCL TVs via External Control Protocol (ECP)."""
 
-    def __init__(self, ip_address, port=8060):
-        super().__init__(ip_address, "TCL Roku TV")
+    def __init__(self, ip_address, port=8060, transport=None):
+        super().__init__(ip_address, "TCL Roku TV", transport)
         self.port = port
         self.base_url = f"http://{ip_address}:{port}"
+        self.model_name = None
+        self.device_info = None
+        self._text_stream = None
 
     def connect(self):
-        try:
-            resp = requests.get(f"{self.base_url}/query/device-info", timeout=3)
-            if resp.status_code == 200:
-                self.is_connected = True
-                content = resp.text
-                self.mac_address = self._extract_xml(content, "wifi-mac")
-                self.model_name = self._extract_xml(content, "model-name")
-                self.name = self.model_name if self.model_name else "Roku TV"
-                return True
-        except Exception as e:
-            logger.error(f"Roku connect failed: {e}")
-        
+        # Shares the memoized device-info fetch with SSDP discovery
+        with telemetry.span("roku.connect"):
+            info = fetch_device_info(self.ip_address, self.port, self.transport)
+        if info is not None:
+            self.is_connected = True
+            self.device_info = info
+            self.mac_address = info.mac
+            self.model_name = info.model_name
+            self.name = self.model_name if self.model_name else "Roku TV"
+            return True
+
+        logger.error(f"Roku connect failed: no device-info from {self.ip_address}")
         self.is_connected = False
         return False
 
-    def _extract_xml(self, xml, tag):
-        """Simple XML extraction for specific tags without external deps."""
-        try:
-            # Find the start of the tag <tag...
-            tag_start = xml.find(f"<{tag}")
-            if tag_start == -1: return None
-            
-            # Find the end of the opening tag >
-            content_start = xml.find(">", tag_start) + 1
-            
-            # Find the start of the closing tag </tag>
-            content_end = xml.find(f"</{tag}>", content_start)
-            if content_end == -1: return None
-            
-            return xml[content_start:content_end].strip()
-        except:
-            return None
+    def warm_up(self):
+        # Bypass the device-info memo so the pooled socket is actually used
+        info = fetch_device_info(self.ip_address, self.port, self.transport, max_age=0)
+        self.is_connected = info is not None
+        return self.is_connected
 
     def send_key(self, key_code):
+        return self._post_key("keypress", key_code)
+
+    def send_keydown(self, key_code):
+        """Press and hold a key until send_keyup (ECP keydown)."""
+        return self._post_key("keydown", key_code)
+
+    def send_keyup(self, key_code):
+        return self._post_key("keyup", key_code)
+
+    def send_sequence(self, keys, inter_key_ms=100):
+        """Send keys back to back over the pooled keep-alive connection.
+
+        Items are key names, or (key, hold_ms) tuples which are sent as an
+        ECP keydown/keyup pair so the TV sees a held button.
+        """
+        success = True
+        for i, item in enumerate(keys):
+            if i and inter_key_ms:
+                time.sleep(inter_key_ms / 1000.0)
+            if isinstance(item, (tuple, list)):
+                key_code, hold_ms = item
+                if not self.send_keydown(key_code):
+                    return False
+                time.sleep(hold_ms / 1000.0)
+                success = self.send_keyup(key_code) and success
+            elif not self.send_key(item):
+                return False
+        return success
+
+    def _post_key(self, action, key_code):
         roku_key = KEY_MAP_ROKU.get(key_code)
         if not roku_key:
-            logger.warning(f"Key {key_code} not mapped for Roku")
+            logger.warning("Key %s not mapped for Roku", key_code)
             return False
             
         try:
-            url = f"{self.base_url}/keypress/{roku_key}"
-            requests.post(url, timeout=1)
+            url = f"{self.base_url}/{action}/{roku_key}"
+            self.transport.post(url, timeout=1)
+            return True
+        except Exception as e:
+            logger.error("Roku %s failed: %s", action, e)
+            return False
+
+    def send_text(self, text):
+        """Type text into the focused field, one ECP Lit_ key per character.
+
+        Characters go out back to back on the pooled keep-alive connection,
+        each after the TV answered the previous one, so they arrive in
+        order. A backspace character sends the Backspace key.
+        """
+        for char in text:
+            if not self._send_char(char):
+                return False
+        return True
+
+    def _send_char(self, char):
+        key = "Backspace" if char == "\b" else "Lit_" + quote(char, safe="")
+        try:
+            self.transport.post(f"{self.base_url}/keypress/{key}", timeout=1)
             return True
         except Exception as e:
-            logger.error(f"Roku send_key failed: {e}")
+            logger.error("Roku text entry failed: %s", e)
             return False
 
+    def text_stream(self):
+        """The TextStream for live typing into this TV, created on first use."""
+        if self._text_stream is None:
+            self._text_stream = TextStream(self)
+        return self._text_stream
+
+    def close(self):
+        if self._text_stream is not None:
+            self._text_stream.close()
+            self._text_stream = None
+
     def launch_app(self, app_id):
         try:
             url = f"{self.base_url}/launch/{app_id}"
-            requests.post(url, timeout=2)
+            self.transport.post(url, timeout=2)
             return True
         except Exception as e:
             logger.error(f"Roku launch_app failed: {e}")
             return False
+
+
+class TextStream:
+    """Live typing into a Roku text field, e.g. a search box as the user types.
+
+    Characters wait in a bounded buffer and one worker sends them in order
+    over the controller's pooled connection. When the user types faster
+    than the TV answers and the buffer fills, write() accepts fewer
+    characters instead of queueing without limit; sync() reports the text
+    the TV will really have so the input field can show it.
+    """
+
+    def __init__(self, controller, max_pending=64):
+        self.controller = controller
+        self.text = ""  # What the TV's field holds once the buffer drains
+        self._pending = queue.Queue(max_pending)
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True,
+                                        name=f"text-{controller.ip_address}")
+        self._worker.start()
+
+    def write(self, chars, timeout=0.0):
+        """Queue chars in order, waiting up to timeout for room. Returns how many were taken."""
+        if self._closed:
+            return 0
+        deadline = time.monotonic() + timeout
+        accepted = 0
+        for char in chars:
+            try:
+                self._pending.put(char, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                telemetry.incr("text.backpressure")
+                break
+            accepted += 1
+        return accepted
+
+    def sync(self, text):
+        """Send the edits that turn the last synced text into text.
+
+        Returns the text the TV will end up with, which is shorter than
+        text when the buffer was full.
+        """
+        common = 0
+        for old, new in zip(self.text, text):
+            if old != new:
+                break
+            common += 1
+        deletes = len(self.text) - common
+        added = text[common:]
+        accepted = self.write("\b" * deletes + added)
+        if accepted < deletes:
+            self.text = self.text[:len(self.text) - accepted]
+        else:
+            self.text = self.text[:common] + added[:accepted - deletes]
+        return self.text
+
+    def reset(self):
+        """Forget the synced text, e.g. after the TV's field was cleared on screen."""
+        self.text = ""
+
+    @property
+    def pending(self):
+        return self._pending.unfinished_tasks
+
+    def drain(self, timeout=5.0):
+        """Wait until every queued character was sent. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._pending.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # Drop unsent characters so the stop marker always fits
+        while True:
+            try:
+                self._pending.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.task_done()
+        self._pending.put_nowait(None)
+
+    def _run(self):
+        while True:
+            char = self._pending.get()
+            try:
+                if char is None:
+                    return
+                self.controller._send_char(char)
+            finally:
+                self._pending.task_done()
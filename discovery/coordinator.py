@@ -0,0 +1,212 @@
+import threading
+import time
+from services.executor import BACKGROUND, CancelToken
+from utils.logger import logger
+from utils.telemetry import telemetry
+
+# Scan phases, run in the order they were requested
+TVS = 'tv'
+BLASTERS = 'ir'
+
+class DiscoveryScan:
+    """One scan and its merged results.
+
+    Results are indexed by IP and by MAC: a repeat answer for a known device
+    updates it in place, and a MAC seen at a new address moves the entry
+    instead of listing the device twice.
+    """
+
+    def __init__(self, phases):
+        self.token = CancelToken()
+        self.kinds = set(phases)
+        self.started = time.monotonic()
+        self.finished = None
+        self._phases = list(phases)
+        self._by_ip = {}
+        self._by_mac = {}
+        self._listeners = []
+        self._done = threading.Event()
+        self._lock = threading.RLock()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        self.token.cancel()
+
+    def wait(self, timeout=None):
+        """Block until the scan ends. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def devices(self):
+        with self._lock:
+            return [dict(d) for d in self._by_ip.values()]
+
+    def merge(self, device):
+        """Fold one result into the index. Returns the merged entry, or None if nothing changed."""
+        ip = device.get('ip')
+        if not ip:
+            return None
+        mac = (device.get('mac') or '').lower() or None
+        with self._lock:
+            entry = self._by_mac.get(mac) if mac else None
+            if entry is None:
+                entry = self._by_ip.setdefault(ip, {})
+            elif entry['ip'] != ip:
+                # Same MAC at a new address: the device moved, e.g. a new DHCP lease
+                del self._by_ip[entry['ip']]
+                for field, value in self._by_ip.pop(ip, {}).items():
+                    entry.setdefault(field, value)
+                self._by_ip[ip] = entry
+            before = dict(entry)
+            for field, value in device.items():
+                # The first method to find a device is the one it is listed under
+                if value and not (field == 'method' and 'method' in entry):
+                    entry[field] = value
+            if mac:
+                entry['mac'] = mac
+                self._by_mac[mac] = entry
+            return dict(entry) if entry != before else None
+
+    def _extend(self, phases):
+        """Queue phases this scan does not cover yet. False once it has finished."""
+        with self._lock:
+            if self.finished is not None:
+                return False
+            for phase in phases:
+                if phase not in self.kinds:
+                    self.kinds.add(phase)
+                    self._phases.append(phase)
+            return True
+
+    def _next_phase(self):
+        """The next phase to run, or None after marking the scan finished."""
+        with self._lock:
+            if self._phases and not self.cancelled:
+                return self._phases.pop(0)
+            self.finished = time.monotonic()
+            return None
+
+
+class DiscoveryCoordinator:
+    """Single-flight front for the SSDP and ESP32 scans.
+
+    scan() starts a scan, or joins the one already running and appends any
+    phase it lacks, so pressing Scan twice or a blaster search during a user
+    scan never floods the network twice. A finished scan younger than
+    reuse_s is handed back as is unless force is set. Listeners get each new
+    or changed device and, unless the scan is cancelled, the merged list at
+    the end; both run through dispatch(fn), which the app points at Kivy's
+    Clock. A listener joining late is replayed the results so far.
+    """
+
+    PHASES = (TVS, BLASTERS)
+
+    def __init__(self, executor, dispatch=None, known_blaster_ips=tuple, reuse_s=5.0, scanners=None):
+        self.executor = executor
+        self.known_blaster_ips = known_blaster_ips
+        self.reuse_s = reuse_s
+        self._dispatch = dispatch or (lambda fn: fn())
+        # phase -> scanner(report, token); tests swap in fakes
+        self._scanners = scanners or {TVS: self._scan_tvs, BLASTERS: self._scan_blasters}
+        self._current = None
+        self._lock = threading.Lock()
+
+    def scan(self, kinds=PHASES, on_device=None, on_done=None, force=False):
+        """Start or join a scan covering kinds. Returns its DiscoveryScan."""
+        start = False
+        with self._lock:
+            scan = self._current
+            if scan and not scan.cancelled and scan._extend(kinds):
+                telemetry.incr("discovery.joined")
+            elif (scan and not force and not scan.cancelled and scan.kinds.issuperset(kinds)
+                  and time.monotonic() - scan.finished < self.reuse_s):
+                telemetry.incr("discovery.reused")
+            else:
+                scan = self._current = DiscoveryScan(kinds)
+                start = True
+        self._listen(scan, on_device, on_done)
+        if start:
+            future = self.executor.submit(self._run, scan, lane=BACKGROUND, key='discovery', token=scan.token)
+            # Cancelled while still queued: _run never starts, so end the scan here
+            future.add_done_callback(lambda f: f.cancelled() and self._abandon(scan))
+        return scan
+
+    def cancel(self):
+        """Cancel the running scan, if any; its late results are dropped."""
+        with self._lock:
+            scan = self._current
+        if scan and not scan.done:
+            scan.cancel()
+
+    def _listen(self, scan, on_device, on_done):
+        with scan._lock:
+            if (on_device, on_done) not in scan._listeners:
+                scan._listeners.append((on_device, on_done))
+            devices = scan.devices()
+            finished = scan.done
+        if on_device:
+            for device in devices:
+                self._dispatch(lambda d=device: on_device(d))
+        if finished and on_done and not scan.cancelled:
+            self._dispatch(lambda: on_done(devices))
+
+    def _run(self, scan):
+        def report(device):
+            merged = scan.merge(device)
+            if merged is None or scan.cancelled:
+                return
+            with scan._lock:
+                listeners = list(scan._listeners)
+            for on_device, _ in listeners:
+                if on_device:
+                    self._dispatch(lambda on_device=on_device: on_device(dict(merged)))
+
+        try:
+            phase = scan._next_phase()
+            while phase is not None:
+                with telemetry.span("discovery.phase." + phase):
+                    try:
+                        self._scanners[phase](report, scan.token)
+                    except Exception as e:
+                        logger.error("Discovery phase %s failed: %s", phase, e)
+                phase = scan._next_phase()
+        finally:
+            # Held while finishing so a listener joins either before the
+            # final callbacks or after done is set, never in between
+            with scan._lock:
+                if scan.finished is None:
+                    scan.finished = time.monotonic()
+                self._finish(scan)
+                scan._done.set()
+
+    def _abandon(self, scan):
+        with scan._lock:
+            scan.finished = time.monotonic()
+            scan._done.set()
+
+    def _finish(self, scan):
+        if scan.cancelled:
+            logger.info("Discovery scan cancelled")
+            return
+        devices = scan.devices()
+        logger.info("Discovery scan found %d device(s)", len(devices))
+        for _, on_done in scan._listeners:
+            if on_done:
+                self._dispatch(lambda on_done=on_done: on_done(devices))
+
+    def _scan_tvs(self, report, token):
+        # Imported on first scan, see main.py
+        from discovery.ssdp_discovery import SSDPDiscovery
+        logger.info("Starting SSDP discovery for TVs...")
+        SSDPDiscovery().discover(on_device=report, token=token)
+
+    def _scan_blasters(self, report, token):
+        from discovery.esp32_discovery import ESP32Discovery
+        logger.info("Starting ESP32 discovery for IR Blasters...")
+        ESP32Discovery(known_ips=self.known_blaster_ips()).discover(on_device=report, token=token)
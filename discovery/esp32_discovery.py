@@ -1,76 +1,107 @@
-import requests
-import threading
-import socket
+import asyncio
+from discovery.mdns_discovery import MDNSDiscovery
+from discovery.subnet_planner import SubnetPlanner
 from utils.logger import logger
+from utils.telemetry import telemetry
 
 class ESP32Discovery:
-    """Discovers ESP32 IR Blasters via HTTP ping on local subnet."""
+    """Discovers ESP32 IR Blasters via HTTP ping on local subnet.
 
-    def __init__(self):
+    Probes run on a single asyncio loop with non-blocking TCP connects, so a
+    full sweep costs one thread and finishes as soon as the slowest probe
+    does instead of after a fixed sleep.
+    """
+
+    def __init__(self, port=80, max_concurrency=64, probe_timeout=0.8, known_ips=()):
+        self.port = port
+        # Previously seen blaster addresses, probed before the rest of the subnet
+        self.known_ips = list(known_ips)
+        self.max_concurrency = max_concurrency
+        self.probe_timeout = probe_timeout
         self.found_devices = []
 
-    def discover(self):
+    def discover(self, on_device=None, hosts=None, use_mdns=True, token=None):
+        """Blocking scan. on_device is called for each blaster as it answers.
+
+        Without explicit hosts, mDNS is tried first and the subnet sweep only
+        runs when nothing answers to tclblaster.local. A cancelled token
+        stops the sweep as the next probe completes.
+        """
         self.found_devices = []
-        lock = threading.Lock()
-        
-        try:
-            # 1. Get Local IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            try:
-                # Use a dummy address to get local IP
-                s.connect(("8.8.8.8", 80))
-                local_ip = s.getsockname()[0]
-                logger.info(f"System Local IP detected: {local_ip}")
-            except:
-                local_ip = "192.168.18.1" # Default to user's known network
-            finally:
-                s.close()
-            
-            # Check for multiple possible subnets (User is on .18.x)
-            possible_subnets = ["192.168.18", "192.168.1"]
-            current_subnet = ".".join(local_ip.split(".")[:-1])
-            if current_subnet not in possible_subnets:
-                possible_subnets.insert(0, current_subnet)
+        if hosts is None:
+            if use_mdns:
+                with telemetry.span("discovery.esp32.mdns"):
+                    self.found_devices = MDNSDiscovery().discover(on_device=on_device)
+                if self.found_devices or (token and token.cancelled):
+                    return self.found_devices
+                telemetry.incr("discovery.esp32.sweep_fallback")
+                logger.info("mDNS found no blaster, falling back to subnet sweep")
+            hosts = SubnetPlanner(known_ips=self.known_ips).plan()
 
-            threads = []
-            semaphore = threading.BoundedSemaphore(100) # Highly aggressive
-            
-            for subnet in possible_subnets:
-                logger.info(f"Scanning subnet {subnet}.0/24 for TCL IR Blaster...")
-                for i in range(1, 255):
-                    ip = f"{subnet}.{i}"
-                    if ip == local_ip: continue
-                    
-                    def scoped_ping(target_ip):
-                        with semaphore:
-                            self._ping_esp32(target_ip, lock)
+        async def run():
+            async for device in self.scan(hosts, token):
+                if on_device:
+                    on_device(device)
 
-                    t = threading.Thread(target=scoped_ping, args=(ip,))
-                    t.daemon = True
-                    t.start()
-                    threads.append(t)
-            
-            # Wait for threads
-            import time
-            time.sleep(2.0)
-            
+        try:
+            with telemetry.span("discovery.esp32.sweep"):
+                asyncio.run(run())
         except Exception as e:
             logger.error(f"ESP32 Discovery error: {e}")
-            
+
         logger.info(f"ESP32 Discovery found {len(self.found_devices)} devices")
         return self.found_devices
 
-    def _ping_esp32(self, ip, lock):
+    async def scan(self, hosts, token=None):
+        """Async generator yielding each blaster as soon as its /ping answers."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def probe(ip):
+            async with semaphore:
+                return ip if await self._ping_esp32(ip) else None
+
+        tasks = [asyncio.ensure_future(probe(ip)) for ip in dict.fromkeys(hosts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                ip = await next_done
+                if token and token.cancelled:
+                    return
+                if not ip:
+                    continue
+                device = {
+                    'ip': ip,
+                    'name': f"ESP32 Blaster ({ip})",
+                    'type': 'ir',
+                    'method': 'http-scan'
+                }
+                self.found_devices.append(device)
+                logger.info(f"Found ESP32 Blaster at {ip}")
+                yield device
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _ping_esp32(self, ip):
+        writer = None
         try:
-            resp = requests.get(f"http://{ip}/ping", timeout=0.8)
-            if resp.status_code == 200 and "pong" in resp.text.lower():
-                with lock:
-                    if not any(d['ip'] == ip for d in self.found_devices):
-                        self.found_devices.append({
-                            'ip': ip,
-                            'name': f"ESP32 Blaster ({ip})",
-                            'type': 'ir'
-                        })
-                        logger.info(f"Found ESP32 Blaster at {ip}")
-        except:
-            pass
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, self.port), self.probe_timeout)
+            writer.write(f"GET /ping HTTP/1.0\r\nHost: {ip}\r\n\r\n".encode())
+            await writer.drain()
+
+            # The firmware answers "pong" in a tiny HTTP/1.0 response, read it whole
+            response = b""
+            while len(response) < 1024:
+                chunk = await asyncio.wait_for(reader.read(512), self.probe_timeout)
+                if not chunk:
+                    break
+                response += chunk
+
+            status_line = response.split(b"\r\n", 1)[0]
+            return b" 200" in status_line and b"pong" in response.lower()
+        except (OSError, asyncio.TimeoutError):
+            return False
+        finally:
+            if writer:
+                writer.close()
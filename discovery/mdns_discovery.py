@@ -0,0 +1,153 @@
+import socket
+import struct
+import time
+from utils.logger import logger
+
+class MDNSDiscovery:
+    """Finds the ESP32 IR Blaster through mDNS instead of sweeping subnets.
+
+    The firmware registers the host name `tclblaster.local` and the
+    `_tclblaster._tcp` service. A single multicast A query answers in
+    milliseconds; the service browse runs too when zeroconf is installed.
+    """
+
+    MDNS_ADDR = "224.0.0.251"
+    MDNS_PORT = 5353
+    HOSTNAME = "tclblaster.local"
+    SERVICE_TYPE = "_tclblaster._tcp.local."
+
+    def __init__(self):
+        self.found_devices = []
+
+    def discover(self, timeout=1.5, on_device=None):
+        self.found_devices = []
+        ips = self._query_hostname(self.HOSTNAME, timeout)
+        if not ips:
+            ips = self._browse_service(timeout)
+
+        for ip in dict.fromkeys(ips):
+            device = {
+                'ip': ip,
+                'name': f"ESP32 Blaster ({ip})",
+                'type': 'ir',
+                'method': 'mdns'
+            }
+            self.found_devices.append(device)
+            logger.info(f"mDNS resolved ESP32 Blaster at {ip}")
+            if on_device:
+                on_device(device)
+        return self.found_devices
+
+    def _query_hostname(self, hostname, timeout):
+        """Send one multicast A query and collect the addresses in the replies."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        ips = []
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 255)
+            sock.sendto(self._build_query(hostname), (self.MDNS_ADDR, self.MDNS_PORT))
+
+            deadline = time.monotonic() + timeout
+            while not ips:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                sock.settimeout(remaining)
+                try:
+                    data, _ = sock.recvfrom(1500)
+                except socket.timeout:
+                    break
+                ips = self._parse_a_records(data, hostname)
+        except OSError as e:
+            logger.error(f"mDNS query error: {e}")
+        finally:
+            sock.close()
+        return ips
+
+    def _browse_service(self, timeout):
+        """Resolve the registered service type via zeroconf when available."""
+        try:
+            from zeroconf import ServiceBrowser, Zeroconf
+        except ImportError:
+            return []
+
+        names = []
+
+        class _Listener:
+            def add_service(self, zc, type_, name):
+                names.append(name)
+
+            def update_service(self, zc, type_, name):
+                pass
+
+            def remove_service(self, zc, type_, name):
+                pass
+
+        ips = []
+        zc = Zeroconf()
+        try:
+            ServiceBrowser(zc, self.SERVICE_TYPE, _Listener())
+            deadline = time.monotonic() + timeout
+            while not names and time.monotonic() < deadline:
+                time.sleep(0.05)
+            for name in names:
+                info = zc.get_service_info(self.SERVICE_TYPE, name, timeout=int(timeout * 1000))
+                if info:
+                    ips.extend(info.parsed_addresses())
+        except Exception as e:
+            logger.error(f"mDNS browse error: {e}")
+        finally:
+            zc.close()
+        return ips
+
+    @staticmethod
+    def _build_query(hostname):
+        header = struct.pack("!HHHHHH", 0, 0, 1, 0, 0, 0)
+        qname = b"".join(bytes([len(p)]) + p.encode() for p in hostname.split(".")) + b"\x00"
+        # QTYPE A, QCLASS IN with the unicast-response bit set
+        return header + qname + struct.pack("!HH", 1, 0x8001)
+
+    @classmethod
+    def _parse_a_records(cls, data, hostname):
+        try:
+            _, flags, qdcount, ancount, nscount, arcount = struct.unpack("!HHHHHH", data[:12])
+            if not flags & 0x8000:
+                return []  # A query from someone else, not a response
+            offset = 12
+            for _ in range(qdcount):
+                _, offset = cls._read_name(data, offset)
+                offset += 4
+
+            ips = []
+            for _ in range(ancount + nscount + arcount):
+                name, offset = cls._read_name(data, offset)
+                rtype, _, _, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+                offset += 10
+                if offset + rdlength > len(data):
+                    raise ValueError("Truncated DNS record")
+                if rtype == 1 and rdlength == 4 and name.lower() == hostname.lower():
+                    ips.append(socket.inet_ntoa(data[offset:offset + 4]))
+                offset += rdlength
+            return ips
+        except (struct.error, IndexError, ValueError):
+            return []
+
+    @classmethod
+    def _read_name(cls, data, offset):
+        labels = []
+        end = None
+        for _ in range(128):
+            length = data[offset]
+            if length & 0xC0 == 0xC0:
+                # Compression pointer
+                if end is None:
+                    end = offset + 2
+                offset = ((length & 0x3F) << 8) | data[offset + 1]
+                continue
+            offset += 1
+            if length == 0:
+                break
+            labels.append(data[offset:offset + length].decode("utf-8", errors="ignore"))
+            offset += length
+        else:
+            raise ValueError("DNS name too long")
+        return ".".join(labels), (end if end is not None else offset)
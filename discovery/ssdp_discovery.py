@@ -1,7 +1,9 @@
 import socket
-import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from services.device_info import fetch_device_info, fetch_description
 from utils.logger import logger
+from utils.telemetry import telemetry
 
 class SSDPDiscovery:
     """Discovers Roku devices using SSDP."""
@@ -14,16 +16,33 @@ class SSDPDiscovery:
         "urn:dial-multiscreen-org:service:dial:1", # Android TV / Chromecast
         "ssdp:all"
     ]
+    # How often a cancellable scan checks its token while no responses arrive
+    CANCEL_POLL_S = 0.25
 
-    def __init__(self):
+    def __init__(self, ssdp_port=None, interface_ip=None):
         self.found_devices = []
+        if ssdp_port:
+            self.SSDP_PORT = ssdp_port
+        # Send M-SEARCH out of a specific local interface instead of the default route
+        self.interface_ip = interface_ip
 
-    def discover(self, timeout=4):
+    def discover(self, timeout=4, on_device=None, token=None):
+        """Collect SSDP responses for `timeout` seconds.
+
+        on_device is called with a copy of each device as soon as its
+        M-SEARCH response arrives, and again once its friendly name has been
+        resolved. Name lookups run in a small worker pool so a slow TV never
+        stalls the receive loop. A cancelled token ends the scan early.
+        """
         self.found_devices = []
+        seen_ips = set()
+        started = time.perf_counter()
+        resolver_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ssdp-resolve")
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(1.0) # Short recv timeout
         
         try:
+            if self.interface_ip:
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.interface_ip))
             for target in self.TARGETS:
                 ssdp_request = (
                     'M-SEARCH * HTTP/1.1\r\n' +
@@ -35,111 +54,100 @@ class SSDPDiscovery:
                 ).encode('utf-8')
                 sock.sendto(ssdp_request, (self.SSDP_ADDR, self.SSDP_PORT))
             
-            start_time = time.time()
-            while time.time() - start_time < timeout:
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (token and token.cancelled):
+                    break
+                sock.settimeout(min(remaining, self.CANCEL_POLL_S) if token else remaining)
                 try:
                     data, addr = sock.recvfrom(2048)
-                    self._parse_response(data.decode('utf-8', errors='ignore'), addr)
                 except socket.timeout:
                     continue
+
+                if addr[0] in seen_ips:
+                    continue
+                device, name_lookup = self._parse_response(data.decode('utf-8', errors='ignore'), addr)
+                if not device:
+                    continue
+
+                seen_ips.add(device['ip'])
+                self.found_devices.append(device)
+                if len(self.found_devices) == 1:
+                    telemetry.observe("discovery.ssdp.first_device", (time.perf_counter() - started) * 1000.0)
+                logger.info("Discovered %s at %s", device['name'], device['ip'])
+                if on_device:
+                    on_device(dict(device))
+                if name_lookup:
+                    resolver_pool.submit(self._resolve_name, device, name_lookup, on_device)
         except Exception as e:
             logger.error(f"SSDP Discovery error: {e}")
         finally:
             sock.close()
+            resolver_pool.shutdown(wait=True)
+            telemetry.observe("discovery.ssdp", (time.perf_counter() - started) * 1000.0)
             
         return self.found_devices
 
+    def _resolve_name(self, device, name_lookup, on_device):
+        name = name_lookup()
+        if name and name != device['name']:
+            device['name'] = name
+            logger.info(f"Resolved {device['ip']} as {name}")
+            if on_device:
+                on_device(dict(device))
+
     def _parse_response(self, response_text, addr):
+        """Classify a response without network I/O.
+
+        Returns (device, name_lookup) where name_lookup is a callable that
+        fetches the friendly name, or (None, None) for ignored responses.
+        """
         headers = {}
         for line in response_text.split('\r\n'):
             if ':' in line:
                 parts = line.split(':', 1)
                 headers[parts[0].strip().lower()] = parts[1].strip()
         
-        location = headers.get('location', '').lower()
+        raw_location = headers.get('location', '')
+        location = raw_location.lower()
         server = headers.get('server', '').lower()
         st = headers.get('st', '').lower()
         
         ip = addr[0]
-        if any(d['ip'] == ip for d in self.found_devices):
-            return
 
         # Identify Device Type - TCL specific filters
-        device_name = None
-        device_type = None
-        
         if 'roku' in server or 'roku' in location:
             device_type = 'roku'
-            # Try to get actual device name from Roku
-            device_name = self._get_roku_device_name(ip)
-            if not device_name:
-                device_name = f"TCL Roku TV"
+            device_name = "TCL Roku TV"
+            name_lookup = lambda: self._get_roku_device_name(ip)
         elif 'android' in server or 'dial' in server or 'dial' in st:
             device_type = 'android'
-            device_name = self._get_device_name_from_location(headers.get('location', ''))
-            if not device_name:
-                device_name = f"TCL Android TV"
+            device_name = "TCL Android TV"
+            name_lookup = lambda: self._get_device_name_from_location(raw_location)
         elif 'espressif' in server or ':80' in location:
             # Don't label the IR blaster as TCL
-            return
+            return None, None
         elif location:
             device_type = 'generic'
-            device_name = self._get_device_name_from_location(headers.get('location', ''))
-            if not device_name:
-                device_name = f"TCL Smart TV"
+            device_name = "TCL Smart TV"
+            name_lookup = lambda: self._get_device_name_from_location(raw_location)
         else:
-            return
+            return None, None
         
-        self.found_devices.append({
+        return {
             'ip': ip,
             'name': device_name,
-            'type': device_type
-        })
-        logger.info(f"Discovered {device_name} at {ip}")
+            'type': device_type,
+            'method': 'ssdp'
+        }, name_lookup
 
     def _get_roku_device_name(self, ip):
         """Fetch actual device name from Roku ECP."""
-        try:
-            import requests
-            resp = requests.get(f"http://{ip}:8060/query/device-info", timeout=2)
-            if resp.status_code == 200:
-                # Simple XML parsing
-                content = resp.text
-                # Extract friendly name
-                name_start = content.find('<user-device-name>')
-                if name_start != -1:
-                    name_start += len('<user-device-name>')
-                    name_end = content.find('</user-device-name>', name_start)
-                    if name_end != -1:
-                        return content[name_start:name_end].strip()
-                
-                # Fallback to model name
-                model_start = content.find('<model-name>')
-                if model_start != -1:
-                    model_start += len('<model-name>')
-                    model_end = content.find('</model-name>', model_start)
-                    if model_end != -1:
-                        return content[model_start:model_end].strip()
-        except:
-            pass
-        return None
+        info = fetch_device_info(ip, timeout=2)
+        return info.display_name if info else None
 
     def _get_device_name_from_location(self, location_url):
         """Try to fetch device name from UPnP description XML."""
-        if not location_url:
-            return None
-        try:
-            import requests
-            resp = requests.get(location_url, timeout=2)
-            if resp.status_code == 200:
-                content = resp.text
-                # Try to find friendlyName
-                name_start = content.find('<friendlyName>')
-                if name_start != -1:
-                    name_start += len('<friendlyName>')
-                    name_end = content.find('</friendlyName>', name_start)
-                    if name_end != -1:
-                        return content[name_start:name_end].strip()
-        except:
-            pass
-        return None
+        info = fetch_description(location_url)
+        return info.friendly_name if info else None
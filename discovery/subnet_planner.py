@@ -0,0 +1,132 @@
+import socket
+import struct
+from services.network_service import list_ipv4_interfaces
+from utils.logger import logger
+
+ARP_TABLE = "/proc/net/arp"
+ATF_COMPLETE = 0x2
+
+def _ip_to_int(ip):
+    return struct.unpack("!I", socket.inet_aton(ip))[0]
+
+def _int_to_ip(value):
+    return socket.inet_ntoa(struct.pack("!I", value))
+
+def parse_arp_table(text):
+    """Parse /proc/net/arp into [(ip, mac, device)] for resolved entries only."""
+    entries = []
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 6:
+            continue
+        ip, _, flags, mac, _, device = fields[:6]
+        try:
+            if not int(flags, 16) & ATF_COMPLETE or mac == "00:00:00:00:00:00":
+                continue
+        except ValueError:
+            continue
+        entries.append((ip, mac.lower(), device))
+    return entries
+
+def read_arp_table(path=ARP_TABLE):
+    # Android 10+ denies apps access to the neighbour table; that's fine
+    try:
+        with open(path, 'r') as f:
+            return parse_arp_table(f.read())
+    except OSError as e:
+        logger.debug(f"ARP table unavailable: {e}")
+        return []
+
+
+class SubnetPlanner:
+    """Builds an ordered probe list covering only the subnets we are actually on.
+
+    Interfaces and their real netmasks come from the OS, so /23 and /22
+    networks are covered and nothing off-link is scanned. Hosts are ordered
+    by how likely they are to be a blaster:
+
+        1. previously seen addresses (e.g. from the device registry)
+        2. live neighbours from the ARP table
+        3. the rest of the local /24, typical DHCP pool first
+        4. the other /24s of a wider prefix
+    The gateway, our own address, and network/broadcast addresses are never
+    probed. Prefixes wider than max_prefix are clipped to the block around
+    the local address.
+    """
+
+    # Last-octet ranges in the order home routers tend to hand out leases
+    DHCP_RANGES = ((100, 199), (2, 99), (200, 254))
+
+    def __init__(self, interfaces=None, known_ips=(), arp_entries=None, max_prefix=22):
+        self.interfaces = list_ipv4_interfaces() if interfaces is None else interfaces
+        self.known_ips = list(known_ips)
+        self.arp_entries = read_arp_table() if arp_entries is None else arp_entries
+        self.max_prefix = max_prefix
+
+    def subnets(self):
+        """[(network, broadcast, local_ip)] as integers, one per interface, clipped to max_prefix."""
+        subnets = []
+        for name, ip, mask in self.interfaces:
+            ip_int, mask_int = _ip_to_int(ip), _ip_to_int(mask)
+            prefix = bin(mask_int).count("1")
+            if prefix >= 31:
+                continue  # Point-to-point links have no neighbours to scan
+            if prefix < self.max_prefix:
+                logger.info(f"{name}: /{prefix} is too wide to sweep, limiting to the /{self.max_prefix} around {ip}")
+                mask_int = (0xFFFFFFFF << (32 - self.max_prefix)) & 0xFFFFFFFF
+            network = ip_int & mask_int
+            subnets.append((network, network | (~mask_int & 0xFFFFFFFF), ip_int))
+        return subnets
+
+    def _on_link(self, ip_int, subnets):
+        return any(net < ip_int < bcast for net, bcast, _ in subnets)
+
+    def _dhcp_order(self, network, broadcast, local_ip):
+        local_block = local_ip & 0xFFFFFF00
+        blocks = sorted(range(network & 0xFFFFFF00, broadcast + 1, 256),
+                        key=lambda block: (block != local_block, abs(block - local_block)))
+        for block in blocks:
+            for low, high in self.DHCP_RANGES:
+                for octet in range(low, high + 1):
+                    yield block | octet
+            # .0 and .255 are usable host addresses inside a wider prefix
+            yield block | 1
+            yield block
+            yield block | 255
+
+    def plan(self):
+        """Ordered list of host IPs to probe."""
+        subnets = self.subnets()
+        if not subnets:
+            logger.warning("No local IPv4 network found, probing known addresses only")
+            return list(dict.fromkeys(self.known_ips))
+
+        skip = {local for _, _, local in subnets}
+        # The gateway is the router, not a blaster
+        skip.update(net | 1 for net, _, _ in subnets)
+
+        ordered = []
+        seen = set()
+
+        def add(ip_int):
+            if ip_int not in seen and ip_int not in skip and self._on_link(ip_int, subnets):
+                seen.add(ip_int)
+                ordered.append(ip_int)
+
+        for ip in self.known_ips:
+            try:
+                add(_ip_to_int(ip))
+            except OSError:
+                continue
+        for ip, _, _ in self.arp_entries:
+            try:
+                add(_ip_to_int(ip))
+            except OSError:
+                continue
+        for network, broadcast, local_ip in subnets:
+            for ip_int in self._dhcp_order(network, broadcast, local_ip):
+                add(ip_int)
+
+        for network, broadcast, _ in subnets:
+            logger.info(f"Sweep covers {_int_to_ip(network)}-{_int_to_ip(broadcast)}")
+        return [_int_to_ip(ip_int) for ip_int in ordered]
@@ -1,4 +1,5 @@
 #include <WiFi.h>
+#include <WiFiUdp.h>
 #include <WebServer.h>
 #include <ESPmDNS.h>
 #include <IRremoteESP8266.h>
@@ -15,6 +16,31 @@ WebServer server(80);
 IRsend irsend(kIrLed);
 Preferences preferences;
 
+// ================= IR CODE SLOT CACHE =================
+// The app pushes its code set once; presses then only send ?slot=N.
+const uint8_t kMaxSlots = 64;
+const uint16_t kMaxRawLen = 256;
+// Bound how long one batch can block handleClient()
+const uint8_t kMaxBatchItems = 32;
+const uint16_t kMaxBatchSends = 64;
+const uint16_t kMaxBatchGapMs = 1000;
+
+// ================= UDP COMMAND CHANNEL =================
+// Frame <2sBHBB: "IR", version, seq, slot, repeat. Ack <2sHB: "IA", seq, status.
+const uint16_t kUdpPort = 4210;
+const uint8_t kUdpVersion = 1;
+const uint16_t kRepeatGapMs = 110;  // One NEC frame period between repeats
+const uint8_t kAckOk = 0;
+const uint8_t kAckEmptySlot = 1;
+const uint8_t kAckBadFrame = 2;
+WiFiUDP udp;
+bool udpStarted = false;
+bool haveLastSeq = false;
+uint16_t lastSeq = 0;
+uint8_t lastStatus = 0;
+String irSlots[kMaxSlots];
+Preferences slotPrefs;
+
 void setup() {
   pinMode(kStatusLed, OUTPUT);
   Serial.begin(115200);
@@ -52,6 +78,7 @@ void setup() {
 
 void loop() {
   server.handleClient();
+  if (udpStarted) handleUdp();
   if (WiFi.status() != WL_CONNECTED && WiFi.getMode() == WIFI_AP) {
     // Slow pulse in AP mode to show it's waiting for user
     static unsigned long lastUpdate = 0;
@@ -67,6 +94,14 @@ void startMainServer() {
   server.on("/", [](){ server.send(200, "text/plain", "TCL Blaster Ready"); });
   server.on("/ping", [](){ server.send(200, "text/plain", "pong"); });
   server.on("/ir", handleIr);
+  server.on("/ir/store", handleIrStore);
+  server.on("/ir/sig", handleIrSig);
+  server.on("/ir/batch", HTTP_POST, handleIrBatch);
+  // Capabilities the app negotiates at connect time
+  server.on("/caps", [](){
+    server.send(200, "text/plain", "udp=" + String(kUdpPort) + " slots=" + String(kMaxSlots) + " batch=1");
+  });
+  loadSlots();
   server.on("/reset", [](){
       preferences.clear();
       server.send(200, "text/plain", "Resetting Wi-Fi... Rebooting.");
@@ -74,6 +109,10 @@ void startMainServer() {
       ESP.restart();
   });
   server.begin();
+  udpStarted = udp.begin(kUdpPort);
+  // Advertise services so the app can find us without sweeping subnets
+  MDNS.addService("http", "tcp", 80);
+  MDNS.addService("tclblaster", "tcp", 80);
 }
 
 void startConfigPortal() {
@@ -116,24 +155,214 @@ void handleWifiSave() {
   }
 }
 
+void loadSlots() {
+  slotPrefs.begin("ircodes", true);
+  for (uint8_t i = 0; i < kMaxSlots; i++) {
+    irSlots[i] = slotPrefs.getString(("s" + String(i)).c_str(), "");
+  }
+  slotPrefs.end();
+}
+
+void handleIrStore() {
+  if (!server.hasArg("slot") || !server.hasArg("code")) {
+    server.send(400, "text/plain", "slot and code required");
+    return;
+  }
+  int slot = server.arg("slot").toInt();
+  if (slot < 0 || slot >= kMaxSlots) {
+    server.send(400, "text/plain", "slot out of range");
+    return;
+  }
+  irSlots[slot] = server.arg("code");
+  slotPrefs.begin("ircodes", false);
+  slotPrefs.putString(("s" + String(slot)).c_str(), irSlots[slot]);
+  slotPrefs.end();
+  server.send(200, "text/plain", "Stored");
+}
+
+void handleIrSig() {
+  // GET returns the signature of the cached code set, ?set= replaces it
+  slotPrefs.begin("ircodes", server.hasArg("set") ? false : true);
+  if (server.hasArg("set")) {
+    slotPrefs.putString("sig", server.arg("set"));
+  }
+  String sig = slotPrefs.getString("sig", "");
+  slotPrefs.end();
+  server.send(200, "text/plain", sig);
+}
+
+// Codes look like NEC_0x40BF12ED, RC5_0xC:13 or RAW_38_9000,4500,560,...
+bool sendCode(const String& codeStr) {
+  int splitIndex = codeStr.indexOf('_');
+  if (splitIndex < 0) return false;
+  String protocol = codeStr.substring(0, splitIndex);
+  String payload = codeStr.substring(splitIndex + 1);
+
+  if (protocol.equalsIgnoreCase("RAW")) {
+    int khzEnd = payload.indexOf('_');
+    if (khzEnd < 0) return false;
+    uint16_t khz = payload.substring(0, khzEnd).toInt();
+    static uint16_t raw[kMaxRawLen];
+    uint16_t len = 0;
+    int pos = khzEnd + 1;
+    while (pos < (int)payload.length() && len < kMaxRawLen) {
+      int comma = payload.indexOf(',', pos);
+      if (comma < 0) comma = payload.length();
+      raw[len++] = payload.substring(pos, comma).toInt();
+      pos = comma + 1;
+    }
+    irsend.sendRaw(raw, len, khz);
+    return true;
+  }
+
+  int bitsIndex = payload.indexOf(':');
+  String hexValStr = bitsIndex < 0 ? payload : payload.substring(0, bitsIndex);
+  uint64_t data = strtoull(hexValStr.c_str(), NULL, 16);
+
+  if (protocol.equalsIgnoreCase("NEC")) {
+      irsend.sendNEC(data, bitsIndex < 0 ? 32 : payload.substring(bitsIndex + 1).toInt());
+  } else if (protocol.equalsIgnoreCase("SAMSUNG")) {
+      irsend.sendSamsung(data, bitsIndex < 0 ? 32 : payload.substring(bitsIndex + 1).toInt());
+  } else if (protocol.equalsIgnoreCase("RC5")) {
+      irsend.sendRC5(data, bitsIndex < 0 ? 13 : payload.substring(bitsIndex + 1).toInt());
+  } else if (protocol.equalsIgnoreCase("RC6")) {
+      irsend.sendRC6(data, bitsIndex < 0 ? 20 : payload.substring(bitsIndex + 1).toInt());
+  } else if (protocol.equalsIgnoreCase("SONY")) {
+      irsend.sendSony(data, bitsIndex < 0 ? 12 : payload.substring(bitsIndex + 1).toInt());
+  } else {
+      return false;
+  }
+  return true;
+}
+
+// Resolve "#<slot>" to the cached code, anything else is a literal code
+bool resolveCode(const String& ref, String& codeStr) {
+  if (!ref.startsWith("#")) {
+    codeStr = ref;
+    return true;
+  }
+  int slot = ref.substring(1).toInt();
+  if (slot < 0 || slot >= kMaxSlots || irSlots[slot] == "") return false;
+  codeStr = irSlots[slot];
+  return true;
+}
+
+// POST /ir/batch?gap=<ms> with one "<count> <#slot|code>" line per item.
+// Everything is validated before the first code goes out, so a rejected
+// batch never sends half a sequence.
+void handleIrBatch() {
+  String body = server.arg("plain");
+  uint16_t gapMs = server.hasArg("gap") ? server.arg("gap").toInt() : 100;
+  if (gapMs > kMaxBatchGapMs) gapMs = kMaxBatchGapMs;
+
+  String codes[kMaxBatchItems];
+  uint8_t counts[kMaxBatchItems];
+  uint8_t items = 0;
+  uint16_t total = 0;
+  int pos = 0;
+  while (pos < (int)body.length()) {
+    int end = body.indexOf('\n', pos);
+    if (end < 0) end = body.length();
+    String line = body.substring(pos, end);
+    line.trim();
+    pos = end + 1;
+    if (line.length() == 0) continue;
+
+    int space = line.indexOf(' ');
+    if (space < 0 || items >= kMaxBatchItems) {
+      server.send(400, "text/plain", "Bad batch");
+      return;
+    }
+    int count = line.substring(0, space).toInt();
+    if (count < 1 || total + count > kMaxBatchSends) {
+      server.send(400, "text/plain", "Bad repeat count");
+      return;
+    }
+    if (!resolveCode(line.substring(space + 1), codes[items])) {
+      server.send(404, "text/plain", "Empty slot");
+      return;
+    }
+    counts[items++] = count;
+    total += count;
+  }
+
+  digitalWrite(kStatusLed, LOW);
+  uint16_t sent = 0;
+  for (uint8_t i = 0; i < items; i++) {
+    for (uint8_t r = 0; r < counts[i]; r++) {
+      if (sent++ > 0) delay(gapMs);
+      if (!sendCode(codes[i])) {
+        digitalWrite(kStatusLed, HIGH);
+        server.send(400, "text/plain", "Unknown protocol");
+        return;
+      }
+    }
+  }
+  digitalWrite(kStatusLed, HIGH);
+  server.send(200, "text/plain", "Sent " + String(sent));
+}
+
+void sendUdpAck(uint16_t seq, uint8_t status) {
+  uint8_t ack[5] = {'I', 'A', (uint8_t)(seq & 0xFF), (uint8_t)(seq >> 8), status};
+  udp.beginPacket(udp.remoteIP(), udp.remotePort());
+  udp.write(ack, sizeof(ack));
+  udp.endPacket();
+}
+
+void handleUdp() {
+  int len = udp.parsePacket();
+  if (len <= 0) return;
+  uint8_t frame[7];
+  if (len != sizeof(frame) || udp.read(frame, sizeof(frame)) != sizeof(frame)
+      || frame[0] != 'I' || frame[1] != 'R' || frame[2] != kUdpVersion) {
+    udp.flush();
+    return;  // Not ours; without a valid seq there is nothing to ack
+  }
+  uint16_t seq = frame[3] | (frame[4] << 8);
+  uint8_t slot = frame[5];
+  uint8_t repeat = frame[6] ? frame[6] : 1;
+
+  // Retransmit of a frame we already handled: ack again, don't fire twice
+  if (haveLastSeq && seq == lastSeq) {
+    sendUdpAck(seq, lastStatus);
+    return;
+  }
+  uint8_t status = kAckOk;
+  if (slot >= kMaxSlots || irSlots[slot] == "") status = kAckEmptySlot;
+  haveLastSeq = true;
+  lastSeq = seq;
+  lastStatus = status;
+  // Ack before emitting so the app isn't waiting on the IR frame itself
+  sendUdpAck(seq, status);
+  if (status != kAckOk) return;
+
+  digitalWrite(kStatusLed, LOW);
+  for (uint8_t r = 0; r < repeat; r++) {
+    if (r) delay(kRepeatGapMs);
+    sendCode(irSlots[slot]);
+  }
+  digitalWrite(kStatusLed, HIGH);
+}
+
 void handleIr() {
-  if (server.hasArg("code")) {
-    String codeStr = server.arg("code");
-    // Pulse status LED to show ingestion
-    digitalWrite(kStatusLed, LOW); 
-    
-    int splitIndex = codeStr.indexOf('_');
-    String protocol = codeStr.substring(0, splitIndex);
-    String hexValStr = codeStr.substring(splitIndex + 1);
-    uint64_t data = strtoull(hexValStr.c_str(), NULL, 16);
-
-    if (protocol.equalsIgnoreCase("NEC")) {
-        irsend.sendNEC(data, 32); 
-    } else if (protocol.equalsIgnoreCase("SAMSUNG")) {
-        irsend.sendSamsung(data, 32);
+  String codeStr;
+  if (server.hasArg("slot")) {
+    int slot = server.arg("slot").toInt();
+    if (slot < 0 || slot >= kMaxSlots || irSlots[slot] == "") {
+      server.send(404, "text/plain", "Empty slot");
+      return;
     }
-    
-    digitalWrite(kStatusLed, HIGH); 
-    server.send(200, "text/plain", "Sent");
+    codeStr = irSlots[slot];
+  } else if (server.hasArg("code")) {
+    codeStr = server.arg("code");
+  } else {
+    server.send(400, "text/plain", "code or slot required");
+    return;
   }
+
+  // Pulse status LED to show ingestion
+  digitalWrite(kStatusLed, LOW); 
+  bool sent = sendCode(codeStr);
+  digitalWrite(kStatusLed, HIGH); 
+  server.send(sent ? 200 : 400, "text/plain", sent ? "Sent" : "Unknown protocol");
 }
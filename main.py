@@ -1,4 +1,5 @@
-import threading
+# Imported first so the startup timeline covers everything below
+from utils.startup import timeline
 import time
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
@@ -6,18 +7,22 @@ from kivy.properties import StringProperty, ObjectProperty, ListProperty, Boolea
 from kivy.clock import Clock
 from kivy.lang import Builder
 
-# New Structure Imports
-from controllers.roku_controller import RokuController
-from controllers.ir_controller import IRController
-from discovery.ssdp_discovery import SSDPDiscovery
-from discovery.esp32_discovery import ESP32Discovery
-from services.network_service import send_wol
-from services.power_service import PowerService
-from android_bridge.wifi_info import get_wifi_details
+# New Structure Imports. Controllers, discovery, power and anything that
+# pulls in requests are imported on first use to keep cold start short.
+from services.scheduler import Scheduler
+from services.session_manager import SessionManager
+from services.transport_manager import TransportManager
+from services.health_monitor import HealthMonitor
+from services.executor import BACKGROUND, INTERACTIVE, NORMAL, CancelToken, Executor
+from services.input_dispatcher import InputDispatcher
 from utils.storage import Storage
-from utils.ui_utils import show_error
-from utils.constants import DEFAULT_IR_BLASTER_IP
+from utils.ui_utils import ask_text, show_error
+from utils.constants import DEFAULT_IR_BLASTER_IP, DEFAULT_LAUNCHER_APPS
 from utils.logger import logger
+from utils.telemetry import telemetry
+
+timeline.add_hook(lambda phase, ms: telemetry.observe("startup." + phase, ms))
+timeline.mark('import')
 
 class DiscoveryScreen(Screen):
     """Screen for scanning and selecting devices."""
@@ -31,22 +36,16 @@ class DiscoveryScreen(Screen):
         # Clear previous results and show scanning message
         self.ids.rv_devices.data = [{'text': "Scanning network for TCL devices..."}]
         logger.info("User initiated network scan")
-        
-        def run_discovery():
-            logger.info("Starting SSDP discovery for TVs...")
-            roku_devices = SSDPDiscovery().discover()
-            logger.info(f"SSDP found {len(roku_devices)} TV(s)")
-            
-            logger.info("Starting ESP32 discovery for IR Blasters...")
-            esp32_devices = ESP32Discovery().discover()
-            logger.info(f"ESP32 scan found {len(esp32_devices)} blaster(s)")
-            
-            all_devices = roku_devices + esp32_devices
-            Clock.schedule_once(lambda dt: self._update_list(all_devices), 0)
+        # Joins a scan already running, e.g. the blaster search, instead of starting another
+        self._scan = App.get_running_app().discovery.scan(on_device=self._add_device, on_done=self._update_list)
 
-        threading.Thread(target=run_discovery, daemon=True).start()
+    def _add_device(self, dev):
+        """Record a streamed discovery result and refresh the list while scanning."""
+        Storage.device_registry().record(dev)
+        if not self._scan.done:
+            self._update_list(self._scan.devices(), scanning=True)
 
-    def _update_list(self, devices):
+    def _update_list(self, devices, scanning=False):
         data = []
         if not devices:
             data.append({'text': "No devices found. Ensure Wi-Fi is on and TV is powered."})
@@ -79,6 +78,9 @@ class DiscoveryScreen(Screen):
                 'markup': True,
                 'on_release': lambda d=dev: App.get_running_app().connect_to_device(d)
             })
+
+        if scanning:
+            data.append({'text': "Still scanning..."})
         
         self.ids.rv_devices.data = data
         logger.info("Device list updated in UI")
@@ -97,6 +99,24 @@ class SettingsScreen(Screen):
         logger.info(f"Settings updated. ESP32 IP: {new_ip}")
         App.get_running_app().switch_screen('discovery')
 
+class DiagnosticsScreen(Screen):
+    """Live telemetry: per-path command latency, discovery timings, fallbacks."""
+    report_text = StringProperty("")
+
+    def on_enter(self):
+        self.refresh(0)
+        self._refresh_event = Clock.schedule_interval(self.refresh, 2)
+
+    def on_leave(self):
+        self._refresh_event.cancel()
+
+    def refresh(self, dt):
+        self.report_text = telemetry.format_report() if telemetry.enabled else "Telemetry is disabled."
+
+    def export(self):
+        path = telemetry.export(Storage.data_path("telemetry.json"))
+        show_error(f"Telemetry written to {path}" if path else "Telemetry export failed.")
+
 class ControlScreen(Screen):
     """Main remote control interface."""
     pass # Managed via smartremote.kv and App methods
@@ -117,50 +137,168 @@ class SmartRemoteApp(App):
     blaster_status = StringProperty("Searching for Blaster...")
     blaster_found = BooleanProperty(False)
     
+    launcher_apps = ListProperty([dict(a) for a in DEFAULT_LAUNCHER_APPS])
+    # Labels of every open TV session, for the room switcher
+    session_labels = ListProperty([])
+    scheduled_jobs_text = StringProperty("No timers set")
+    # The active TV accepts typed text (Roku search boxes)
+    text_entry_enabled = BooleanProperty(False)
+    
     controller = ObjectProperty(None, allownone=True)
+    command_queue = None
+    input = None
+    _power_on_future = None
+    # Wrong codes allowed before an Android TV pairing is given up
+    MAX_PAIRING_ATTEMPTS = 3
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Presses made while a power-on is still waiting for the TV, and
+        # the session key (TV IP) they are held for
+        self._pending_commands = []
+        self._pending_for = None
+        # Ids of power_on jobs whose prewarm already woke the TV
+        self._prewarmed_jobs = set()
+        # Connected TVs, each with its own controller, queue and transports
+        self.sessions = SessionManager()
+        self._session_keys = {}  # session label -> session key
+        # Picks ECP or IR per command from live latency/error stats.
+        # Points at the active session's manager once a TV is connected.
+        self.transports = self._new_transports()
+        self._active_path = None
+        # Heartbeats for the TV and blaster push state changes to the UI
+        self.health = HealthMonitor()
+        self.health.add_listener(self._on_health_change)
+        self.scheduler = None
+        # One bounded pool for connects, scans and syncs; callbacks land on the UI thread
+        self._on_ui_thread = lambda fn: Clock.schedule_once(lambda dt: fn(), 0)
+        self.executor = Executor(max_workers=3, name="app", dispatch=self._on_ui_thread)
+        self._discovery = None
     
+    @property
+    def discovery(self):
+        """Scan coordinator, created on the first scan so discovery stays out of startup."""
+        if self._discovery is None:
+            from discovery.coordinator import DiscoveryCoordinator
+            self._discovery = DiscoveryCoordinator(self.executor, dispatch=self._on_ui_thread,
+                                                   known_blaster_ips=self.known_blaster_ips)
+        return self._discovery
+
     def on_start(self):
+        # Only local work before the first frame; the network, Android APIs
+        # and background threads wait for _on_first_frame.
+        cached_blasters = Storage.device_registry().devices(dev_type='ir')
+        if cached_blasters:
+            self.ir_blaster_ip = cached_blasters[0]['ip']
+        from kivy.core.window import Window
+        Window.bind(on_flip=self._on_first_frame)
+
+    def _on_first_frame(self, window):
+        window.unbind(on_flip=self._on_first_frame)
+        timeline.mark('first_frame')
+        # Let the frame reach the screen before starting network work
+        Clock.schedule_once(self._start_background, 0)
+
+    def _start_background(self, dt):
         # 1. Detect Wi-Fi SSID
         self._refresh_wifi_status(0)
         logger.info(f"Current Environment Status: {self.wifi_info_text}")
         
-        # 2. Skip auto-reconnect - let user scan for fresh devices
-        # This ensures the discovery screen shows current network state
-        logger.info("Skipping auto-reconnect. User will scan for devices.")
+        # 2. Warm start: reconnect to the last TV from the device cache
+        registry = Storage.device_registry()
+        cached_tv = registry.warm_start_candidate()
+        if cached_tv:
+            logger.info(f"Warm start: reconnecting to cached {cached_tv['ip']}")
+            self.connect_to_device(cached_tv, silent=True)
         
-        # 3. Schedule periodic Wi-Fi check and initial Blaster search
+        # 3. Timed power actions; anything that came due while the app was closed runs now
+        self.scheduler = Scheduler(Storage.data_path("schedule.json"), self._on_job_due,
+                                   on_prewarm=self._on_job_prewarm)
+        self.scheduler.start()
+        self._refresh_jobs_text()
+
+        # 4. Schedule periodic Wi-Fi check, blaster heartbeats and cache revalidation.
+        # A blaster that misses its first heartbeat triggers the network search.
         Clock.schedule_interval(self._refresh_wifi_status, 10)
-        threading.Thread(target=self._initial_blaster_search, daemon=True).start()
+        self._watch_blaster(self.ir_blaster_ip)
+        self.health.start()
+        self.executor.submit(registry.revalidate, lane=BACKGROUND, key='revalidate')
+
+    def on_stop(self):
+        # Release pooled keep-alive sockets to the TV and blaster
+        from services.http_pool import get_default_transport
+        self.health.stop()
+        self.executor.shutdown()
+        if self.scheduler:
+            self.scheduler.stop()
+        self.sessions.close_all()
+        self.transports.shutdown()
+        get_default_transport().close()
+        if telemetry.enabled:
+            telemetry.export(Storage.data_path("telemetry.json"))
 
-    def _initial_blaster_search(self):
-        """Silently find the IR Blaster in the background at startup."""
+    def _watch_blaster(self, blaster_ip):
+        host, _, port = blaster_ip.partition(':')
+        self.health.watch('blaster', host, int(port) if port else 80, path='/ping')
+
+    def _on_health_change(self, name, is_up):
+        """Heartbeat state change, called from the health monitor thread."""
+        if name == 'blaster':
+            # The blaster backs every open session
+            for transports in self._all_transports():
+                (transports.mark_up if is_up else transports.mark_down)('ir')
+            if is_up:
+                from controllers.ir_controller import IRController
+                # Push the IR code set into the blaster's slot cache once and open
+                # its UDP channel, which every session's IR path then shares
+                self.executor.submit(IRController(self.ir_blaster_ip).prepare_blaster, lane=NORMAL,
+                                     key='sync_codes')
+            if not is_up:
+                Clock.schedule_once(lambda dt: self._search_for_blaster(), 0)
+        elif name == 'tv':
+            (self.transports.mark_up if is_up else self.transports.mark_down)('ecp')
+            if self.controller:
+                self.controller.is_connected = is_up
+        Clock.schedule_once(lambda dt: self._apply_health(name, is_up), 0)
+
+    def _apply_health(self, name, is_up):
+        if name == 'blaster':
+            self.blaster_found = is_up
+            if is_up:
+                self.blaster_status = f"Blaster Online: {self.ir_blaster_ip}"
+        elif name == 'tv':
+            if is_up:
+                self._set_transport_mode(self._active_path or 'ecp')
+            else:
+                self.connection_status_color = [0.8, 0.2, 0.2, 1] # Red
+
+    def _search_for_blaster(self):
+        """Find the IR Blaster on the network after it stopped answering heartbeats."""
         self.blaster_status = "Scanning network..."
         logger.info("Starting background search for TCL IR Blaster...")
-        
-        # 1. Try currently set IP
-        test_ctrl = IRController(self.ir_blaster_ip)
-        if test_ctrl.connect():
-            self.blaster_status = f"Blaster Online: {self.ir_blaster_ip}"
-            self.blaster_found = True
-            return
+        # mDNS first, then the multi-subnet sweep. Joins a running user scan;
+        # a finished one is not reused since it may predate the outage.
+        from discovery.coordinator import BLASTERS
+        self.discovery.scan(kinds=(BLASTERS,), on_done=self._on_blaster_search_done, force=True)
 
-        # 2. Aggressive Multi-Subnet Scan
-        from discovery.esp32_discovery import ESP32Discovery
-        blasters = ESP32Discovery().discover()
-        
+    def _on_blaster_search_done(self, devices):
+        blasters = [d for d in devices if d.get('type') == 'ir']
         if blasters:
+            Storage.device_registry().record(blasters[0])
+            self.blaster_status = f"Blaster Found: {blasters[0]['ip']}"
+            # Retargets the heartbeat, which then reports the blaster online
             self.ir_blaster_ip = blasters[0]['ip']
-            self.blaster_status = f"Blaster Found: {self.ir_blaster_ip}"
-            self.blaster_found = True
             logger.info(f"Auto-configured Blaster to {self.ir_blaster_ip}")
-            # Refresh controller if active
-            if self.is_ir_mode and self.controller:
-                self.controller.ip_address = self.ir_blaster_ip
         else:
             self.blaster_status = "Blaster Offline (Check Blue Light)"
             self.blaster_found = False
 
+    def known_blaster_ips(self):
+        """Blaster addresses seen before, most recent first, for the sweep to try first."""
+        return [d['ip'] for d in Storage.device_registry().devices(dev_type='ir', include_expired=True)]
+
     def _refresh_wifi_status(self, dt):
+        from android_bridge.wifi_info import get_wifi_details
         details = get_wifi_details()
         self.wifi_connected = (details['status'] == "Connected")
         
@@ -178,93 +316,368 @@ class SmartRemoteApp(App):
         self.sm.add_widget(DiscoveryScreen(name='discovery'))
         self.sm.add_widget(ControlScreen(name='control'))
         self.sm.add_widget(SettingsScreen(name='settings'))
+        self.sm.add_widget(DiagnosticsScreen(name='diagnostics'))
+        timeline.mark('build')
         return self.sm
 
-    def connect_to_device(self, device_info):
-        """Initialize appropriate controller and verify connection."""
+    def connect_to_device(self, device_info, silent=False):
+        """Initialize appropriate controller and verify connection.
+
+        silent suppresses the failure popup (used for cached warm-start).
+        """
         ip = device_info['ip']
         dev_type = device_info.get('type', 'unknown')
         self.connected_device_name = f"Connecting to {ip}..."
+        session = self.sessions.get(ip)
+        if session and session.controller.is_connected:
+            # Already connected in the background: switch without a round-trip
+            self.switch_device(ip)
+            return
         logger.info(f"Connection attempt: {ip} (Type: {dev_type})")
         
-        def connection_task():
+        def connection_task(token):
+            """Returns the connected controller, or None."""
+            from controllers.androidtv_controller import AndroidTVController
+            from controllers.ir_controller import IRController
+            from controllers.roku_controller import RokuController
+
             if dev_type == 'ir':
                 new_controller = IRController(ip)
-            elif dev_type == 'android' or dev_type == 'generic':
-                logger.info(f"Android/Generic TV detected ({ip}). Requiring IR Blaster for control.")
-                # We prioritize the blaster IP entered in settings
-                new_controller = IRController(self.ir_blaster_ip)
-                # For Android, we ALWAYS succeed the 'connection' to the UI
-                # but we will show the status of the Blaster separately.
-                new_controller.connect() # Try it, but don't block on failure
-                Clock.schedule_once(lambda dt: self._on_connection_success(new_controller, device_info), 0)
-                return
+            elif dev_type == 'android':
+                # Direct Wi-Fi control over the Android TV remote protocol
+                android = AndroidTVController(ip, cert_dir=Storage.data_path("androidtv"))
+                if android.connect():
+                    return android
+                if android.needs_pairing and not silent and not token.cancelled:
+                    Clock.schedule_once(lambda dt: self.pair_android_tv(device_info), 0)
+                logger.info(f"Android TV remote unavailable for {ip}, using the IR Blaster")
+                return IRController(self.ir_blaster_ip)
+            elif dev_type == 'generic':
+                logger.info(f"Generic TV detected ({ip}). Requiring IR Blaster for control.")
+                # We prioritize the blaster IP entered in settings.
+                # We ALWAYS succeed the 'connection' to the UI;
+                # the health monitor reports the Blaster status separately.
+                return IRController(self.ir_blaster_ip)
             else:
                 new_controller = RokuController(ip)
             
             logger.info(f"Calling connect() on {type(new_controller).__name__}")
             if new_controller.connect():
                 logger.info("Connection successful!")
-                Clock.schedule_once(lambda dt: self._on_connection_success(new_controller, device_info), 0)
+                return new_controller
+            logger.error(f"Connection failed for controller: {type(new_controller).__name__}")
+            return None
+
+        def on_result(controller):
+            if controller:
+                self._on_connection_success(controller, device_info)
+            else:
+                self._on_connection_failure(ip, silent)
+
+        # A newer connect supersedes this one; its result is then dropped
+        token = CancelToken()
+        self.executor.submit(connection_task, token, lane=INTERACTIVE, key='connect', token=token,
+                             on_result=on_result)
+
+    def pair_android_tv(self, device_info):
+        """Pair with an Android TV: it shows a code, the user types it in."""
+        from controllers.androidtv_controller import AndroidTVCredentials, AndroidTVPairing
+
+        ip = device_info['ip']
+        pairing = AndroidTVPairing(ip, AndroidTVCredentials(Storage.data_path("androidtv")))
+        attempts = [0]
+
+        def on_code(code):
+            attempts[0] += 1
+            self.executor.submit(pairing.finish, code, lane=INTERACTIVE, on_result=on_finished)
+
+        def on_cancel():
+            logger.info(f"Android TV pairing with {ip} cancelled")
+            self.executor.submit(pairing.close, lane=INTERACTIVE)
+
+        def on_finished(paired):
+            if paired:
+                self.connect_to_device(device_info)
+            elif pairing.in_progress and attempts[0] < self.MAX_PAIRING_ATTEMPTS:
+                ask_text("Pair Android TV", "That code didn't match. Try again:", on_code, "PAIR", on_cancel)
+            else:
+                self.executor.submit(pairing.close, lane=INTERACTIVE)
+                show_error("Pairing with the TV failed.")
+
+        def on_started(started):
+            if started:
+                ask_text("Pair Android TV", f"Enter the code shown on the TV ({ip}):", on_code, "PAIR", on_cancel)
             else:
-                logger.error(f"Connection failed for controller: {type(new_controller).__name__}")
-                Clock.schedule_once(lambda dt: self._on_connection_failure(ip), 0)
+                show_error("Could not start pairing with the TV.")
 
-        threading.Thread(target=connection_task, daemon=True).start()
+        self.executor.submit(pairing.start, lane=INTERACTIVE, on_result=on_started)
 
     def _on_connection_success(self, controller, dev_info):
-        self.controller = controller
-        self.connected_device_name = dev_info.get('name', 'Connected Device')
-        self.is_ir_mode = isinstance(controller, IRController)
-        
-        # UI Status Color: Green for Wi-Fi, Orange for IR
-        self.connection_status_color = [1, 0.6, 0, 1] if self.is_ir_mode else [0, 0.8, 0.3, 1]
+        timeline.mark('first_device_ready')
+        # One session per TV: its own queue and transports, kept open in the background
+        transports = self._new_transports()
+        self._configure_transports(transports, controller)
+        session = self.sessions.open(dev_info, controller, transports)
+        session.input = self._new_input(session)
+        self._activate_session(session)
         
         # Persist device metadata (including MAC for WOL)
-        dev_info['mac'] = getattr(self.controller, 'mac_address', dev_info.get('mac'))
+        dev_info['mac'] = getattr(self.controller, 'mac_address', None) or dev_info.get('mac')
+        dev_info['model'] = getattr(self.controller, 'model_name', None) or dev_info.get('model')
         Storage.save_last_device(dev_info)
+        Storage.device_registry().record(dev_info, connected=True)
         
         if self.sm.current != 'control':
             self.switch_screen('control')
 
-    def _on_connection_failure(self, ip):
+    def _activate_session(self, session):
+        """Point presses, health checks and the UI at an open session."""
+        from controllers.roku_controller import RokuController
+
+        self.sessions.activate(session.key)
+        controller = session.controller
+        self.controller = controller
+        self.command_queue = session.queue
+        self.input = session.input
+        self.transports = session.transports
+        if session.key == self._pending_for:
+            # The TV that was booting answered; a room switch elsewhere keeps them held
+            for cmd_key in self._pending_commands:
+                self.command_queue.submit(self._execute_with_fallback, self.transports, 'send_key', cmd_key)
+            self._pending_commands.clear()
+        self.connected_device_name = session.device_info.get('name', 'Connected Device')
+        if isinstance(controller, RokuController):
+            self.health.watch('tv', controller.ip_address, controller.port)
+            self._load_app_catalog(controller)
+        else:
+            self.health.unwatch('tv')
+            self.launcher_apps = [dict(a) for a in DEFAULT_LAUNCHER_APPS]
+        self._set_transport_mode(self._primary_path(controller))
+        self.text_entry_enabled = hasattr(controller, 'text_stream')
+        self._refresh_session_labels()
+
+    def switch_device(self, key):
+        """Switch to an already connected TV instantly."""
+        session = self.sessions.get(key)
+        if session is None:
+            return False
+        logger.info(f"Switching to open session {key}")
+        self._activate_session(session)
+        Storage.save_last_device(session.device_info)
+        if self.sm.current != 'control':
+            self.switch_screen('control')
+        return True
+
+    def switch_device_label(self, label):
+        key = self._session_keys.get(label)
+        if key and (not self.sessions.active or self.sessions.active.key != key):
+            self.switch_device(key)
+
+    def _refresh_session_labels(self):
+        self._session_keys = {f"{s.name} ({s.key})": s.key for s in self.sessions.sessions()}
+        self.session_labels = list(self._session_keys)
+
+    def all_off(self):
+        """Power off every connected TV in parallel."""
+        future = self.sessions.power_off_all()
+        future.add_done_callback(lambda f: Clock.schedule_once(lambda dt: self._on_all_off(f.result()), 0))
+
+    def _on_all_off(self, results):
+        failed = [key for key, ok in results.items() if not ok]
+        if failed:
+            show_error(f"Could not power off: {', '.join(failed)}")
+        logger.info(f"All off: {len(results) - len(failed)}/{len(results)} TV(s) confirmed")
+
+    def _new_transports(self):
+        transports = TransportManager()
+        # Only the active session's path changes are shown in the UI
+        transports.on_path_used = lambda name: self._on_path_used(name) if transports is self.transports else None
+        return transports
+
+    def _all_transports(self):
+        managers = [s.transports for s in self.sessions.sessions() if s.transports]
+        if self.transports not in managers:
+            managers.append(self.transports)
+        return managers
+
+    @staticmethod
+    def _primary_path(controller):
+        from controllers.androidtv_controller import AndroidTVController
+        from controllers.ir_controller import IRController
+        if isinstance(controller, IRController):
+            return 'ir'
+        return 'android' if isinstance(controller, AndroidTVController) else 'ecp'
+
+    def _configure_transports(self, transports, controller):
+        """Register the device's Wi-Fi path, with the IR blaster as the backup path."""
+        from controllers.ir_controller import IRController
+        transports.clear()
+        path = self._primary_path(controller)
+        transports.set_path(path, controller)
+        if path != 'ir':
+            transports.set_path('ir', IRController(self.ir_blaster_ip))
+
+    def on_ir_blaster_ip(self, instance, value):
+        # Keep the heartbeat and every session's IR path pointed at the current blaster
+        self._watch_blaster(value)
+        for transports in self._all_transports():
+            ir_path = transports.get_path('ir')
+            if ir_path is None:
+                continue
+            if any(ir_path is s.controller for s in self.sessions.sessions()):
+                ir_path.ip_address = ir_path.blaster_ip = value
+            else:
+                from controllers.ir_controller import IRController
+                transports.set_path('ir', IRController(value))
+
+    def _on_path_used(self, path_name):
+        # Called from the command worker; only touch the UI when the path changes
+        if path_name != self._active_path:
+            self._active_path = path_name
+            Clock.schedule_once(lambda dt: self._set_transport_mode(path_name), 0)
+
+    def _set_transport_mode(self, path_name):
+        self._active_path = path_name
+        self.is_ir_mode = path_name == 'ir'
+        # UI Status Color: Green for Wi-Fi, Orange for IR
+        self.connection_status_color = [1, 0.6, 0, 1] if self.is_ir_mode else [0, 0.8, 0.3, 1]
+
+    def _load_app_catalog(self, controller):
+        """Show the cached launcher instantly, then revalidate in the background."""
+        from services.app_catalog import AppCatalog
+        catalog = AppCatalog(controller.ip_address, Storage.data_path("app_cache"),
+                             port=controller.port, transport=controller.transport)
+        if catalog.load_cached():
+            self.launcher_apps = catalog.launcher_data()
+
+        def on_refreshed(changed):
+            if changed:
+                self.launcher_apps = catalog.launcher_data()
+
+        self.executor.submit(catalog.refresh, lane=NORMAL, key='app_catalog', on_result=on_refreshed)
+
+    def _on_connection_failure(self, ip, silent=False):
         self.connected_device_name = "Offline / Not Found"
         self.connection_status_color = [0.8, 0.2, 0.2, 1] # Red
-        show_error(f"Could not reach {ip}. Is the TV on?")
+        if not silent:
+            show_error(f"Could not reach {ip}. Is the TV on?")
 
     def send_command(self, cmd_key):
         """Command routing with Power-On intelligence and Fallback."""
         if cmd_key == "power":
             # If disconnected or Wi-Fi failed, use PowerService which triggers WOL + IR
             if not self.controller or not self.controller.is_connected:
-                last_dev = Storage.load_last_device()
-                mac = last_dev.get('mac') if last_dev else None
-                threading.Thread(target=PowerService.power_on, args=(mac, self.ir_blaster_ip)).start()
+                self._power_on_last_device()
                 return
 
+        if self._holding_presses():
+            # TV is still booting: hold presses and replay them once it answers
+            self._pending_commands.append(cmd_key)
+            return
+
         if self.controller:
-            threading.Thread(target=self._execute_with_fallback, args=(self.controller.send_key, cmd_key)).start()
+            self._drain_typed_text()
+            self.input.press(cmd_key)
+
+    def key_down(self, cmd_key):
+        """Button pressed: sent right away, and repeated or held while it stays down."""
+        if not self.controller or self._holding_presses():
+            return self.send_command(cmd_key)
+        self._drain_typed_text()
+        self.input.key_down(cmd_key)
+
+    def _holding_presses(self):
+        """True while presses wait for the TV being powered on.
+
+        Once the user switches to another connected TV, presses go to it.
+        """
+        if not self._power_on_future or self._power_on_future.done():
+            return False
+        active = self.sessions.active
+        return not (self.controller and self.controller.is_connected) or (
+            active is not None and active.key == self._pending_for)
+
+    def key_up(self, cmd_key):
+        if self.input:
+            self.input.key_up(cmd_key)
+
+    def _new_input(self, session):
+        """Per-TV input pacing: IR repeats for the blaster, keydown/keyup for Wi-Fi TVs."""
+        ir = self._primary_path(session.controller) == 'ir'
+        execute = lambda method, *args: self._execute_with_fallback(session.transports, method, *args)
+        if ir:
+            # The ESP32 handles one request at a time
+            return InputDispatcher(session.queue, execute, hold_mode='repeat', rate=8, burst=4)
+        return InputDispatcher(session.queue, execute, hold_mode='keydown', rate=20, burst=10)
+
+    def _drain_typed_text(self):
+        stream = self._active_text_stream()
+        if stream and stream.pending:
+            # Keys pressed after typing wait for the text to reach the TV
+            self.command_queue.submit(stream.drain)
+
+    def _active_text_stream(self):
+        text_stream = getattr(self.controller, 'text_stream', None)
+        return text_stream() if text_stream else None
+
+    def type_text(self, text):
+        """Mirror the search field onto the TV as the user types.
+
+        Returns the text the TV will have; it lags the field when the user
+        types faster than the TV takes characters, so the field is reset to it.
+        """
+        stream = self._active_text_stream()
+        if stream is None:
+            return text
+        return stream.sync(text)
+
+    def _power_on_last_device(self, device_ip=None):
+        """Power on device_ip (a TV from the registry), or the last used TV."""
+        from services.power_service import PowerService
+        if self._power_on_future and not self._power_on_future.done():
+            logger.info("Power ON already in progress")
+            return
+        last_dev = Storage.device_registry().get(device_ip) if device_ip else None
+        last_dev = last_dev or Storage.load_last_device()
+        mac = last_dev.get('mac') if last_dev else None
+        tv_ip = last_dev.get('ip') if last_dev and last_dev.get('type') == 'roku' else None
+        self.connected_device_name = "Powering on TV..."
+        self._pending_for = last_dev.get('ip') if last_dev else None
+        self._power_on_future = PowerService.power_on(mac, self.ir_blaster_ip, tv_ip)
+        self._power_on_future.add_done_callback(
+            lambda f: Clock.schedule_once(lambda dt: self._on_power_on_done(f, last_dev), 0))
+
+    def _on_power_on_done(self, future, last_dev):
+        ready = not future.cancelled() and future.exception() is None and future.result()
+        if ready and last_dev and last_dev.get('type') == 'roku':
+            # Reconnect; _on_connection_success replays presses held while booting
+            self.connect_to_device(last_dev, silent=True)
+            return
+        if self._pending_commands:
+            logger.warning(f"TV not confirmed on, dropping {len(self._pending_commands)} held command(s)")
+            self._pending_commands.clear()
+        self.connected_device_name = "Power ON sent" if ready else "TV did not respond"
 
     def launch_app(self, app_id):
         """Launch app with fallback logic."""
         if self.controller:
-            threading.Thread(target=self._execute_with_fallback, args=(self.controller.launch_app, app_id)).start()
-
-    def _execute_with_fallback(self, func, arg):
-        """Executes a command and automatically switches to IR mode if Wi-Fi fails."""
-        success = func(arg)
-        if not success and not self.is_ir_mode:
-            logger.warning("Wi-Fi command failed. Initiating IR Fallback...")
-            # Switch internal state to IR
-            ir_ctrl = IRController(self.ir_blaster_ip)
-            if ir_ctrl.connect():
-                self.controller = ir_ctrl
-                self.is_ir_mode = True
-                self.connection_status_color = [1, 0.6, 0, 1]
-                # Retry the command via IR
-                self.controller.send_key(arg)
-            else:
-                Clock.schedule_once(lambda dt: show_error("Connection lost and IR Blaster not found."), 0)
+            self.command_queue.submit(self._execute_with_fallback, self.transports, 'launch_app', app_id)
+
+    def send_sequence(self, keys, inter_key_ms=150):
+        """Run a navigation macro, e.g. ["home", "down", "down", "select"]."""
+        if self.controller:
+            return self.command_queue.send_sequence(keys, inter_key_ms)
+
+    def _execute_with_fallback(self, transports, method, *args):
+        """Runs a command over the fastest healthy path (ECP or IR).
+
+        Runs on the session's command queue worker with that session's
+        transports, so a press queued before a room switch still reaches
+        the TV it was meant for. The transport manager hedges slow
+        Wi-Fi presses with IR and switches back once Wi-Fi recovers.
+        """
+        if transports.execute(method, *args) is None:
+            show_error("Connection lost and IR Blaster not found.")
 
     def test_blaster(self, ip):
         """Manually test an IR Blaster IP and show feedback."""
@@ -272,27 +685,93 @@ class SmartRemoteApp(App):
         logger.info(f"Manually testing IR Blaster at {ip}...")
         
         def test_task():
-            test_ctrl = IRController(ip)
-            if test_ctrl.connect():
+            from controllers.ir_controller import IRController
+            return IRController(ip).connect()
+
+        def on_result(reachable):
+            if reachable:
                 logger.info("IR Blaster Test Success!")
                 show_error(f"Success! IR Blaster found at {ip}. You can now control your TCL TV.")
             else:
                 logger.error("IR Blaster Test Failed.")
                 show_error(f"Failed to reach IR Blaster at {ip}. Check the blue light and ensure it's on your Wi-Fi.")
         
-        threading.Thread(target=test_task, daemon=True).start()
+        self.executor.submit(test_task, lane=INTERACTIVE, key='test_blaster', on_result=on_result)
 
     def switch_screen(self, screen_name):
         self.sm.current = screen_name
 
+    def on_resume(self):
+        # Timers may have come due while Android kept the app suspended
+        if self.scheduler:
+            self.scheduler.resume()
+
     def schedule_task(self, minutes, action):
-        """Schedule power off/on."""
+        """Schedule power off/on in `minutes`, persisted across restarts."""
         try:
-            delay = int(minutes) * 60
-            Clock.schedule_once(lambda dt: self.send_command(action), delay)
-            logger.info(f"Task scheduled: {action} in {minutes} minutes.")
+            minutes = int(minutes)
         except ValueError:
             show_error("Invalid timer value.")
+            return
+        self.scheduler.add_in(minutes, action, device=self._active_device_key(),
+                              label="TV off" if action == 'power_off' else action)
+        self._refresh_jobs_text()
+
+    def schedule_daily(self, at, action):
+        """Recurring daily action at local "HH:MM", e.g. a sleep timer."""
+        try:
+            hour, minute = (int(p) for p in at.split(':'))
+            if not (0 <= hour < 24 and 0 <= minute < 60):
+                raise ValueError(at)
+        except ValueError:
+            show_error("Use HH:MM, e.g. 23:30.")
+            return
+        self.scheduler.add_daily(f"{hour:02d}:{minute:02d}", action, device=self._active_device_key(),
+                                 label="TV off" if action == 'power_off' else action)
+        self._refresh_jobs_text()
+
+    def cancel_timers(self):
+        self.scheduler.cancel_all()
+        self._refresh_jobs_text()
+
+    def _active_device_key(self):
+        return self.sessions.active.key if self.sessions.active else None
+
+    def _refresh_jobs_text(self):
+        jobs = self.scheduler.jobs() if self.scheduler else []
+        self.scheduled_jobs_text = "\n".join(j.describe() for j in jobs) or "No timers set"
+
+    def _on_job_prewarm(self, job):
+        """Timer thread, shortly before a job: make sure the TV will answer on time."""
+        session = self.sessions.get(job.device) if job.device else self.sessions.active
+        if job.action == 'power_on':
+            # WOL and IR now so the TV has finished booting by the due time
+            self._prewarmed_jobs.add(job.job_id)
+            Clock.schedule_once(lambda dt: self._power_on_last_device(job.device), 0)
+        elif session:
+            session.controller.warm_up()
+
+    def _on_job_due(self, job):
+        """Timer thread: run the job on its TV's queue; no extra threads."""
+        Clock.schedule_once(lambda dt: self._refresh_jobs_text(), 0)
+        if job.action == 'power_on':
+            # Jobs that run late (after a restart or resume) or were set for
+            # 0 minutes never got a prewarm, so they power on now
+            if job.job_id in self._prewarmed_jobs:
+                self._prewarmed_jobs.discard(job.job_id)
+            else:
+                Clock.schedule_once(lambda dt: self._power_on_last_device(job.device), 0)
+            return
+        session = self.sessions.get(job.device) if job.device else self.sessions.active
+        if session is None:
+            logger.warning(f"Skipping {job.describe()}: TV not connected")
+            return
+        from controllers.androidtv_controller import AndroidTVController
+        from controllers.roku_controller import RokuController
+        key = job.action
+        if key == 'power_off' and not isinstance(session.controller, (RokuController, AndroidTVController)):
+            key = 'power'  # IR has no discrete off code
+        session.queue.submit(self._execute_with_fallback, session.transports, 'send_key', key)
 
 if __name__ == '__main__':
     SmartRemoteApp().run()
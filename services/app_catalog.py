@@ -0,0 +1,212 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from services.http_pool import get_default_transport
+from utils.logger import logger
+
+class AppEntry:
+    """One installed Roku channel or TV input from /query/apps."""
+
+    __slots__ = ('app_id', 'name', 'app_type', 'version')
+
+    def __init__(self, app_id, name, app_type=None, version=None):
+        self.app_id = app_id
+        self.name = name
+        self.app_type = app_type
+        self.version = version
+
+    def to_dict(self):
+        return {'id': self.app_id, 'name': self.name, 'type': self.app_type, 'version': self.version}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['id'], d['name'], d.get('type'), d.get('version'))
+
+
+def parse_apps(content):
+    """Parse /query/apps XML into a list of AppEntry in document order."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    apps = []
+    try:
+        for _, elem in ET.iterparse(io.BytesIO(content), events=('end',)):
+            if elem.tag == 'app' and elem.get('id'):
+                apps.append(AppEntry(elem.get('id'), (elem.text or '').strip() or elem.get('id'),
+                                     elem.get('type'), elem.get('version')))
+            elem.clear()
+    except ET.ParseError as e:
+        logger.debug(f"App list parse stopped early: {e}")
+    return apps
+
+
+class IconCache:
+    """Disk LRU cache for app icons, evicting least recently used past max_bytes."""
+
+    INDEX_FILE = "icons.json"
+
+    def __init__(self, cache_dir, max_bytes=4 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()  # key -> {'file', 'size', 'used'}
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, self.INDEX_FILE), 'r') as f:
+                index = json.load(f)
+            # Drop entries whose file was removed behind our back
+            return {k: v for k, v in index.items()
+                    if os.path.exists(os.path.join(self.cache_dir, v['file']))}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        try:
+            with open(path + ".tmp", 'w') as f:
+                json.dump(self._index, f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.error(f"Icon cache index save error: {e}")
+
+    @property
+    def total_bytes(self):
+        return sum(e['size'] for e in self._index.values())
+
+    def get(self, key):
+        """Path of the cached icon for key, or None. Marks it recently used."""
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry:
+                return None
+            entry['used'] = time.time()
+            return os.path.join(self.cache_dir, entry['file'])
+
+    def put(self, key, data, ext="png"):
+        filename = f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.{ext}"
+        path = os.path.join(self.cache_dir, filename)
+        with self._lock:
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            except OSError as e:
+                logger.error(f"Icon cache write error: {e}")
+                return None
+            self._index[key] = {'file': filename, 'size': len(data), 'used': time.time()}
+            self._evict()
+            self._save_index()
+        return path
+
+    def _evict(self):
+        total = self.total_bytes
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]['used']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except OSError:
+                pass
+            total -= entry['size']
+            del self._index[key]
+
+    def flush(self):
+        """Persist recency updates from get()."""
+        with self._lock:
+            self._save_index()
+
+
+class AppCatalog:
+    """Cached app list and icons for one Roku TV.
+
+    load_cached() reads the last known list from disk with no network
+    calls. refresh() fetches /query/apps and only re-parses it when its
+    content differs from the cached signature; icons missing from the
+    cache (failed or evicted) are fetched on every refresh.
+    """
+
+    def __init__(self, ip_address, cache_dir, port=8060, transport=None, icon_cache=None):
+        self.ip_address = ip_address
+        self.base_url = f"http://{ip_address}:{port}"
+        self.cache_dir = cache_dir
+        self.transport = transport or get_default_transport()
+        self.icons = icon_cache or IconCache(os.path.join(cache_dir, "icons"))
+        self.apps = []
+        self.signature = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.cache_dir, f"apps_{self.ip_address.replace(':', '_')}.json")
+
+    def load_cached(self):
+        try:
+            with open(self._index_path, 'r') as f:
+                data = json.load(f)
+            self.signature = data.get('signature')
+            self.apps = [AppEntry.from_dict(d) for d in data.get('apps', [])]
+        except (OSError, ValueError, KeyError):
+            self.apps = []
+        return self.apps
+
+    def _save(self):
+        try:
+            with open(self._index_path + ".tmp", 'w') as f:
+                json.dump({'signature': self.signature, 'apps': [a.to_dict() for a in self.apps]}, f)
+            os.replace(self._index_path + ".tmp", self._index_path)
+        except OSError as e:
+            logger.error(f"App catalog save error: {e}")
+
+    def icon_key(self, app):
+        return f"{self.ip_address}/{app.app_id}/{app.version or ''}"
+
+    def icon_path(self, app):
+        return self.icons.get(self.icon_key(app))
+
+    def refresh(self):
+        """Revalidate against the TV. Returns True when the app list or its icons changed."""
+        try:
+            resp = self.transport.get(f"{self.base_url}/query/apps", timeout=3)
+            if resp.status_code != 200:
+                return False
+        except Exception as e:
+            logger.warning(f"App catalog refresh failed: {e}")
+            return False
+
+        signature = hashlib.sha1(resp.content).hexdigest()
+        if signature == self.signature:
+            return self.fetch_missing_icons() > 0
+
+        self.apps = parse_apps(resp.content)
+        self.signature = signature
+        self._save()
+        logger.info(f"App catalog updated: {len(self.apps)} apps on {self.ip_address}")
+        self.fetch_missing_icons()
+        return True
+
+    def fetch_missing_icons(self):
+        """Download icons not in the cache. Returns how many were added."""
+        fetched = 0
+        for app in self.apps:
+            key = self.icon_key(app)
+            if self.icons.get(key):
+                continue
+            try:
+                resp = self.transport.get(f"{self.base_url}/query/icon/{app.app_id}", timeout=3)
+                if resp.status_code == 200 and resp.content:
+                    ext = "jpg" if "jpeg" in resp.headers.get("Content-Type", "") else "png"
+                    if self.icons.put(key, resp.content, ext):
+                        fetched += 1
+            except Exception as e:
+                logger.debug(f"Icon fetch failed for {app.app_id}: {e}")
+        self.icons.flush()
+        return fetched
+
+    def launcher_data(self):
+        """RecycleView rows for the KV launcher grid."""
+        return [{'app_id': a.app_id, 'text': a.name, 'icon': self.icon_path(a) or ''}
+                for a in self.apps]
@@ -0,0 +1,83 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from utils.logger import logger
+from utils.telemetry import telemetry
+
+class CommandQueue:
+    """Ordered command queue for one device, drained by a single worker.
+
+    Commands run strictly in submission order on one long-lived thread, so
+    fast presses reach the TV in order and reuse the controller's warm
+    connection instead of paying a thread start per press.
+    """
+
+    def __init__(self, controller, maxsize=64):
+        self.controller = controller
+        self._queue = queue.Queue(maxsize)
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, daemon=True, name=f"commands-{controller.ip_address}")
+        self._worker.start()
+
+    def submit(self, func, *args):
+        """Queue func(*args) behind earlier commands. Returns a Future."""
+        future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("Command queue is closed"))
+            return future
+        try:
+            self._queue.put_nowait((future, func, args, time.perf_counter()))
+        except queue.Full:
+            telemetry.incr("queue.dropped")
+            logger.warning("Command queue full, dropping command")
+            future.set_exception(RuntimeError("Command queue is full"))
+        return future
+
+    def send_key(self, key_code):
+        return self.submit(lambda k: self.controller.send_key(k), key_code)
+
+    def launch_app(self, app_id):
+        return self.submit(lambda a: self.controller.launch_app(a), app_id)
+
+    def send_sequence(self, keys, inter_key_ms=100):
+        """Queue a macro, e.g. ["home", "down", "down", "select"], as one job."""
+        return self.submit(lambda k: self.controller.send_sequence(k, inter_key_ms), list(keys))
+
+    def close(self):
+        """Stop the worker after already queued commands have run.
+
+        Never blocks: when the queue is full (a slow or offline TV) the
+        pending commands are cancelled so the stop marker fits.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                self._queue.put_nowait((None, None, None, None))
+                return
+            except queue.Full:
+                pass
+            try:
+                future = self._queue.get_nowait()[0]
+            except queue.Empty:
+                continue
+            if future is not None:
+                future.cancel()
+
+    def _run(self):
+        while True:
+            future, func, args, queued_at = self._queue.get()
+            if future is None:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            # Time spent behind earlier commands, separate from the send itself
+            telemetry.observe("queue.wait_ms", (time.perf_counter() - queued_at) * 1000.0)
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                logger.error("Queued command failed: %s", e)
+                future.set_exception(e)
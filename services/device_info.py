@@ -0,0 +1,132 @@
+import io
+import threading
+import time
+import xml.etree.ElementTree as ET
+from services.http_pool import get_default_transport
+from utils.logger import logger
+
+class DeviceInfo:
+    """Parsed Roku device-info or UPnP description, filled in one pass."""
+
+    __slots__ = ('user_device_name', 'friendly_name', 'model_name', 'vendor',
+                 'wifi_mac', 'ethernet_mac', 'serial_number', 'power_mode')
+
+    # XML tag -> attribute (Roku ECP uses kebab-case, UPnP camelCase)
+    TAGS = {
+        'user-device-name': 'user_device_name',
+        'friendly-device-name': 'friendly_name',
+        'friendlyName': 'friendly_name',
+        'model-name': 'model_name',
+        'modelName': 'model_name',
+        'vendor-name': 'vendor',
+        'manufacturer': 'vendor',
+        'wifi-mac': 'wifi_mac',
+        'ethernet-mac': 'ethernet_mac',
+        'serial-number': 'serial_number',
+        'power-mode': 'power_mode',
+    }
+
+    def __init__(self):
+        for attr in self.__slots__:
+            setattr(self, attr, None)
+
+    @property
+    def display_name(self):
+        return self.user_device_name or self.friendly_name or self.model_name
+
+    @property
+    def mac(self):
+        return self.wifi_mac or self.ethernet_mac
+
+    def __repr__(self):
+        return f"DeviceInfo(name={self.display_name!r}, model={self.model_name!r}, mac={self.mac!r})"
+
+
+def parse_device_info(content, wanted=None):
+    """Parse device XML with iterparse, stopping once all wanted tags are seen.
+
+    wanted is a set of DeviceInfo attribute names; by default every known
+    tag is collected. Malformed XML yields whatever was parsed before the
+    error.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    wanted = set(wanted) if wanted else set(DeviceInfo.__slots__)
+    info = DeviceInfo()
+    try:
+        for _, elem in ET.iterparse(io.BytesIO(content), events=('end',)):
+            # Drop the UPnP namespace prefix: {urn:...}friendlyName -> friendlyName
+            attr = DeviceInfo.TAGS.get(elem.tag.rsplit('}', 1)[-1])
+            if attr and getattr(info, attr) is None and elem.text and elem.text.strip():
+                setattr(info, attr, elem.text.strip())
+                wanted.discard(attr)
+                if not wanted:
+                    break
+            elem.clear()
+    except ET.ParseError as e:
+        logger.debug(f"Device info XML parse stopped early: {e}")
+    return info
+
+
+class _TTLCache:
+    """Small TTL memo with a per-key lock so concurrent callers share one fetch."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key, fetch, max_age=None):
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] <= max_age:
+                return entry[1]
+            value = fetch()
+            if value is not None:
+                self._entries[key] = (time.monotonic(), value)
+            return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+DEVICE_INFO_TTL = 60.0
+_device_info_cache = _TTLCache(DEVICE_INFO_TTL)
+_description_cache = _TTLCache(DEVICE_INFO_TTL)
+
+def _fetch_xml(url, transport, timeout):
+    transport = transport or get_default_transport()
+    try:
+        resp = transport.get(url, timeout=timeout)
+        if resp.status_code == 200:
+            return parse_device_info(resp.content)
+    except Exception as e:
+        logger.debug(f"Device info fetch failed for {url}: {e}")
+    return None
+
+def fetch_device_info(ip, port=8060, transport=None, timeout=3, max_age=None):
+    """Roku /query/device-info for ip, memoized so discovery and connect share it.
+
+    Returns None when the TV doesn't answer. max_age=0 forces a refetch.
+    """
+    url = f"http://{ip}:{port}/query/device-info"
+    return _device_info_cache.get_or_fetch(
+        (ip, port), lambda: _fetch_xml(url, transport, timeout), max_age)
+
+def fetch_description(location_url, transport=None, timeout=2, max_age=None):
+    """UPnP description XML from an SSDP LOCATION header, memoized per URL."""
+    if not location_url:
+        return None
+    return _description_cache.get_or_fetch(
+        location_url, lambda: _fetch_xml(location_url, transport, timeout), max_age)
+
+def invalidate_device_info(ip=None, port=8060):
+    _device_info_cache.invalidate(None if ip is None else (ip, port))
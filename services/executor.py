@@ -0,0 +1,154 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from utils.logger import logger
+
+# Priority lanes, most urgent first
+INTERACTIVE = 0   # The user is waiting: connect, pairing, blaster test
+NORMAL = 1        # Follow-up work: code sync, catalog refresh
+BACKGROUND = 2    # Scans and revalidation that may take seconds
+
+class CancelToken:
+    """Cooperative cancellation for one task; long tasks check it between steps."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def sleep(self, seconds):
+        """Sleep, waking early on cancel. Returns True if cancelled."""
+        return self._event.wait(seconds)
+
+
+class Executor:
+    """Bounded worker pool for the app's background network work.
+
+    Jobs wait in one priority queue ordered by lane, then submission order.
+    Background jobs never take the last free worker, so an interactive job
+    starts right away even during a scan. Submitting with a key cancels
+    the token of the previous job with that key, e.g. a new scan
+    supersedes the old one. on_result/on_error run through dispatch(fn),
+    which the app points at Kivy's Clock so callbacks land on the UI
+    thread; they are skipped for cancelled jobs. Workers start on first use.
+    """
+
+    def __init__(self, max_workers=3, dispatch=None, name="worker"):
+        self.max_workers = max_workers
+        self.max_background = max(1, max_workers - 1)
+        self.name = name
+        self._dispatch = dispatch or (lambda fn: fn())
+        self._heap = []
+        self._seq = itertools.count()
+        self._keys = {}
+        self._running_background = 0
+        self._workers = []
+        self._shutdown = False
+        self._cond = threading.Condition()
+
+    def submit(self, fn, *args, lane=NORMAL, key=None, token=None, on_result=None, on_error=None):
+        """Queue fn(*args). Returns a Future whose .token cancels it."""
+        future = Future()
+        future.token = token = token or CancelToken()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Executor is shut down")
+            if key is not None:
+                previous = self._keys.get(key)
+                if previous is not None:
+                    previous.cancel()
+                self._keys[key] = token
+            heapq.heappush(self._heap, (lane, next(self._seq), future, fn, args, key))
+            if not self._workers:
+                self._start_workers()
+            self._cond.notify_all()
+        if on_result or on_error:
+            future.add_done_callback(self._marshal(on_result, on_error))
+        return future
+
+    def cancel(self, key):
+        """Cancel the current job submitted under key, if any."""
+        with self._cond:
+            token = self._keys.pop(key, None)
+        if token:
+            token.cancel()
+
+    def shutdown(self):
+        """Cancel queued and running jobs and let the workers exit."""
+        with self._cond:
+            self._shutdown = True
+            queued, self._heap = self._heap, []
+            tokens = list(self._keys.values())
+            self._keys.clear()
+            self._cond.notify_all()
+        for _, _, future, _, _, _ in queued:
+            future.token.cancel()
+            future.cancel()
+        for token in tokens:
+            token.cancel()
+
+    def _start_workers(self):
+        # Caller holds self._cond
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._run, daemon=True, name=f"{self.name}-{i}")
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self):
+        # Caller holds self._cond. Lanes sort first, so when the head is a
+        # background job every queued job is one.
+        while self._heap:
+            lane, _, future, fn, args, key = self._heap[0]
+            if future.token.cancelled:
+                heapq.heappop(self._heap)
+                future.cancel()
+                continue
+            if lane == BACKGROUND and self._running_background >= self.max_background:
+                return None
+            return heapq.heappop(self._heap)
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                lane, _, future, fn, args, key = job
+                if lane == BACKGROUND:
+                    self._running_background += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except Exception as e:
+                        logger.error("Background task %s failed: %s", getattr(fn, '__name__', fn), e)
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    if lane == BACKGROUND:
+                        self._running_background -= 1
+                    if key is not None and self._keys.get(key) is future.token:
+                        del self._keys[key]
+                    self._cond.notify_all()
+
+    def _marshal(self, on_result, on_error):
+        def done(future):
+            if future.cancelled() or future.token.cancelled:
+                return
+            error = future.exception()
+            if error is None:
+                if on_result:
+                    self._dispatch(lambda: on_result(future.result()))
+            elif on_error:
+                self._dispatch(lambda: on_error(error))
+        return done
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from utils.logger import logger
+
+class HealthMonitor:
+    """Low-frequency heartbeats for the active TV and the IR blaster.
+
+    All probes run on one asyncio loop in a single background thread.
+    Listeners are called as listener(name, is_up) whenever a target changes
+    state, so the UI and the transport manager learn about outages before
+    the user presses a key. A target that was up is only marked down after
+    `missed_beats` consecutive failed probes; an unknown target is marked
+    down on its first miss so startup fallbacks aren't delayed.
+    """
+
+    def __init__(self, interval=5.0, missed_beats=2, timeout=1.0):
+        self.interval = interval
+        self.missed_beats = missed_beats
+        self.timeout = timeout
+        self._targets = {}  # name -> dict(host, port, path, state, misses)
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._wakeup = None
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def watch(self, name, host, port, path=None):
+        """Start (or retarget) heartbeats. path makes it an HTTP GET, else a TCP connect."""
+        with self._lock:
+            current = self._targets.get(name)
+            if current and (current['host'], current['port'], current['path']) == (host, port, path):
+                return
+            self._targets[name] = {'host': host, 'port': port, 'path': path, 'state': None, 'misses': 0}
+        self._poke()
+
+    def unwatch(self, name):
+        with self._lock:
+            self._targets.pop(name, None)
+
+    def is_up(self, name):
+        with self._lock:
+            target = self._targets.get(name)
+            return bool(target and target['state'])
+
+    def start(self):
+        if self._thread:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="health-monitor")
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the heartbeats and wait for the loop thread to wind down."""
+        loop, thread = self._loop, self._thread
+        if loop:
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                pass  # Loop already closed
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def _poke(self):
+        # Probe new targets right away instead of waiting for the next beat
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._loop.create_task(self._beat_forever())
+        try:
+            self._loop.run_forever()
+        finally:
+            # Let the beat and its pending wait see the cancellation before closing
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    async def _beat_forever(self):
+        while True:
+            with self._lock:
+                targets = list(self._targets.items())
+            if targets:
+                results = await asyncio.gather(*(self._probe(t) for _, t in targets))
+                for (name, target), alive in zip(targets, results):
+                    self._update(name, target, alive)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _update(self, name, target, alive):
+        with self._lock:
+            if self._targets.get(name) is not target:
+                return  # Retargeted while the probe was in flight
+            if alive:
+                target['misses'] = 0
+                changed = target['state'] is not True
+                target['state'] = True
+            else:
+                target['misses'] += 1
+                changed = target['state'] is None or (
+                    target['state'] and target['misses'] >= self.missed_beats)
+                if changed:
+                    target['state'] = False
+        if changed:
+            logger.info(f"Health: {name} ({target['host']}) is {'UP' if alive else 'DOWN'}")
+            for listener in self._listeners:
+                try:
+                    listener(name, alive)
+                except Exception as e:
+                    logger.error(f"Health listener failed: {e}")
+
+    async def _probe(self, target):
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(target['host'], target['port']), self.timeout)
+            if not target['path']:
+                return True
+            writer.write(f"GET {target['path']} HTTP/1.0\r\nHost: {target['host']}\r\n\r\n".encode())
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+            return b" 200" in status_line
+        except (OSError, asyncio.TimeoutError):
+            return False
+        finally:
+            if writer:
+                writer.close()
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from utils.logger import logger
+
+class HttpTransport:
+    """Keep-alive HTTP sessions shared by all controllers, one per host.
+
+    Each host (ip:port) gets its own requests.Session so TCP connections to
+    the TV or the ESP32 stay warm between key presses. The number of hosts
+    and connections per host is bounded, and sessions that sit idle longer
+    than idle_timeout are closed so phones don't hold sockets forever.
+    """
+
+    def __init__(self, max_hosts=8, pool_maxsize=2, idle_timeout=30.0):
+        self.max_hosts = max_hosts
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()  # host -> [session, last_used]
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def session_for(self, url):
+        """Return the warm session for the host in url, creating it if needed."""
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        stale = []
+        with self._lock:
+            if now - self._last_sweep > self.idle_timeout:
+                stale = self._pop_idle(now)
+                self._last_sweep = now
+
+            entry = self._sessions.get(host)
+            if entry is None:
+                entry = [self._new_session(), now]
+                self._sessions[host] = entry
+                # Bound the pool: drop the least recently used host
+                while len(self._sessions) > self.max_hosts:
+                    stale.append(self._sessions.popitem(last=False)[1][0])
+            else:
+                self._sessions.move_to_end(host)
+                entry[1] = now
+            session = entry[0]
+
+        for old in stale:
+            old.close()
+        return session
+
+    def _pop_idle(self, now):
+        idle_hosts = [h for h, (_, used) in self._sessions.items() if now - used > self.idle_timeout]
+        return [self._sessions.pop(h)[0] for h in idle_hosts]
+
+    def request(self, method, url, **kwargs):
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def evict_idle(self):
+        """Close sessions that have not been used within idle_timeout."""
+        with self._lock:
+            stale = self._pop_idle(time.monotonic())
+        for session in stale:
+            session.close()
+        if stale:
+            logger.debug(f"Evicted {len(stale)} idle HTTP session(s)")
+        return len(stale)
+
+    def close_host(self, host):
+        """Drop the pooled session for host (e.g. after the device went away)."""
+        with self._lock:
+            entry = self._sessions.pop(host, None)
+        if entry:
+            entry[0].close()
+
+    def close(self):
+        with self._lock:
+            sessions = [entry[0] for entry in self._sessions.values()]
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+def get_default_transport():
+    """Process-wide transport shared by controllers that aren't given one."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
@@ -0,0 +1,197 @@
+import threading
+import time
+from utils.logger import logger
+from utils.telemetry import telemetry
+
+class TokenBucket:
+    """Allows `rate` sends per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._clock = clock
+        self._tokens = self.burst
+        self._last = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def delay(self):
+        """Seconds until a token is available; 0 when one is available now."""
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+class _Press:
+    __slots__ = ('key', 'at', 'released')
+
+    def __init__(self, key, at, held):
+        self.key = key
+        self.at = at
+        # Set on key_up; None for taps, which have no hold phase
+        self.released = threading.Event() if held else None
+
+    @property
+    def held(self):
+        return self.released is not None and not self.released.is_set()
+
+
+class InputDispatcher:
+    """Paces and coalesces UI key input for one TV.
+
+    Presses collect in a pending list that a single job on the session's
+    CommandQueue drains, so input stays ordered with everything else sent
+    to that TV. Each drain drops presses older than stale_ms, merges
+    back-to-back presses of one key into one send_repeat, and waits for the
+    device's token bucket, dropping a press instead when the wait would
+    make it stale. A key still held after hold_after_ms becomes a
+    keydown/keyup pair (hold_mode 'keydown', Wi-Fi TVs) or a stream of
+    repeat bursts (hold_mode 'repeat', the IR blaster); a waiter thread
+    times the hold and queues each step, so the queue never blocks on it.
+
+    execute(method, *args) performs one send, e.g. through the session's
+    TransportManager; it is called on the queue's worker thread.
+    """
+
+    # IR repeat frame period, see IRController.REPEAT_INTERVAL_MS
+    REPEAT_INTERVAL_S = 0.11
+
+    def __init__(self, queue, execute, hold_mode='repeat', rate=10.0, burst=5, stale_ms=800,
+                 hold_after_ms=300, repeat_burst=3, max_hold_s=15.0, clock=time.monotonic):
+        self.queue = queue
+        self.execute = execute
+        self.hold_mode = hold_mode
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.stale_s = stale_ms / 1000.0
+        self.hold_after_s = hold_after_ms / 1000.0
+        self.repeat_burst = repeat_burst
+        self.max_hold_s = max_hold_s
+        self._clock = clock
+        self._pending = []
+        self._held = {}
+        self._drain_queued = False
+        self._lock = threading.Lock()
+
+    # -- UI side -------------------------------------------------------------
+
+    def press(self, key):
+        """A single press, e.g. from a button's on_release."""
+        self._add(_Press(key, self._clock(), held=False))
+
+    def key_down(self, key):
+        """Button went down: the press is sent now, holding continues it."""
+        press = _Press(key, self._clock(), held=True)
+        with self._lock:
+            previous = self._held.pop(key, None)
+            self._held[key] = press
+        if previous:
+            previous.released.set()
+        self._add(press)
+
+    def key_up(self, key):
+        with self._lock:
+            press = self._held.pop(key, None)
+        if press:
+            press.released.set()
+
+    def release_all(self):
+        with self._lock:
+            held = list(self._held.values())
+            self._held.clear()
+            self._pending.clear()
+        for press in held:
+            press.released.set()
+
+    def _add(self, press):
+        with self._lock:
+            self._pending.append(press)
+            if self._drain_queued:
+                return
+            self._drain_queued = True
+        self.queue.submit(self._drain)
+
+    # -- queue worker side ---------------------------------------------------
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._drain_queued = False
+                    return
+                batch, self._pending = self._pending, []
+            for key, count, last in self._runs(batch):
+                if not self._wait_for_token(last):
+                    continue
+                if count == 1:
+                    self.execute('send_key', key)
+                else:
+                    telemetry.incr("input.coalesced", count - 1)
+                    self.execute('send_repeat', key, count)
+                if last.released is not None:
+                    self._follow_hold(last)
+
+    def _runs(self, batch):
+        """[key, count, last_press] runs of fresh presses, in order."""
+        now = self._clock()
+        runs = []
+        for press in batch:
+            if not press.held and now - press.at > self.stale_s:
+                telemetry.incr("input.stale")
+                logger.debug("Dropping stale %s press (%.0f ms old)", press.key, (now - press.at) * 1000)
+                continue
+            if runs and runs[-1][0] == press.key and not runs[-1][2].held:
+                runs[-1][1] += 1
+                runs[-1][2] = press
+            else:
+                runs.append([press.key, 1, press])
+        return runs
+
+    def _wait_for_token(self, press):
+        delay = self.bucket.delay()
+        if delay and not press.held and self._clock() + delay - press.at > self.stale_s:
+            telemetry.incr("input.rate_limited")
+            logger.debug("Rate limit: dropping %s press", press.key)
+            return False
+        if delay:
+            time.sleep(delay)
+        self.bucket.take()
+        return True
+
+    def _follow_hold(self, press):
+        """Queue worker, after a held key's first send: watch the hold off the queue."""
+        threading.Thread(target=self._watch_hold, args=(press,), daemon=True,
+                         name=f"hold-{press.key}").start()
+
+    def _watch_hold(self, press):
+        # Waiter thread. Each hold step is its own queue job, so taps on
+        # other keys go out between steps instead of waiting for the release.
+        remaining = self.hold_after_s - (self._clock() - press.at)
+        if press.released.wait(max(0.0, remaining)):
+            return  # Released quickly: it was a tap
+        if self.hold_mode == 'keydown':
+            self.queue.submit(self.execute, 'send_keydown', press.key)
+            press.released.wait(self.max_hold_s)
+            self.queue.submit(self.execute, 'send_keyup', press.key)
+            return
+        deadline = press.at + self.max_hold_s
+        while not press.released.is_set() and self._clock() < deadline:
+            step = self.queue.submit(self._repeat_step, press)
+            try:
+                # One step in flight at a time, so a slow TV doesn't pile them up
+                step.result(timeout=self.max_hold_s)
+            except Exception:
+                return  # Queue closed or full
+            press.released.wait(self.repeat_burst * self.REPEAT_INTERVAL_S)
+
+    def _repeat_step(self, press):
+        if press.held and self._wait_for_token(press):
+            self.execute('send_repeat', press.key, self.repeat_burst)
@@ -1,39 +1,131 @@
 import socket
 import struct
+import time
 from utils.logger import logger
 
-def send_wol(mac_address):
-    """Sends Wake-on-LAN magic packet to specified MAC address."""
+# Linux/Android ioctls for interface address and netmask
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891b
+
+def list_ipv4_interfaces():
+    """Return [(name, ip, netmask)] for every non-loopback IPv4 interface.
+
+    Uses SIOCGIF* ioctls where available (Linux/Android) and falls back to
+    the default-route address with an assumed /24 elsewhere.
+    """
+    interfaces = []
+    try:
+        import fcntl
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for _, name in socket.if_nameindex():
+                packed = struct.pack('256s', name[:15].encode())
+                try:
+                    ip = socket.inet_ntoa(fcntl.ioctl(sock.fileno(), SIOCGIFADDR, packed)[20:24])
+                    mask = socket.inet_ntoa(fcntl.ioctl(sock.fileno(), SIOCGIFNETMASK, packed)[20:24])
+                except OSError:
+                    continue  # Interface without an IPv4 address
+                if not ip.startswith("127."):
+                    interfaces.append((name, ip, mask))
+        finally:
+            sock.close()
+    except (ImportError, AttributeError, OSError) as e:
+        logger.debug(f"Interface enumeration unavailable: {e}")
+
+    if not interfaces:
+        ip = get_default_local_ip()
+        if ip:
+            interfaces.append(("default", ip, "255.255.255.0"))
+    return interfaces
+
+def get_default_local_ip():
+    """Local address of the default route (no packet is actually sent)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("8.8.8.8", 80))
+        return sock.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+def get_broadcast_addresses():
+    """Directed broadcast address of every local interface plus the limited broadcast."""
+    addresses = []
+    for _, ip, mask in list_ipv4_interfaces():
+        ip_int = struct.unpack("!I", socket.inet_aton(ip))[0]
+        mask_int = struct.unpack("!I", socket.inet_aton(mask))[0]
+        addresses.append(socket.inet_ntoa(struct.pack("!I", ip_int | (~mask_int & 0xFFFFFFFF))))
+    addresses.append("255.255.255.255")
+    return list(dict.fromkeys(addresses))
+
+def send_wol(mac_address, repeat=1, interval=0.1):
+    """Sends Wake-on-LAN magic packets to specified MAC address.
+
+    Each burst goes to the broadcast address of every local interface on
+    ports 9 and 7, repeated `repeat` times since sleeping NICs drop some.
+    """
     if not mac_address:
         return False
-        
+
     try:
         # Format MAC: AA:BB:CC:DD:EE:FF or AA-BB-CC-DD-EE-FF
         mac_address = mac_address.replace(':', '').replace('-', '')
         if len(mac_address) != 12:
             raise ValueError("Invalid MAC address length")
-            
+
         # Create magic packet
         data = bytes.fromhex('F' * 12 + mac_address * 16)
-        
+        targets = get_broadcast_addresses()
+
         # Broadcast to network
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        sock.sendto(data, ('<broadcast>', 9))
-        sock.close()
-        logger.info(f"WOL magic packet sent to {mac_address}")
-        return True
+        sent = 0
+        try:
+            for i in range(repeat):
+                if i:
+                    time.sleep(interval)
+                for addr in targets:
+                    for port in (9, 7):
+                        try:
+                            sock.sendto(data, (addr, port))
+                            sent += 1
+                        except OSError:
+                            pass
+        finally:
+            sock.close()
+        logger.info(f"WOL magic packet sent to {mac_address} ({sent} packets via {', '.join(targets)})")
+        return sent > 0
     except Exception as e:
         logger.error(f"Failed to send WOL: {e}")
         return False
 
-def check_reachability(ip, port=8060):
+def check_reachability(ip, port=8060, timeout=1.0):
     """Check if a specific host:port is reachable."""
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1.0)
+        sock.settimeout(timeout)
         result = sock.connect_ex((ip, port))
         sock.close()
         return result == 0
     except:
         return False
+
+def wait_for_reachability(ip, port=8060, deadline=25.0, initial_interval=0.25,
+                          max_interval=2.0, cancelled=None):
+    """Poll ip:port with exponential backoff until it accepts a connection.
+
+    Returns True as soon as it answers, False once `deadline` seconds have
+    passed or the optional `cancelled()` callable returns True.
+    """
+    end = time.monotonic() + deadline
+    interval = initial_interval
+    while True:
+        remaining = end - time.monotonic()
+        if remaining <= 0 or (cancelled and cancelled()):
+            return False
+        if check_reachability(ip, port, timeout=min(1.0, remaining)):
+            return True
+        time.sleep(min(interval, max(0.0, end - time.monotonic())))
+        interval = min(interval * 1.5, max_interval)
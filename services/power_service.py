@@ -1,22 +1,71 @@
-from services.network_service import send_wol
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from services.network_service import send_wol, check_reachability, wait_for_reachability
 from controllers.ir_controller import IRController
 from utils.logger import logger
+from utils.telemetry import telemetry
+
+# Small shared pools. Orchestrations block on the WOL and IR sends, so the
+# sends get their own pool: a full orchestration pool can never starve them.
+_power_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="power")
+_signal_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="power-signal")
 
 class PowerService:
     """Manages Smart Power logic (Wi-Fi + IR fallback)."""
 
+    WOL_BURST = 5
+    WOL_INTERVAL = 0.2
+
     @staticmethod
-    def power_on(mac_address, ir_blaster_ip):
-        """Attempts to power on the TV using WOL followed by IR."""
+    def power_on(mac_address, ir_blaster_ip, tv_ip=None, port=8060, deadline=25.0):
+        """Wake the TV with WOL bursts and the IR power code in parallel.
+
+        Returns a Future. With tv_ip it resolves True as soon as the TV
+        accepts connections on port, or False when the deadline expires.
+        Without tv_ip there is nothing to confirm, so it resolves to whether
+        either signal was sent.
+        """
         logger.info("Triggering Power ON sequence...")
-        # 1. Try Wake-on-LAN
-        wol_success = send_wol(mac_address)
-        
-        # 2. Trigger IR Command via Blaster (immediate fallback)
-        ir = IRController(ir_blaster_ip)
-        ir_success = ir.send_key('power')
-        
-        return wol_success or ir_success
+        result = Future()
+
+        def resolve(value, error=None):
+            if result.set_running_or_notify_cancel():
+                if error:
+                    result.set_exception(error)
+                else:
+                    result.set_result(value)
+
+        def orchestrate():
+            started = time.perf_counter()
+            try:
+                # IR power is a toggle: don't send it to a TV that is already up
+                if tv_ip and check_reachability(tv_ip, port, timeout=0.3):
+                    logger.info(f"TV at {tv_ip} is already reachable, skipping power-on")
+                    telemetry.incr("power.on.already_up")
+                    return resolve(True)
+
+                # 1. Wake-on-LAN bursts and 2. IR command via Blaster, concurrently
+                wol = _signal_executor.submit(
+                    send_wol, mac_address, PowerService.WOL_BURST, PowerService.WOL_INTERVAL)
+                ir = _signal_executor.submit(IRController(ir_blaster_ip).send_key, 'power')
+
+                if not tv_ip:
+                    return resolve(bool(wol.result() or ir.result()))
+                ready = wait_for_reachability(tv_ip, port, deadline, cancelled=result.cancelled)
+                logger.info(f"Power ON {'confirmed' if ready else 'not confirmed'} for {tv_ip}")
+                wake_ms = (time.perf_counter() - started) * 1000.0
+                if ready:
+                    telemetry.observe("power.on.wake", wake_ms)
+                else:
+                    telemetry.incr("power.on.unconfirmed")
+                telemetry.event('power_on', tv_ip, wake_ms, ready=ready)
+                resolve(ready)
+            except Exception as e:
+                logger.error(f"Power ON orchestration failed: {e}")
+                resolve(None, e)
+
+        _power_executor.submit(orchestrate)
+        return result
 
     @staticmethod
     def power_off(controller):
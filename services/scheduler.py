@@ -0,0 +1,225 @@
+import datetime
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from utils.logger import logger
+
+class ScheduledJob:
+    """A timed action, e.g. power_off at 23:30 every day."""
+
+    __slots__ = ('job_id', 'action', 'due', 'repeat', 'at', 'device', 'label')
+
+    def __init__(self, action, due, repeat=None, at=None, device=None, label=None, job_id=None):
+        self.job_id = job_id or uuid.uuid4().hex[:8]
+        self.action = action
+        self.due = due          # epoch seconds
+        self.repeat = repeat    # None or 'daily'
+        self.at = at            # "HH:MM" local time for daily jobs
+        self.device = device    # TV IP the action targets, None for the active TV
+        self.label = label or action
+
+    def to_dict(self):
+        return {'id': self.job_id, 'action': self.action, 'due': self.due, 'repeat': self.repeat,
+                'at': self.at, 'device': self.device, 'label': self.label}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['action'], d['due'], d.get('repeat'), d.get('at'), d.get('device'),
+                   d.get('label'), d['id'])
+
+    def describe(self):
+        when = f"daily {self.at}" if self.repeat == 'daily' else time.strftime(
+            "%a %H:%M", time.localtime(self.due))
+        return f"{self.label} at {when}"
+
+
+def next_daily(at, now=None):
+    """Next epoch time for local "HH:MM" strictly after now (DST-safe)."""
+    hour, minute = (int(p) for p in at.split(':'))
+    now_dt = datetime.datetime.fromtimestamp(now if now is not None else time.time())
+    candidate = now_dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now_dt:
+        candidate = (candidate + datetime.timedelta(days=1)).replace(hour=hour, minute=minute)
+    return candidate.timestamp()
+
+
+class Scheduler:
+    """Persisted timer for power actions, driven by one background thread.
+
+    Each job puts a prewarm entry and a run entry on a heap keyed by time;
+    cancelled jobs are dropped from the index and their entries skipped
+    lazily when they reach the top. on_prewarm(job) runs `prewarm_s`
+    before a job is due (wake the TV, warm connections) and on_run(job) at
+    its due time, both on the timer thread. Jobs that
+    came due while the app was suspended or killed run on start/resume if
+    they are at most `late_grace` seconds late; older one-off jobs are
+    dropped and daily jobs move on to their next occurrence.
+    """
+
+    # Wake at least this often so suspends and wall-clock jumps are noticed
+    MAX_SLEEP = 30.0
+
+    def __init__(self, path, on_run, on_prewarm=None, prewarm_s=15.0, late_grace=600.0, clock=time.time):
+        self.path = path
+        self.on_run = on_run
+        self.on_prewarm = on_prewarm
+        self.prewarm_s = prewarm_s
+        self.late_grace = late_grace
+        self._clock = clock
+        self._jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._load()
+
+    # -- persistence ---------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for d in entries:
+            try:
+                self._push(ScheduledJob.from_dict(d))
+            except (KeyError, TypeError) as e:
+                logger.warning(f"Skipping bad scheduled job {d}: {e}")
+
+    def _save(self):
+        # Caller holds self._cond
+        try:
+            with open(self.path + ".tmp", 'w') as f:
+                json.dump([j.to_dict() for j in self._jobs.values()], f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            logger.error(f"Scheduler save error: {e}")
+
+    # -- job management -----------------------------------------------
+
+    def _push(self, job):
+        # Caller holds self._cond (or is __init__). Each job gets a prewarm
+        # entry and a run entry; entries for an outdated due time are stale.
+        self._jobs[job.job_id] = job
+        if self.on_prewarm:
+            heapq.heappush(self._heap, (job.due - self.prewarm_s, next(self._seq), job.job_id, job.due, 'warm'))
+        heapq.heappush(self._heap, (job.due, next(self._seq), job.job_id, job.due, 'run'))
+
+    def add(self, action, due, repeat=None, at=None, device=None, label=None):
+        job = ScheduledJob(action, due, repeat, at, device, label)
+        with self._cond:
+            self._push(job)
+            self._save()
+            self._cond.notify()
+        logger.info(f"Scheduled {job.describe()}")
+        return job
+
+    def add_in(self, minutes, action, device=None, label=None):
+        return self.add(action, self._clock() + minutes * 60.0, device=device, label=label)
+
+    def add_daily(self, at, action, device=None, label=None):
+        return self.add(action, next_daily(at, self._clock()), repeat='daily', at=at,
+                        device=device, label=label)
+
+    def cancel(self, job_id):
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if job:
+                self._save()
+                self._cond.notify()
+        return job is not None
+
+    def cancel_all(self):
+        with self._cond:
+            self._jobs.clear()
+            self._heap.clear()
+            self._save()
+            self._cond.notify()
+
+    def jobs(self):
+        """Pending jobs, soonest first."""
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda j: j.due)
+
+    # -- timer thread ----------------------------------------------------
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="scheduler")
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def resume(self):
+        """Re-check the heap now, e.g. when the app comes back to the foreground."""
+        with self._cond:
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                prewarm, due = self._collect(self._clock())
+                if not prewarm and not due:
+                    self._cond.wait(self._sleep_time(self._clock()))
+                    continue
+            for job in prewarm:
+                self._call(self.on_prewarm, job, "prewarm")
+            for job in due:
+                self._call(self.on_run, job, "run")
+
+    def _sleep_time(self, now):
+        # Caller holds self._cond
+        if not self._heap:
+            return self.MAX_SLEEP
+        return max(0.0, min(self.MAX_SLEEP, self._heap[0][0] - now))
+
+    def _collect(self, now):
+        """Pop entries that are due. Caller holds self._cond."""
+        due, prewarm = [], []
+        changed = False
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job_id, job_due, kind = heapq.heappop(self._heap)
+            job = self._jobs.get(job_id)
+            if job is None or job.due != job_due:
+                continue  # Cancelled or already rescheduled
+            if kind == 'warm':
+                if now < job.due:
+                    prewarm.append(job)
+                continue
+
+            changed = True
+            late = now - job_due
+            if late <= self.late_grace:
+                due.append(job)
+            else:
+                logger.info(f"Skipping {job.describe()}: {late / 60:.0f} min late")
+            if job.repeat == 'daily':
+                job.due = next_daily(job.at, max(now, job_due))
+                self._push(job)
+            else:
+                del self._jobs[job_id]
+        if changed:
+            self._save()
+        return prewarm, due
+
+    def _call(self, callback, job, what):
+        if callback is None:
+            return
+        try:
+            callback(job)
+        except Exception as e:
+            logger.error(f"Scheduled job {what} failed for {job.describe()}: {e}")
@@ -0,0 +1,179 @@
+import threading
+import time
+from concurrent.futures import Future
+from services.command_queue import CommandQueue
+from utils.logger import logger
+
+class DeviceSession:
+    """One connected TV: its controller, ordered command queue and metadata.
+
+    transports is the session's own TransportManager, if the caller routes
+    commands through one; it is shut down with the session.
+    """
+
+    def __init__(self, key, controller, device_info, transports=None):
+        self.key = key
+        self.controller = controller
+        self.device_info = device_info
+        self.transports = transports
+        self.queue = CommandQueue(controller)
+        self.input = None  # InputDispatcher feeding this session's queue, if any
+        self.last_used = time.monotonic()
+
+    @property
+    def name(self):
+        return self.device_info.get('name') or self.key
+
+    def close(self):
+        if self.input:
+            self.input.release_all()
+        self.queue.close()
+        self.controller.close()
+        if self.transports:
+            self.transports.shutdown()
+
+
+class SessionManager:
+    """Keeps several TVs connected at once so switching rooms is instant.
+
+    Each session keeps its own controller (and so its warm pooled
+    connection) and its own CommandQueue, so one slow TV never delays
+    another. Group commands fan out through every session's queue, which
+    keeps per-TV ordering, while a semaphore caps how many sends are in
+    flight at once. Past max_sessions the least recently used session that
+    isn't active is closed.
+    """
+
+    def __init__(self, max_sessions=6, group_concurrency=4):
+        self.max_sessions = max_sessions
+        self._group_slots = threading.BoundedSemaphore(group_concurrency)
+        self._sessions = {}
+        self._active_key = None
+        self._lock = threading.Lock()
+
+    def open(self, device_info, controller, transports=None):
+        """Register a connected controller under the device's IP. Returns the session."""
+        key = device_info['ip']
+        session = DeviceSession(key, controller, device_info, transports)
+        with self._lock:
+            previous = self._sessions.pop(key, None)
+            self._sessions[key] = session
+            evicted = self._evict()
+        if previous:
+            previous.close()
+        for old in evicted:
+            logger.info(f"Closing idle session for {old.key}")
+            old.close()
+        return session
+
+    def _evict(self):
+        idle = sorted((s for k, s in self._sessions.items() if k != self._active_key),
+                      key=lambda s: s.last_used)
+        evicted = []
+        while len(self._sessions) > self.max_sessions and idle:
+            victim = idle.pop(0)
+            del self._sessions[victim.key]
+            evicted.append(victim)
+        return evicted
+
+    def get(self, key):
+        with self._lock:
+            return self._sessions.get(key)
+
+    def sessions(self):
+        """Open sessions, most recently used first."""
+        with self._lock:
+            return sorted(self._sessions.values(), key=lambda s: s.last_used, reverse=True)
+
+    @property
+    def active(self):
+        with self._lock:
+            return self._sessions.get(self._active_key)
+
+    def activate(self, key):
+        """Make an open session the target of normal presses. Returns it, or None."""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session:
+                self._active_key = key
+                session.last_used = time.monotonic()
+            return session
+
+    def close(self, key):
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            if key == self._active_key:
+                self._active_key = None
+        if session:
+            session.close()
+
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._active_key = None
+        for session in sessions:
+            session.close()
+
+    def group(self, method, arg, keys=None):
+        """Run controller.<method>(arg) on several sessions concurrently.
+
+        Returns a Future resolving to {key: result}, where result is False
+        for a session whose command raised.
+        """
+        with self._lock:
+            targets = [s for k, s in self._sessions.items() if keys is None or k in keys]
+        return self._fan_out([(session, method, arg) for session in targets])
+
+    def power_off_all(self):
+        """Turn off every open TV. Roku and Android TVs get a discrete off key."""
+        from controllers.androidtv_controller import AndroidTVController
+        from controllers.roku_controller import RokuController
+
+        jobs = []
+        for session in self.sessions():
+            discrete = isinstance(session.controller, (RokuController, AndroidTVController))
+            key = 'power_off' if discrete else 'power'
+            jobs.append((session, 'send_key', key))
+        return self._fan_out(jobs)
+
+    def _fan_out(self, jobs):
+        # Sessions whose controllers share a target (several IR TVs behind one
+        # blaster) get the command once, so toggles are not sent twice
+        seen_targets = set()
+        unique = []
+        for session, method, arg in jobs:
+            target = (type(session.controller).__name__, session.controller.ip_address, method, arg)
+            if target not in seen_targets:
+                seen_targets.add(target)
+                unique.append((session, method, arg))
+
+        combined = Future()
+        results = {}
+        remaining = [len(unique)]
+        done_lock = threading.Lock()
+        if not unique:
+            combined.set_result(results)
+            return combined
+
+        def run(controller, method, arg):
+            with self._group_slots:
+                return getattr(controller, method)(arg)
+
+        def on_done(key, method, future):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Group {method} failed on {key}: {e}")
+                result = False
+            with done_lock:
+                results[key] = result
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                combined.set_result(results)
+
+        for session, method, arg in unique:
+            future = session.queue.submit(run, session.controller, method, arg)
+            future.add_done_callback(lambda f, key=session.key, method=method: on_done(key, method, f))
+        return combined
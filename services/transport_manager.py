@@ -0,0 +1,247 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from utils.logger import logger
+from utils.telemetry import telemetry
+
+class _Unconfirmed:
+    """Result of a press that went out but was never acknowledged.
+
+    Falsy, so callers that only check for success don't count it as done,
+    but it must not be retried elsewhere: the device may have acted on it.
+    """
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'UNCONFIRMED'
+
+UNCONFIRMED = _Unconfirmed()
+
+class PathStats:
+    """Rolling latency/error statistics for one transport path."""
+
+    def __init__(self, alpha=0.3, window=50):
+        self.alpha = alpha
+        self.samples = deque(maxlen=window)
+        self.ewma_ms = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+
+    def record_success(self, latency_ms):
+        self.samples.append(latency_ms)
+        self.ewma_ms = latency_ms if self.ewma_ms is None else (
+            self.alpha * latency_ms + (1 - self.alpha) * self.ewma_ms)
+        self.successes += 1
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        # Forget the old latency: a failed path is re-ranked by PRIORITY
+        # again, so Wi-Fi is tried first once it recovers instead of staying
+        # behind a backup that was measured faster while it was down
+        self.ewma_ms = None
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_failure = time.monotonic()
+
+    @property
+    def p95_ms(self):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def as_dict(self):
+        return {
+            'ewma_ms': round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            'p95_ms': round(self.p95_ms, 2) if self.samples else None,
+            'successes': self.successes,
+            'failures': self.failures,
+        }
+
+
+class TransportManager:
+    """Sends each command over the fastest healthy path with hedged fallback.
+
+    Paths are named controllers ('ecp', 'android', 'ir'). A path goes down
+    after `failure_threshold` consecutive failures (or when mark_down is
+    called) and is retried automatically after `retry_after` seconds, so the
+    app returns to Wi-Fi once it recovers. If the chosen path hasn't
+    answered within hedge_after_ms, the next path is fired in parallel and
+    the first success wins.
+    """
+
+    # Declared preference when latencies are unknown or equal
+    PRIORITY = ('ecp', 'android', 'ir')
+    # A hedged press may land on both paths, so only keys whose second
+    # press changes nothing are hedged; toggles and navigation never are.
+    # Everything else waits out a slow path and fails over only on failure
+    HEDGE_KEYS = {'home', 'power_off'}
+
+    def __init__(self, hedge_after_ms=250, failure_threshold=2, retry_after=10.0):
+        self.hedge_after_ms = hedge_after_ms
+        self.failure_threshold = failure_threshold
+        self.retry_after = retry_after
+        self._paths = {}
+        self._stats = {}
+        self._forced_down = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="transport")
+        self.on_path_used = None  # callback(path_name), e.g. to update the UI
+
+    def set_path(self, name, controller):
+        with self._lock:
+            self._paths[name] = controller
+            self._stats.setdefault(name, PathStats())
+
+    def remove_path(self, name):
+        with self._lock:
+            self._paths.pop(name, None)
+            self._forced_down.discard(name)
+
+    def get_path(self, name):
+        return self._paths.get(name)
+
+    def clear(self):
+        with self._lock:
+            self._paths.clear()
+            self._forced_down.clear()
+
+    def mark_down(self, name):
+        with self._lock:
+            self._forced_down.add(name)
+
+    def mark_up(self, name):
+        with self._lock:
+            self._forced_down.discard(name)
+            if name in self._stats:
+                self._stats[name].consecutive_failures = 0
+
+    def is_healthy(self, name):
+        if name in self._forced_down:
+            return False
+        stats = self._stats.get(name)
+        if not stats or stats.consecutive_failures < self.failure_threshold:
+            return True
+        # Half-open: give a failed path another chance after the cooldown
+        return time.monotonic() - stats.last_failure >= self.retry_after
+
+    def ranked_paths(self, method='send_key'):
+        """Healthy paths, fastest first; unhealthy ones are kept as last resort.
+
+        A path without measurements has no latency to compare, so it goes
+        just ahead of the first measured path it outranks in PRIORITY: an
+        idle IR backup stays behind a working ECP path, while ECP coming
+        back from a failure is tried before IR again.
+        """
+        with self._lock:
+            # e.g. IR has no send_keydown; such a path is not a failure, just not an option
+            names = [n for n, c in self._paths.items() if hasattr(c, method)]
+        return self._rank([n for n in names if self.is_healthy(n)], method) + \
+            self._rank([n for n in names if not self.is_healthy(n)], method)
+
+    def _rank(self, names, method):
+        def priority(name):
+            # IR can only fake app launches, keep it behind real Wi-Fi paths
+            ir_penalty = 1 if method == 'launch_app' and name == 'ir' else 0
+            return (ir_penalty, self.PRIORITY.index(name) if name in self.PRIORITY else len(self.PRIORITY))
+
+        measured = [n for n in names if self._stats[n].ewma_ms is not None]
+        ranked = sorted(measured, key=lambda n: (priority(n)[0], self._stats[n].ewma_ms, priority(n)))
+        for name in sorted((n for n in names if n not in measured), key=priority):
+            index = next((i for i, other in enumerate(ranked) if priority(other) > priority(name)), len(ranked))
+            ranked.insert(index, name)
+        return ranked
+
+    def stats(self):
+        return {name: s.as_dict() for name, s in self._stats.items()}
+
+    def _attempt(self, name, method, args):
+        controller = self._paths.get(name)
+        if controller is None or not hasattr(controller, method):
+            return False
+        start = time.perf_counter()
+        try:
+            success = getattr(controller, method)(*args)
+        except Exception as e:
+            logger.error("%s %s raised: %s", name, method, e)
+            success = False
+        stats = self._stats[name]
+        if success is UNCONFIRMED:
+            # Sent without an ack: neither a measurement nor a failure
+            telemetry.incr("cmd." + name + ".unconfirmed")
+            return success
+        if success:
+            latency_ms = (time.perf_counter() - start) * 1000.0
+            stats.record_success(latency_ms)
+            if telemetry.enabled:
+                telemetry.observe("cmd." + name + "." + method, latency_ms)
+        else:
+            stats.record_failure()
+            telemetry.incr("cmd." + name + ".fail")
+            logger.warning("%s path failed for %s%s", name, method, args)
+        return bool(success)
+
+    def execute(self, method, *args):
+        """Run controller.<method>(*args) on the best path. Returns the path used or None.
+
+        A path answering UNCONFIRMED may have delivered the press, so it
+        counts as used: another path would risk sending a toggle twice.
+        """
+        ranked = self.ranked_paths(method)
+        if not ranked:
+            return None
+
+        hedge = method == 'send_key' and args[0] in self.HEDGE_KEYS
+        index = 0
+        while index < len(ranked):
+            primary = ranked[index]
+            index += 1
+            future = self._executor.submit(self._attempt, primary, method, args)
+            if hedge and index < len(ranked) and self.is_healthy(ranked[index]):
+                done, _ = wait([future], timeout=self.hedge_after_ms / 1000.0)
+                if not done:
+                    backup = ranked[index]
+                    index += 1
+                    logger.info("%s slow (> %s ms), hedging via %s", primary, self.hedge_after_ms, backup)
+                    telemetry.incr("transport.hedge")
+                    telemetry.event('hedge', primary + "->" + backup)
+                    winner = self._first_success({
+                        future: primary,
+                        self._executor.submit(self._attempt, backup, method, args): backup,
+                    })
+                    if winner:
+                        return self._used(winner, ranked[0])
+                    continue
+            result = future.result()
+            if result is UNCONFIRMED:
+                logger.warning("%s sent %s%s without an ack, not failing over", primary, method, args)
+                return self._used(primary, ranked[0])
+            if result:
+                return self._used(primary, ranked[0])
+        telemetry.incr("transport.all_failed")
+        return None
+
+    def _first_success(self, futures):
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.result():
+                    return futures[f]
+        return None
+
+    def _used(self, name, preferred=None):
+        if preferred and name != preferred:
+            telemetry.incr("transport.fallback")
+            telemetry.event('fallback', preferred + "->" + name)
+        if self.on_path_used:
+            self.on_path_used(name)
+        return name
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
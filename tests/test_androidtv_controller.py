@@ -0,0 +1,135 @@
+import unittest
+import sys
+import os
+import hashlib
+import socket
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import MockAndroidTVServer
+from controllers import androidtv_proto as proto
+from controllers.androidtv_controller import AndroidTVController, AndroidTVPairing
+from utils.constants import KEY_MAP_ANDROID
+
+def _plain_socket(host, port, timeout):
+    return socket.create_connection((host, port), timeout=timeout)
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+class TestAndroidTVProto(unittest.TestCase):
+
+    def test_varint_round_trip(self):
+        """Varints round-trip up to 63 bits, and a truncated one is rejected."""
+        for value in (0, 1, 127, 128, 300, 2 ** 32, 2 ** 63 - 1):
+            self.assertEqual(proto.decode_varint(proto.encode_varint(value)), (value, len(proto.encode_varint(value))))
+        self.assertEqual(proto.encode_varint(300), b"\xac\x02")
+        with self.assertRaises(ValueError):
+            proto.decode_varint(b"\x80")
+
+    def test_key_inject_encoding(self):
+        """A key press encodes to the same bytes as the protobuf runtime."""
+        # Same bytes the protobuf runtime produces for RemoteMessage{remote_key_inject{19, SHORT}}
+        self.assertEqual(proto.remote_key_inject(19), bytes.fromhex("520408131003"))
+
+    def test_frame_reader_handles_split_and_batched_frames(self):
+        """Frames split across reads or sent together are reassembled in order."""
+        stream = proto.frame(b"a" * 200) + proto.frame(b"bc")
+        reader = proto.FrameReader()
+        self.assertEqual(reader.feed(stream[:1]), [])
+        self.assertEqual(reader.feed(stream[1:150]), [])
+        self.assertEqual(reader.feed(stream[150:]), [b"a" * 200, b"bc"])
+
+    def test_nested_parse(self):
+        """Nested messages parse back to their fields."""
+        fields = proto.parse_message(proto.remote_configure("m", "v", "pkg", "1"))
+        configure = proto.parse_message(proto.first(fields, proto.REMOTE_CONFIGURE))
+        self.assertEqual(proto.first(configure, 1), proto.FEATURES)
+        self.assertEqual(proto.first(proto.parse_message(proto.first(configure, 2)), 5), b"pkg")
+
+    def test_pin_secret_checks_first_byte(self):
+        """A code whose check byte doesn't match the hash, or that is malformed, is rejected."""
+        client, server = (0xC0FFEE1234567, 65537), (0xBADC0DE7654321, 65537)
+        digest = hashlib.sha256(bytes.fromhex("0C0FFEE1234567" "010001" "BADC0DE7654321" "010001" "1234")).digest()
+        pin = f"{digest[0]:02x}1234"
+        self.assertEqual(proto.pin_secret(client, server, pin), digest)
+        self.assertIsNone(proto.pin_secret(client, server, f"{(digest[0] + 1) % 256:02X}1234"))
+        self.assertIsNone(proto.pin_secret(client, server, "12345"))
+        self.assertIsNone(proto.pin_secret(client, server, "ZZ1234"))
+
+
+class TestAndroidTVController(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockAndroidTVServer().start()
+        self.controller = AndroidTVController("127.0.0.1", port=self.server.port,
+                                              socket_factory=_plain_socket, timeout=2.0)
+
+    def tearDown(self):
+        self.controller.close()
+        self.server.stop()
+
+    def test_handshake_and_ping(self):
+        """Connecting completes the configure handshake, and pings are answered."""
+        self.assertTrue(self.controller.connect())
+        self.assertEqual(self.controller.model_name, "BRAVIA 4K")
+        self.assertTrue(_wait_for(lambda: self.server.pongs == [42]))
+        self.assertTrue(self.controller.is_on)
+
+    def test_keys_stream_on_one_connection(self):
+        """Presses and holds go out over one TLS session, and unknown keys fail."""
+        self.controller.connect()
+        self.assertTrue(self.controller.send_sequence(["up", ("vol_up", 10), "select"], inter_key_ms=0))
+        expected = [(KEY_MAP_ANDROID["up"], proto.DIRECTION_SHORT),
+                    (KEY_MAP_ANDROID["vol_up"], proto.DIRECTION_START_LONG),
+                    (KEY_MAP_ANDROID["vol_up"], proto.DIRECTION_END_LONG),
+                    (KEY_MAP_ANDROID["select"], proto.DIRECTION_SHORT)]
+        self.assertTrue(_wait_for(lambda: len(self.server.keys) == 4))
+        self.assertEqual(self.server.keys, expected)
+        self.assertEqual(self.server.connections, 1)
+        self.assertFalse(self.controller.send_key("nope"))
+
+    def test_reconnects_after_tv_drops_session(self):
+        """The next press reconnects when the TV has closed the session."""
+        self.controller.connect()
+        self.server.drop_clients()
+        self.assertTrue(_wait_for(lambda: not self.controller.is_connected))
+        self.assertTrue(self.controller.send_key("home"))
+        self.assertTrue(_wait_for(lambda: self.server.keys == [(KEY_MAP_ANDROID["home"], proto.DIRECTION_SHORT)]))
+        self.assertEqual(self.server.connections, 2)
+
+    def test_launch_app_by_launcher_id_or_link(self):
+        """Known launcher ids and URLs open as app links; HDMI inputs do not."""
+        self.controller.connect()
+        self.assertTrue(self.controller.launch_app("12"))
+        self.assertTrue(self.controller.launch_app("https://example.com/app"))
+        self.assertFalse(self.controller.launch_app("tvinput.hdmi1"))
+        self.assertTrue(_wait_for(lambda: len(self.server.links) == 2))
+        self.assertEqual(self.server.links[1], "https://example.com/app")
+
+    def test_unreachable_tv(self):
+        """A TV that refuses the connection is not mistaken for one that needs pairing."""
+        self.server.stop()
+        self.assertFalse(self.controller.connect())
+        self.assertFalse(self.controller.needs_pairing)
+
+    def test_pairing_start_shows_code(self):
+        """Starting pairing sends request, options and configuration in order."""
+        pairing_server = MockAndroidTVServer(pairing=True).start()
+        try:
+            pairing = AndroidTVPairing("127.0.0.1", credentials=None, port=pairing_server.port,
+                                       socket_factory=_plain_socket, timeout=2.0)
+            self.assertTrue(pairing.start())
+            pairing.close()
+        finally:
+            pairing_server.stop()
+        steps = [next(iter(set(m) - {1, 2})) for m in pairing_server.messages]
+        self.assertEqual(steps, [proto.PAIRING_REQUEST, proto.PAIRING_OPTIONS, proto.PAIRING_CONFIGURATION])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import MockEcpServer
+from services.app_catalog import AppCatalog, IconCache, parse_apps
+from services.http_pool import HttpTransport
+
+class TestAppCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = MockEcpServer(port=0).start()
+        self.transport = HttpTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def _catalog(self):
+        return AppCatalog("127.0.0.1", self.tmp.name, port=self.server.port, transport=self.transport)
+
+    def test_refresh_then_cached_launch_needs_no_network(self):
+        """A second session renders the launcher from disk without requests."""
+        first = self._catalog()
+        self.assertTrue(first.refresh())
+        self.assertEqual([a.app_id for a in first.apps], ["tvinput.hdmi1", "12", "837", "13"])
+        self.assertTrue(all(row['icon'] for row in first.launcher_data()))
+
+        self.server.requests.clear()
+        second = self._catalog()
+        self.assertEqual(len(second.load_cached()), 4)
+        self.assertTrue(all(row['icon'] for row in second.launcher_data()))
+        self.assertEqual(self.server.requests, [])
+
+    def test_unchanged_list_skips_icon_downloads(self):
+        """Revalidation of an unchanged list only re-checks the list."""
+        catalog = self._catalog()
+        catalog.refresh()
+        self.server.requests.clear()
+        self.assertFalse(catalog.refresh())
+        self.assertEqual(self.server.requests, [("GET", "/query/apps")])
+
+    def test_evicted_icon_is_fetched_again(self):
+        """An icon dropped from the cache comes back on the next revalidation."""
+        catalog = self._catalog()
+        catalog.refresh()
+        netflix = next(a for a in catalog.apps if a.app_id == "12")
+        del catalog.icons._index[catalog.icon_key(netflix)]
+        self.server.requests.clear()
+        self.assertTrue(catalog.refresh())
+        self.assertEqual(self.server.requests, [("GET", "/query/apps"), ("GET", "/query/icon/12")])
+        self.assertTrue(catalog.icon_path(netflix))
+
+    def test_parse_apps(self):
+        """App entries keep id, name, type and version."""
+        apps = parse_apps('<apps><app id="12" type="appl" version="5.1">Netflix</app></apps>')
+        self.assertEqual((apps[0].app_id, apps[0].name, apps[0].app_type), ("12", "Netflix", "appl"))
+
+class TestIconCache(unittest.TestCase):
+
+    def test_lru_eviction_by_size(self):
+        """The least recently used icon is evicted once max_bytes is exceeded."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = IconCache(tmp, max_bytes=250)
+            cache.put("a", b"x" * 100)
+            cache.put("b", b"x" * 100)
+            cache.get("a")
+            cache.put("c", b"x" * 100)
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("c"))
+            self.assertLessEqual(cache.total_bytes, 250)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from controllers.base_controller import RemoteController
+from services.command_queue import CommandQueue
+
+class _RecordingController(RemoteController):
+    def __init__(self):
+        super().__init__("127.0.0.1", "Recorder")
+        self.sent = []
+        self.threads = set()
+
+    def connect(self):
+        return True
+
+    def send_key(self, key_code):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.001)
+        self.sent.append(key_code)
+        return True
+
+    def launch_app(self, app_id):
+        return self.send_key(f"app:{app_id}")
+
+class TestCommandQueue(unittest.TestCase):
+
+    def test_commands_run_in_order_on_one_worker(self):
+        """Rapid presses are delivered in submission order by a single thread."""
+        ctrl = _RecordingController()
+        cq = CommandQueue(ctrl)
+        keys = [f"k{i}" for i in range(20)]
+        futures = [cq.send_key(k) for k in keys]
+        self.assertTrue(all(f.result(timeout=2) for f in futures))
+        self.assertEqual(ctrl.sent, keys)
+        self.assertEqual(len(ctrl.threads), 1)
+        cq.close()
+
+    def test_send_sequence_macro(self):
+        """A macro runs as one job and keeps its key order."""
+        ctrl = _RecordingController()
+        cq = CommandQueue(ctrl)
+        done = cq.send_sequence(["home", "down", "down", "select"], inter_key_ms=0)
+        self.assertTrue(done.result(timeout=2))
+        self.assertEqual(ctrl.sent, ["home", "down", "down", "select"])
+        cq.close()
+
+    def test_closed_queue_rejects_commands(self):
+        """Submitting after close fails the future instead of hanging."""
+        cq = CommandQueue(_RecordingController())
+        cq.close()
+        with self.assertRaises(RuntimeError):
+            cq.send_key("up").result(timeout=1)
+
+    def test_close_on_full_queue_does_not_block(self):
+        """Closing behind an offline TV cancels the backlog instead of waiting on it."""
+        cq = CommandQueue(_RecordingController(), maxsize=4)
+        gate = threading.Event()
+        cq.submit(gate.wait, 2)
+        time.sleep(0.02)
+        pending = [cq.send_key("up") for _ in range(4)]
+        start = time.monotonic()
+        cq.close()
+        self.assertLess(time.monotonic() - start, 0.5)
+        gate.set()
+        self.assertTrue(pending[0].cancelled())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.device_info import DeviceInfo, parse_device_info, fetch_device_info, invalidate_device_info
+
+ROKU_XML = """<?xml version="1.0" encoding="UTF-8" ?>
+<device-info>
+    <udn>28001240-0000-1000-8000-d8c7c8c6a4b1</udn>
+    <serial-number>X01900ABCDEF</serial-number>
+    <vendor-name>TCL</vendor-name>
+    <model-name>55S425</model-name>
+    <wifi-mac>d8:c7:c8:c6:a4:b1</wifi-mac>
+    <user-device-name>Living Room</user-device-name>
+    <power-mode>PowerOn</power-mode>
+</device-info>"""
+
+UPNP_XML = """<?xml version="1.0"?>
+<root xmlns="urn:schemas-upnp-org:device-1-0">
+  <device><friendlyName>TCL Android TV</friendlyName><manufacturer>TCL</manufacturer></device>
+</root>"""
+
+class _Response:
+    status_code = 200
+    content = ROKU_XML.encode()
+
+class _CountingTransport:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return _Response()
+
+class TestDeviceInfo(unittest.TestCase):
+
+    def test_parse_roku_device_info(self):
+        """All known Roku fields are read in one pass."""
+        info = parse_device_info(ROKU_XML)
+        self.assertEqual(info.display_name, "Living Room")
+        self.assertEqual(info.model_name, "55S425")
+        self.assertEqual(info.mac, "d8:c7:c8:c6:a4:b1")
+        self.assertEqual(info.power_mode, "PowerOn")
+        self.assertFalse(hasattr(info, '__dict__'))
+
+    def test_parse_stops_early_on_wanted_fields(self):
+        """Trailing malformed XML is never reached when wanted fields come first."""
+        info = parse_device_info(ROKU_XML.replace("</device-info>", "<broken"), wanted={'model_name'})
+        self.assertEqual(info.model_name, "55S425")
+        self.assertIsNone(info.user_device_name)
+
+    def test_parse_upnp_description(self):
+        """Namespaced UPnP tags map onto the same record."""
+        info = parse_device_info(UPNP_XML)
+        self.assertEqual(info.friendly_name, "TCL Android TV")
+        self.assertEqual(info.vendor, "TCL")
+
+    def test_fetch_is_memoized_per_ip(self):
+        """Discovery and connect share one device-info request within the TTL."""
+        invalidate_device_info()
+        transport = _CountingTransport()
+        first = fetch_device_info("10.0.0.5", transport=transport)
+        second = fetch_device_info("10.0.0.5", transport=transport)
+        self.assertIsInstance(first, DeviceInfo)
+        self.assertIs(first, second)
+        self.assertEqual(transport.calls, 1)
+        fetch_device_info("10.0.0.5", transport=transport, max_age=0)
+        self.assertEqual(transport.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.device_registry import DeviceRegistry
+
+class TestDeviceRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "devices.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_persists_and_merges(self):
+        """Later records keep previously known fields such as the MAC."""
+        reg = DeviceRegistry(self.path)
+        reg.record({'ip': '192.168.1.50', 'type': 'roku', 'mac': 'AA:BB:CC:DD:EE:FF', 'method': 'ssdp'})
+        reg.record({'ip': '192.168.1.50', 'type': 'roku', 'name': 'Living Room'})
+
+        reloaded = DeviceRegistry(self.path).get('192.168.1.50')
+        self.assertEqual(reloaded['mac'], 'AA:BB:CC:DD:EE:FF')
+        self.assertEqual(reloaded['name'], 'Living Room')
+        self.assertEqual(reloaded['method'], 'ssdp')
+
+    def test_concurrent_records_all_reach_disk(self):
+        """Saves from several discovery threads never leave an older snapshot on disk."""
+        reg = DeviceRegistry(self.path)
+        threads = [threading.Thread(target=reg.record, args=({'ip': f"10.0.0.{n}", 'type': 'roku'},))
+                   for n in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(DeviceRegistry(self.path).devices(include_expired=True)), 16)
+
+    def test_warm_start_prefers_last_connected_tv(self):
+        """Only connected, non-expired TVs are warm-start candidates."""
+        reg = DeviceRegistry(self.path)
+        reg.record({'ip': '192.168.1.100', 'type': 'ir'}, connected=True)
+        reg.record({'ip': '192.168.1.50', 'type': 'roku'})
+        self.assertIsNone(reg.warm_start_candidate())
+
+        reg.record({'ip': '192.168.1.50', 'type': 'roku'}, connected=True)
+        self.assertEqual(reg.warm_start_candidate()['ip'], '192.168.1.50')
+
+    def test_revalidate_drops_expired_unreachable(self):
+        """Expired devices that don't answer the probe are removed."""
+        reg = DeviceRegistry(self.path, ttl=60)
+        reg.record({'ip': '192.168.1.50', 'type': 'roku'})
+        reg.record({'ip': '192.168.1.51', 'type': 'roku'})
+        reg._devices['192.168.1.51']['last_seen'] = time.time() - 120
+
+        alive = reg.revalidate(probe=lambda ip, port: ip == '192.168.1.50')
+        self.assertEqual([e['ip'] for e in alive], ['192.168.1.50'])
+        self.assertIsNone(reg.get('192.168.1.51'))
+
+if __name__ == '__main__':
+    unittest.main()
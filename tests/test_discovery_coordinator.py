@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from discovery.coordinator import BLASTERS, TVS, DiscoveryCoordinator, DiscoveryScan
+from services.executor import Executor
+
+class TestDiscoveryScanMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.scan = DiscoveryScan((TVS,))
+
+    def test_repeat_answers_update_in_place(self):
+        """A repeat answer updates the known entry, and the first finder stays its method."""
+        self.assertIsNotNone(self.scan.merge({'ip': "10.0.0.5", 'name': "TCL Roku TV", 'type': 'roku', 'method': 'ssdp'}))
+        self.assertIsNone(self.scan.merge({'ip': "10.0.0.5", 'name': "TCL Roku TV", 'type': 'roku'}))
+        merged = self.scan.merge({'ip': "10.0.0.5", 'name': "Living Room", 'method': 'mdns'})
+        self.assertEqual((merged['name'], merged['method']), ("Living Room", 'ssdp'))
+        self.assertEqual(len(self.scan.devices()), 1)
+
+    def test_same_mac_at_new_address_moves_the_entry(self):
+        """A MAC seen at a new address moves its entry there and folds in what that address had."""
+        self.scan.merge({'ip': "10.0.0.5", 'mac': "AA:BB:CC:00:00:01", 'name': "Bedroom"})
+        self.scan.merge({'ip': "10.0.0.9", 'type': 'roku'})
+        self.scan.merge({'ip': "10.0.0.9", 'mac': "aa:bb:cc:00:00:01"})
+        self.assertEqual(self.scan.devices(), [
+            {'ip': "10.0.0.9", 'mac': "aa:bb:cc:00:00:01", 'name': "Bedroom", 'type': 'roku'}])
+
+
+class TestDiscoveryCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.runs = []
+        self.executor = Executor(max_workers=3)
+        self.coordinator = DiscoveryCoordinator(self.executor, scanners={
+            TVS: self._fake_scanner(TVS, {'ip': "10.0.0.5", 'type': 'roku', 'name': "TV"}),
+            BLASTERS: self._fake_scanner(BLASTERS, {'ip': "10.0.0.7", 'type': 'ir', 'name': "Blaster"}),
+        })
+
+    def tearDown(self):
+        self.gate.set()
+        self.executor.shutdown()
+
+    def _fake_scanner(self, phase, device):
+        def scanner(report, token):
+            self.runs.append(phase)
+            self.started.set()
+            report(device)
+            # Reports twice like SSDP plus mDNS would; merged away
+            report(dict(device))
+            self.gate.wait(2)
+        return scanner
+
+    def test_concurrent_requests_share_one_scan(self):
+        """A second request while scanning joins the running scan."""
+        first, second, done = [], [], []
+        scan = self.coordinator.scan(on_device=first.append, on_done=done.append)
+        self.assertIs(self.coordinator.scan(on_device=second.append, on_done=done.append), scan)
+        self.gate.set()
+        self.assertTrue(scan.wait(2))
+        self.assertEqual(self.runs, [TVS, BLASTERS])
+        self.assertEqual([d['ip'] for d in first], ["10.0.0.5", "10.0.0.7"])
+        self.assertEqual(sorted(d['ip'] for d in second), ["10.0.0.5", "10.0.0.7"])
+        self.assertEqual(len(done), 2)
+
+    def test_running_scan_is_extended_with_missing_phases(self):
+        """Joining with a phase the scan lacks appends that phase."""
+        blaster_scan = self.coordinator.scan(kinds=(BLASTERS,))
+        self.assertIs(self.coordinator.scan(kinds=(TVS, BLASTERS)), blaster_scan)
+        self.gate.set()
+        self.assertTrue(blaster_scan.wait(2))
+        self.assertEqual(self.runs, [BLASTERS, TVS])
+
+    def test_finished_scan_is_reused_unless_forced(self):
+        """A recent finished scan is handed back unless force is set."""
+        self.gate.set()
+        scan = self.coordinator.scan()
+        self.assertTrue(scan.wait(2))
+        done = []
+        self.assertIs(self.coordinator.scan(kinds=(BLASTERS,), on_done=done.append), scan)
+        self.assertEqual(len(done[0]), 2)
+        forced = self.coordinator.scan(kinds=(BLASTERS,), force=True)
+        self.assertIsNot(forced, scan)
+        self.assertTrue(forced.wait(2))
+        self.assertEqual(self.runs, [TVS, BLASTERS, BLASTERS])
+
+    def test_cancelled_scan_skips_remaining_phases_and_on_done(self):
+        """Cancelling stops after the current phase and suppresses on_done."""
+        done = []
+        scan = self.coordinator.scan(on_done=done.append)
+        self.assertTrue(self.started.wait(2))
+        self.coordinator.cancel()
+        self.gate.set()
+        self.assertTrue(scan.wait(2))
+        self.assertEqual((self.runs, done), ([TVS], []))
+        self.assertIsNot(self.coordinator.scan(), scan)
+
+    def test_scan_dropped_while_queued_still_ends(self):
+        """A scan whose job is dropped before it starts still finishes."""
+        busy = Executor(max_workers=1)
+        busy.submit(self.gate.wait, 2)
+        scan = DiscoveryCoordinator(busy, scanners=self.coordinator._scanners).scan()
+        busy.shutdown()
+        self.assertTrue(scan.wait(1))
+        self.assertEqual(self.runs, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from discovery.esp32_discovery import ESP32Discovery
+
+class _PingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"pong" if self.path == "/ping" else b"not found"
+        self.send_response(200 if self.path == "/ping" else 404)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestESP32Discovery(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), _PingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_finds_blaster_and_streams_result(self):
+        """A host answering pong is reported through on_device and the result list."""
+        streamed = []
+        disc = ESP32Discovery(port=self.server.server_port, probe_timeout=0.5)
+        found = disc.discover(on_device=streamed.append, hosts=["127.0.0.1", "127.0.0.1"])
+        self.assertEqual([d['ip'] for d in found], ["127.0.0.1"])
+        self.assertEqual(streamed, found)
+        self.assertEqual(found[0]['type'], 'ir')
+
+    def test_closed_port_is_ignored(self):
+        """Hosts that refuse the connection are not reported."""
+        probe = socket.socket()
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+        disc = ESP32Discovery(port=port, probe_timeout=0.3)
+        self.assertEqual(disc.discover(hosts=["127.0.0.1"]), [])
+
+if __name__ == '__main__':
+    unittest.main()
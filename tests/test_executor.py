@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.executor import BACKGROUND, INTERACTIVE, NORMAL, CancelToken, Executor
+
+class TestExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.ui_calls = []
+        # Stands in for Clock.schedule_once: callbacks run when the test says so
+        self.executor = Executor(max_workers=2, dispatch=self.ui_calls.append)
+        self.gate = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+        self.executor.shutdown()
+
+    def _run_ui(self):
+        calls, self.ui_calls[:] = list(self.ui_calls), []
+        for call in calls:
+            call()
+
+    def test_interactive_work_is_not_starved_by_scans(self):
+        """An interactive job runs at once while background scans hold their share of workers."""
+        started = []
+        scans = [self.executor.submit(lambda n=n: (started.append(n), self.gate.wait(2)), lane=BACKGROUND)
+                 for n in ("scan1", "scan2")]
+        time.sleep(0.05)
+        # Only one background job may run with two workers
+        self.assertEqual(started, ["scan1"])
+        connect = self.executor.submit(lambda: "connected", lane=INTERACTIVE)
+        self.assertEqual(connect.result(timeout=1), "connected")
+        self.gate.set()
+        for scan in scans:
+            scan.result(timeout=2)
+        self.assertEqual(started, ["scan1", "scan2"])
+
+    def test_lanes_run_in_priority_order(self):
+        """Queued jobs start interactive first, then normal, then background."""
+        single = Executor(max_workers=1)
+        order = []
+        try:
+            single.submit(self.gate.wait, 2, lane=INTERACTIVE)
+            time.sleep(0.02)
+            waits = [single.submit(order.append, name, lane=lane)
+                     for name, lane in (("bg", BACKGROUND), ("normal", NORMAL), ("tap", INTERACTIVE))]
+            self.gate.set()
+            for future in waits:
+                future.result(timeout=2)
+        finally:
+            single.shutdown()
+        self.assertEqual(order, ["tap", "normal", "bg"])
+
+    def test_new_job_with_same_key_cancels_the_old_one(self):
+        """Submitting under a busy key cancels the earlier job and drops its result."""
+        def scan(token, name):
+            cancelled = token.sleep(2)
+            return name, cancelled
+
+        old_token, new_token = CancelToken(), CancelToken()
+        results = []
+        old = self.executor.submit(scan, old_token, "old", key='scan', token=old_token, on_result=results.append)
+        time.sleep(0.02)
+        new = self.executor.submit(scan, new_token, "new", key='scan', token=new_token, on_result=results.append)
+        self.assertEqual(old.result(timeout=1), ("old", True))
+        new_token.cancel()
+        new.result(timeout=1)
+        self._run_ui()
+        # Results of superseded or cancelled jobs never reach the UI
+        self.assertEqual(results, [])
+
+    def test_callbacks_are_marshaled_through_dispatch(self):
+        """on_result and on_error run only when the UI loop drains dispatch."""
+        results, errors = [], []
+        self.executor.submit(lambda: 42, on_result=results.append).result(timeout=1)
+        failing = self.executor.submit(lambda: 1 / 0, on_error=errors.append)
+        with self.assertRaises(ZeroDivisionError):
+            failing.result(timeout=1)
+        self.assertEqual((results, errors), ([], []))
+        self._run_ui()
+        self.assertEqual(results, [42])
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_queued_job_cancelled_before_start(self):
+        """Cancelling a key before its job starts means the job never runs."""
+        self.executor.submit(self.gate.wait, 2, lane=BACKGROUND)
+        time.sleep(0.02)
+        queued = self.executor.submit(lambda: "ran", lane=BACKGROUND, key='revalidate')
+        self.executor.cancel('revalidate')
+        self.gate.set()
+        time.sleep(0.05)
+        self.assertTrue(queued.cancelled())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import asyncio
+import socket
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.health_monitor import HealthMonitor
+
+class TestHealthMonitor(unittest.TestCase):
+
+    def test_pushes_up_then_down_after_missed_beats(self):
+        """Listeners hear UP for a live target and DOWN once it stops answering."""
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        port = server.getsockname()[1]
+
+        events = []
+        changed = threading.Event()
+
+        def listener(name, is_up):
+            events.append((name, is_up))
+            changed.set()
+
+        monitor = HealthMonitor(interval=0.05, missed_beats=2, timeout=0.2)
+        monitor.add_listener(listener)
+        monitor.watch('tv', "127.0.0.1", port)
+        monitor.start()
+        try:
+            self.assertTrue(changed.wait(2))
+            self.assertEqual(events, [('tv', True)])
+            self.assertTrue(monitor.is_up('tv'))
+
+            changed.clear()
+            server.close()
+            self.assertTrue(changed.wait(2))
+            self.assertEqual(events[-1], ('tv', False))
+        finally:
+            monitor.stop()
+
+    def test_unknown_target_reported_down_on_first_miss(self):
+        """A target that never answered is reported DOWN without waiting for more beats."""
+        probe = socket.socket()
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+
+        changed = threading.Event()
+        events = []
+        monitor = HealthMonitor(interval=5, missed_beats=3, timeout=0.2)
+        monitor.add_listener(lambda name, up: (events.append((name, up)), changed.set()))
+        monitor.watch('blaster', "127.0.0.1", port, path='/ping')
+        monitor.start()
+        try:
+            self.assertTrue(changed.wait(2))
+            self.assertEqual(events, [('blaster', False)])
+        finally:
+            monitor.stop()
+
+    def test_stop_cancels_the_beat_and_joins_the_thread(self):
+        """stop() leaves no pending tasks behind and the loop thread has ended."""
+        monitor = HealthMonitor(interval=5, timeout=0.2)
+        monitor.watch('tv', "127.0.0.1", 9)
+        monitor.start()
+        thread, loop = monitor._thread, monitor._loop
+        monitor.stop()
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(loop.is_closed())
+        self.assertEqual(asyncio.all_tasks(loop), set())
+
+if __name__ == '__main__':
+    unittest.main()
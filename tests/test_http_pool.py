@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.http_pool import HttpTransport
+
+class TestHttpTransport(unittest.TestCase):
+
+    def test_session_reused_per_host(self):
+        """Requests to the same host share one keep-alive session."""
+        transport = HttpTransport()
+        a = transport.session_for("http://192.168.1.50:8060/keypress/Up")
+        b = transport.session_for("http://192.168.1.50:8060/launch/12")
+        c = transport.session_for("http://192.168.1.100/ping")
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        transport.close()
+
+    def test_host_pool_is_bounded(self):
+        """Least recently used hosts are dropped once max_hosts is exceeded."""
+        transport = HttpTransport(max_hosts=2)
+        first = transport.session_for("http://10.0.0.1/ping")
+        transport.session_for("http://10.0.0.2/ping")
+        transport.session_for("http://10.0.0.3/ping")
+        self.assertIsNot(first, transport.session_for("http://10.0.0.1/ping"))
+        transport.close()
+
+    def test_idle_sessions_evicted(self):
+        """Sessions idle past idle_timeout are closed."""
+        transport = HttpTransport(idle_timeout=0)
+        transport.session_for("http://10.0.0.1/ping")
+        self.assertEqual(transport.evict_idle(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.command_queue import CommandQueue
+from services.input_dispatcher import InputDispatcher, TokenBucket
+
+class _Device:
+    ip_address = "10.0.0.5"
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestInputDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = CommandQueue(_Device())
+        self.calls = []
+        self.gate = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+        self.queue.close()
+
+    def _execute(self, method, *args):
+        self.calls.append((method,) + args)
+        return True
+
+    def _dispatcher(self, **kwargs):
+        return InputDispatcher(self.queue, self._execute, **kwargs)
+
+    def _block_queue(self):
+        # Holds the worker like a slow TV would, so presses pile up
+        self.queue.submit(self.gate.wait, 2)
+
+    def _settle(self):
+        self.queue.submit(lambda: None).result(timeout=3)
+
+    def test_bursts_of_one_key_are_coalesced(self):
+        """Queued repeats of one key collapse into a single repeat command."""
+        dispatcher = self._dispatcher()
+        self._block_queue()
+        for key in ["vol_up"] * 5 + ["mute", "vol_up"]:
+            dispatcher.press(key)
+        self.gate.set()
+        self._settle()
+        self.assertEqual(self.calls, [('send_repeat', 'vol_up', 5), ('send_key', 'mute'), ('send_key', 'vol_up')])
+
+    def test_stale_presses_are_dropped(self):
+        """A press older than stale_ms when its turn comes is skipped."""
+        clock = _Clock()
+        dispatcher = self._dispatcher(stale_ms=500, clock=clock)
+        self._block_queue()
+        dispatcher.press("up")
+        clock.now += 1.0
+        dispatcher.press("down")
+        self.gate.set()
+        self._settle()
+        self.assertEqual(self.calls, [('send_key', 'down')])
+
+    def test_token_bucket_paces_and_drops_what_would_go_stale(self):
+        """Presses are paced to the rate, and ones that would wait past stale_ms are dropped."""
+        dispatcher = self._dispatcher(rate=20, burst=2, stale_ms=5000)
+        start = time.monotonic()
+        for key in ["up", "down"] * 3:
+            dispatcher.press(key)
+            time.sleep(0.001)
+        self._settle()
+        self.assertEqual(len(self.calls), 6)
+        # Two free tokens, then four at 20 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+        self.calls.clear()
+        strict = self._dispatcher(rate=2, burst=1, stale_ms=100)
+        self._block_queue()
+        for key in ["up", "down", "up"]:
+            strict.press(key)
+        self.gate.set()
+        self._settle()
+        self.assertEqual(self.calls, [('send_key', 'up')])
+
+    def test_hold_becomes_keydown_keyup(self):
+        """On ECP a held key turns into a keydown and, on release, a keyup."""
+        dispatcher = self._dispatcher(hold_mode='keydown', hold_after_ms=50)
+        dispatcher.key_down("right")
+        time.sleep(0.15)
+        dispatcher.key_up("right")
+        self._settle()
+        self.assertEqual(self.calls, [('send_key', 'right'), ('send_keydown', 'right'), ('send_keyup', 'right')])
+
+    def test_hold_becomes_ir_repeat_bursts(self):
+        """On IR a held key turns into repeat bursts until release."""
+        dispatcher = self._dispatcher(hold_mode='repeat', hold_after_ms=50, repeat_burst=2)
+        dispatcher.key_down("vol_up")
+        time.sleep(0.4)
+        dispatcher.key_up("vol_up")
+        self._settle()
+        self.assertEqual(self.calls[0], ('send_key', 'vol_up'))
+        self.assertGreaterEqual(len(self.calls), 2)
+        self.assertTrue(all(call == ('send_repeat', 'vol_up', 2) for call in self.calls[1:]))
+
+    def test_hold_does_not_block_other_presses(self):
+        """A tap made while another key is held goes out right away."""
+        dispatcher = self._dispatcher(hold_mode='repeat', hold_after_ms=50, stale_ms=300)
+        dispatcher.key_down("up")
+        time.sleep(0.2)
+        dispatcher.press("select")
+        time.sleep(0.1)
+        self.assertIn(('send_key', 'select'), self.calls)
+        dispatcher.key_up("up")
+        self._settle()
+
+    def test_quick_tap_sends_once(self):
+        """Releasing before hold_after_ms sends one plain press."""
+        dispatcher = self._dispatcher(hold_mode='keydown', hold_after_ms=200)
+        dispatcher.key_down("select")
+        dispatcher.key_up("select")
+        self._settle()
+        self.assertEqual(self.calls, [('send_key', 'select')])
+
+    def test_token_bucket_refills(self):
+        """The bucket refills at its rate after the burst is spent."""
+        clock = _Clock()
+        bucket = TokenBucket(rate=4, burst=2, clock=clock)
+        self.assertTrue(bucket.take() and bucket.take())
+        self.assertFalse(bucket.take())
+        self.assertAlmostEqual(bucket.delay(), 0.25)
+        clock.now += 0.25
+        self.assertTrue(bucket.take())
+
+if __name__ == '__main__':
+    unittest.main()
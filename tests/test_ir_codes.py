@@ -0,0 +1,158 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import MockBlasterServer
+from controllers import ir_controller
+from controllers.ir_controller import IRController
+from services.http_pool import HttpTransport
+from utils.constants import TCL_IR_CODES
+from utils.ir_codes import IRCodeTable, builtin_entries, compile_code_table, default_code_table, pronto_to_raw
+
+PRONTO_POWER = ("0000 006D 0003 0000 "
+                "0155 00AA 0015 0040 0015 0015")
+
+class TestIRCodeTable(unittest.TestCase):
+
+    def test_builtin_round_trip(self):
+        """Every built-in TCL code survives compiling and lookup is case-insensitive."""
+        table = IRCodeTable.from_entries(builtin_entries())
+        for key, code in TCL_IR_CODES.items():
+            self.assertEqual(table.lookup("TCL", "default", key), code)
+        self.assertIsNone(table.lookup("tcl", "default", "nope"))
+        self.assertEqual(table.keys("tcl", "default"), sorted(TCL_IR_CODES))
+
+    def test_shipped_table_matches_constants(self):
+        """The shipped binary table holds exactly the codes in constants."""
+        table = default_code_table()
+        self.assertEqual(len(table), len(TCL_IR_CODES))
+        self.assertIsNotNone(table.lookup("tcl", "default", "power"))
+
+    def test_multi_brand_protocols_and_raw(self):
+        """RC5, Sony, NEC, raw and Pronto codes compile for several brands."""
+        table = IRCodeTable(data=compile_code_table([
+            ("philips", "55pus", "power", "RC5_0x0C"),
+            ("sony", "bravia", "mute", "SONY_0x290:15"),
+            ("tcl", "default", "power", "NEC_0x57E3E817"),
+            ("generic", "learned", "power", "RAW_38_9000,4500,560,560"),
+            ("generic", "learned", "input", "PRONTO_" + PRONTO_POWER),
+        ]))
+        self.assertEqual(table.lookup("philips", "55pus", "power"), "RC5_0xC")
+        self.assertEqual(table.lookup("sony", "bravia", "mute"), "SONY_0x290:15")
+        self.assertEqual(table.lookup("generic", "learned", "power"), "RAW_38_9000,4500,560,560")
+        self.assertTrue(table.lookup("generic", "learned", "input").startswith("RAW_38_"))
+        self.assertEqual(table.models("generic"), ["learned"])
+
+    def test_pronto_conversion(self):
+        """Pronto hex converts to carrier kHz and microsecond timings."""
+        khz, timings = pronto_to_raw(PRONTO_POWER)
+        self.assertEqual(khz, 38)
+        self.assertEqual(len(timings), 6)
+        # 0x0155 periods at ~38 kHz is the ~9 ms NEC leader
+        self.assertAlmostEqual(timings[0], 9000, delta=100)
+
+    def test_unknown_protocol_rejected(self):
+        """An unknown protocol prefix fails compilation instead of being stored."""
+        with self.assertRaises(ValueError):
+            compile_code_table([("x", "y", "power", "FOO_0x1")])
+
+
+class TestIRControllerSlots(unittest.TestCase):
+
+    def setUp(self):
+        ir_controller._blaster_slots.clear()
+        self.server = MockBlasterServer(port=0).start()
+        self.transport = HttpTransport()
+        self.ip = f"127.0.0.1:{self.server.port}"
+
+    def tearDown(self):
+        ir_controller._blaster_slots.clear()
+        self.transport.close()
+        self.server.stop()
+
+    def test_codes_pushed_once_then_sent_by_slot(self):
+        """Codes are stored on the blaster once, then presses send only a slot."""
+        controller = IRController(self.ip, transport=self.transport)
+        self.assertTrue(controller.connect())
+        self.assertEqual(len(self.server.slots), len(TCL_IR_CODES))
+
+        # A second session with the same signature does not push again
+        ir_controller._blaster_slots.clear()
+        stores = sum(1 for _, path in self.server.requests if path.startswith("/ir/store"))
+        IRController(self.ip, transport=self.transport).connect()
+        self.assertEqual(stores, sum(1 for _, path in self.server.requests if path.startswith("/ir/store")))
+
+        self.assertTrue(controller.send_key("power"))
+        self.assertIn("slot=", self.server.requests[-1][1])
+        self.assertEqual(self.server.sent[-1], controller.codes.lookup("tcl", "default", "power"))
+
+    def test_lost_slots_fall_back_to_full_code(self):
+        """A blaster that lost its slots still fires the full code and gets resynced."""
+        controller = IRController(self.ip, transport=self.transport)
+        controller.connect()
+        self.server.slots.clear()
+        self.assertTrue(controller.send_key("mute"))
+        self.assertIn("code=", self.server.requests[-1][1])
+        self.assertNotIn(self.ip, ir_controller._blaster_slots)
+
+    def test_partial_push_is_not_remembered(self):
+        """A rejected slot store leaves the signature unset, so the next connect pushes again."""
+        full, rejected, lock_free = self.server._store, [], []
+
+        def store(handler):
+            # Presses on a slot miss take this lock, so the push must not hold it
+            if ir_controller._slots_lock.acquire(blocking=False):
+                ir_controller._slots_lock.release()
+                lock_free.append(True)
+            if not rejected:
+                rejected.append(handler.path)
+                return 500, b"Store failed", "text/plain"
+            return full(handler)
+
+        self.server.routes = [("/ir/store", store)] + self.server.routes
+        controller = IRController(self.ip, transport=self.transport)
+        self.assertIsNone(controller.sync_codes())
+        self.assertEqual(self.server.signature, "")
+        self.assertNotIn(self.ip, ir_controller._blaster_slots)
+
+        self.assertTrue(controller.sync_codes())
+        self.assertEqual(len(self.server.slots), len(TCL_IR_CODES))
+        self.assertNotEqual(self.server.signature, "")
+        self.assertEqual(len(lock_free), len(TCL_IR_CODES) + 1)
+
+    def test_batch_coalesces_repeats_into_one_request(self):
+        """A key sequence goes out as one batch request, fired in order by the blaster."""
+        controller = IRController(self.ip, transport=self.transport)
+        controller.connect()
+        before = len(self.server.requests)
+        self.assertTrue(controller.send_batch(["vol_up"] * 5 + ["mute", "vol_down", "vol_down"], gap_ms=0))
+        self.assertEqual(len(self.server.requests), before + 1)
+        method, path = self.server.requests[-1]
+        self.assertEqual(method, "POST")
+        self.assertTrue(path.startswith("/ir/batch"))
+        lookup = lambda k: controller.codes.lookup("tcl", "default", k)
+        self.assertEqual(self.server.sent[-8:], [lookup("vol_up")] * 5 + [lookup("mute")] + [lookup("vol_down")] * 2)
+
+    def test_coalesce_holds_and_runs(self):
+        """Runs of one key and timed holds become repeat counts."""
+        runs = IRController.coalesce(["up", "up", ("up", 330), "select"])
+        self.assertEqual(runs, [["up", 5], ["select", 1]])
+
+    def test_large_batch_is_chunked_within_firmware_limits(self):
+        """No chunk carries more sends than the firmware accepts."""
+        controller = IRController(self.ip, transport=self.transport)
+        chunks = list(controller._batch_chunks(controller.coalesce(["vol_up"] * 100)))
+        self.assertEqual([sum(c for _, c in chunk) for chunk in chunks], [64, 36])
+
+    def test_batch_falls_back_per_key_on_old_firmware(self):
+        """Firmware without /ir/batch gets one request per press."""
+        self.server.routes = [("/ir/batch", lambda h: (404, b"Not found", "text/plain"))] + self.server.routes
+        controller = IRController(self.ip, transport=self.transport)
+        self.assertTrue(controller.send_batch(["up", "up", "select"], gap_ms=0))
+        self.assertEqual(len(self.server.sent), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import MockBlasterServer
+from controllers import ir_controller
+from controllers.ir_controller import IRController
+from controllers.ir_udp import ACK, FRAME, pack_frame, parse_caps, unpack_ack
+from services.http_pool import HttpTransport
+from services.transport_manager import UNCONFIRMED, TransportManager
+
+def _reset_caches():
+    ir_controller._blaster_slots.clear()
+    for channel in ir_controller._udp_channels.values():
+        if channel:
+            channel.close()
+    ir_controller._udp_channels.clear()
+
+class TestUdpFrames(unittest.TestCase):
+
+    def test_frame_layout(self):
+        """A press frame packs magic, version, low 16 bits of seq, slot and repeat."""
+        frame = pack_frame(0x1_0005, 12, 3)
+        self.assertEqual(len(frame), FRAME.size)
+        self.assertEqual(frame, b"IR\x01\x05\x00\x0c\x03")
+
+    def test_unpack_ack(self):
+        """Acks with the wrong magic or length are ignored."""
+        self.assertEqual(unpack_ack(ACK.pack(b"IA", 7, 0)), (7, 0))
+        self.assertIsNone(unpack_ack(ACK.pack(b"XX", 7, 0)))
+        self.assertIsNone(unpack_ack(b"IA"))
+
+    def test_parse_caps(self):
+        """The /caps line parses into integer capabilities."""
+        self.assertEqual(parse_caps("udp=4210 slots=64 batch=1"), {'udp': 4210, 'slots': 64, 'batch': 1})
+
+
+class TestIRControllerUdp(unittest.TestCase):
+
+    def setUp(self):
+        _reset_caches()
+        self.transport = HttpTransport()
+        self.server = None
+
+    def tearDown(self):
+        _reset_caches()
+        self.transport.close()
+        if self.server:
+            self.server.stop()
+
+    def _connect(self, **server_kwargs):
+        self.server = MockBlasterServer(port=0, **server_kwargs).start()
+        controller = IRController(f"127.0.0.1:{self.server.port}", transport=self.transport)
+        self.assertTrue(controller.connect())
+        return controller
+
+    def test_press_goes_over_udp_without_http(self):
+        """With a UDP port advertised, a press sends no HTTP request."""
+        controller = self._connect(udp_port=0)
+        before = len(self.server.requests)
+        self.assertTrue(controller.send_key("power"))
+        self.assertEqual(len(self.server.requests), before)
+        self.assertEqual(self.server.sent, [controller.codes.lookup("tcl", "default", "power")])
+
+    def test_lost_frame_is_retransmitted_and_fired_once(self):
+        """A dropped frame is retransmitted, and the blaster fires the code only once."""
+        controller = self._connect(udp_port=0, drop_udp=1)
+        self.assertTrue(controller.send_key("mute"))
+        self.assertEqual(self.server.udp_frames, 2)
+        self.assertEqual(len(self.server.sent), 1)
+
+    def test_repeat_is_one_frame_with_a_count(self):
+        """A repeat goes out as one UDP frame that the blaster fires count times."""
+        controller = self._connect(udp_port=0)
+        self.assertTrue(controller.send_repeat("vol_up", 4))
+        self.assertEqual(self.server.udp_frames, 1)
+        self.assertEqual(self.server.sent, [controller.codes.lookup("tcl", "default", "vol_up")] * 4)
+
+    def test_http_only_firmware_keeps_using_http(self):
+        """Firmware without a UDP port keeps getting slot presses over HTTP."""
+        controller = self._connect()
+        self.assertIsNone(ir_controller._udp_channels[controller.blaster_ip])
+        self.assertTrue(controller.send_key("power"))
+        self.assertIn("slot=", self.server.requests[-1][1])
+
+    def test_no_ack_falls_back_to_http(self):
+        """Without acks a non-toggle press goes over HTTP, and the channel is dropped."""
+        controller = self._connect(udp_port=0, drop_udp=10)
+        self.assertTrue(controller.send_key("vol_up"))
+        self.assertIn("slot=", self.server.requests[-1][1])
+        self.assertNotIn(controller.blaster_ip, ir_controller._udp_channels)
+
+    def test_unacked_toggle_is_not_resent(self):
+        """A power press that may have fired is reported unconfirmed, not repeated over HTTP."""
+        controller = self._connect(udp_port=0, drop_udp=10)
+        before = len(self.server.requests)
+        self.assertIs(controller.send_key("power"), UNCONFIRMED)
+        self.assertEqual(len(self.server.requests), before)
+
+    def test_unacked_toggle_does_not_fail_over(self):
+        """The transport manager doesn't resend an unconfirmed power press over Wi-Fi."""
+        class _Ecp:
+            sent = []
+
+            def send_key(self, key_code):
+                self.sent.append(key_code)
+                return True
+
+        controller = self._connect(udp_port=0, drop_udp=10)
+        tm = TransportManager(failure_threshold=1)
+        tm.set_path('ecp', _Ecp())
+        tm.set_path('ir', controller)
+        tm._stats['ecp'].record_success(80)
+        tm._stats['ir'].record_success(10)
+        try:
+            self.assertEqual(tm.execute('send_key', 'power'), 'ir')
+        finally:
+            tm.shutdown()
+        self.assertEqual(_Ecp.sent, [])
+        self.assertEqual(tm._stats['ir'].failures, 0)
+
+    def test_backup_path_uses_udp_after_prepare(self):
+        """An IR backup path that never connected still presses over UDP."""
+        self.server = MockBlasterServer(port=0, udp_port=0).start()
+        blaster_ip = f"127.0.0.1:{self.server.port}"
+        # As the health monitor's job does for the whole app
+        IRController(blaster_ip, transport=self.transport).prepare_blaster()
+        backup = IRController(blaster_ip, transport=self.transport)
+        before = len(self.server.requests)
+        self.assertTrue(backup.send_key("mute"))
+        self.assertEqual((len(self.server.requests), self.server.udp_frames), (before, 1))
+
+if __name__ == '__main__':
+    unittest.main()
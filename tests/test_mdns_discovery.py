@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from discovery.mdns_discovery import MDNSDiscovery
+
+HOST = "tclblaster.local"
+
+# Reply echoing the question; the answer's name is a pointer to it (offset 12)
+COMPRESSED_REPLY = (
+    b"\x00\x00\x84\x00\x00\x01\x00\x01\x00\x00\x00\x00"
+    b"\x0atclblaster\x05local\x00" b"\x00\x01\x80\x01"
+    b"\xc0\x0c" b"\x00\x01\x80\x01" b"\x00\x00\x00\x78" b"\x00\x04" b"\xc0\xa8\x01\x32"
+)
+
+# Service announcement: a PTR and an SRV record come before the A record,
+# whose name ends in a pointer to "local" inside the PTR name (offset 29)
+SERVICE_REPLY = (
+    b"\x00\x00\x84\x00\x00\x00\x00\x02\x00\x00\x00\x01"
+    b"\x0b_tclblaster\x04_tcp\x05local\x00" b"\x00\x0c\x00\x01" b"\x00\x00\x11\x94"
+    b"\x00\x0a" b"\x07blaster\xc0\x0c"
+    b"\x07blaster\xc0\x0c" b"\x00\x21\x80\x01" b"\x00\x00\x00\x78"
+    b"\x00\x08" b"\x00\x00\x00\x00\x00\x50\xc0\x1d"
+    b"\x0atclblaster\xc0\x1d" b"\x00\x01\x80\x01" b"\x00\x00\x00\x78" b"\x00\x04" b"\x0a\x00\x00\x07"
+)
+
+class TestMDNSPackets(unittest.TestCase):
+
+    def test_build_query(self):
+        """The query asks for one A record with the unicast-response bit set."""
+        self.assertEqual(MDNSDiscovery._build_query(HOST),
+                         b"\x00" * 4 + b"\x00\x01" + b"\x00" * 6
+                         + b"\x0atclblaster\x05local\x00" + b"\x00\x01\x80\x01")
+
+    def test_compressed_answer_name(self):
+        """An answer naming the host through a compression pointer is resolved."""
+        self.assertEqual(MDNSDiscovery._parse_a_records(COMPRESSED_REPLY, HOST), ["192.168.1.50"])
+        self.assertEqual(MDNSDiscovery._parse_a_records(COMPRESSED_REPLY, "TCLBlaster.Local"), ["192.168.1.50"])
+
+    def test_ptr_and_srv_records_are_skipped(self):
+        """Only the A record for the host is used from a service announcement."""
+        self.assertEqual(MDNSDiscovery._parse_a_records(SERVICE_REPLY, HOST), ["10.0.0.7"])
+        self.assertEqual(MDNSDiscovery._parse_a_records(SERVICE_REPLY, "other.local"), [])
+
+    def test_read_name_follows_pointers(self):
+        """A name ending in a pointer continues after the pointer, not after the target."""
+        name, end = MDNSDiscovery._read_name(SERVICE_REPLY, SERVICE_REPLY.index(b"\x0atclblaster"))
+        self.assertEqual(name, HOST)
+        self.assertEqual(SERVICE_REPLY[end:end + 2], b"\x00\x01")
+
+    def test_queries_from_other_hosts_are_ignored(self):
+        """A packet without the response flag yields nothing."""
+        query = COMPRESSED_REPLY[:2] + b"\x00\x00" + COMPRESSED_REPLY[4:]
+        self.assertEqual(MDNSDiscovery._parse_a_records(query, HOST), [])
+
+    def test_truncated_packets_yield_nothing(self):
+        """Every cut of a valid reply parses to no address instead of raising."""
+        for packet in (COMPRESSED_REPLY, SERVICE_REPLY):
+            for length in range(len(packet) - 1):
+                self.assertEqual(MDNSDiscovery._parse_a_records(packet[:length], HOST), [], length)
+
+    def test_malformed_packets_yield_nothing(self):
+        """Pointer loops and overstated record counts are rejected."""
+        loop = b"\x00\x00\x84\x00\x00\x00\x00\x01\x00\x00\x00\x00" + b"\xc0\x0c"
+        self.assertEqual(MDNSDiscovery._parse_a_records(loop, HOST), [])
+        extra_count = COMPRESSED_REPLY[:6] + b"\x00\x05" + COMPRESSED_REPLY[8:]
+        self.assertEqual(MDNSDiscovery._parse_a_records(extra_count, HOST), [])
+
+if __name__ == '__main__':
+    unittest.main()
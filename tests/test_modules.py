@@ -5,10 +5,10 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from modules.roku_controller import RokuController
-from modules.ir_controller import IRController
-from modules.discovery import DiscoveryService
-from config import KEY_MAP_ROKU
+from controllers.roku_controller import RokuController
+from controllers.ir_controller import IRController
+from discovery.ssdp_discovery import SSDPDiscovery
+from utils.constants import KEY_MAP_ROKU
 
 class TestRemoteSystem(unittest.TestCase):
 
@@ -38,9 +38,9 @@ class TestRemoteSystem(unittest.TestCase):
             
     def test_discovery_init(self):
         """Test discovery service initialization."""
-        ds = DiscoveryService()
+        ds = SSDPDiscovery()
         self.assertIsInstance(ds.found_devices, list)
-        print("[PASS] DiscoveryService Instantiation")
+        print("[PASS] SSDPDiscovery Instantiation")
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+import socket
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.power_service import PowerService
+
+def _free_port():
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    return port
+
+class TestPowerService(unittest.TestCase):
+
+    def test_resolves_when_tv_becomes_reachable(self):
+        """The future resolves True once the TV starts accepting connections."""
+        port = _free_port()
+        tv = socket.socket()
+        tv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        def boot():
+            tv.bind(("127.0.0.1", port))
+            tv.listen(4)
+        timer = threading.Timer(0.5, boot)
+        timer.start()
+        try:
+            future = PowerService.power_on(None, "127.0.0.1:1", tv_ip="127.0.0.1", port=port, deadline=5)
+            self.assertTrue(future.result(timeout=6))
+        finally:
+            timer.join()
+            tv.close()
+
+    def test_deadline_expires(self):
+        """An unreachable TV resolves False at the deadline."""
+        future = PowerService.power_on(None, "127.0.0.1:1", tv_ip="127.0.0.1", port=_free_port(), deadline=0.5)
+        self.assertFalse(future.result(timeout=3))
+
+    def test_many_power_ons_do_not_deadlock(self):
+        """More power-ons than pool workers still all resolve."""
+        futures = [PowerService.power_on(None, "127.0.0.1:1") for _ in range(8)]
+        for future in futures:
+            future.result(timeout=10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import MockEcpServer
+from controllers.roku_controller import RokuController, TextStream
+from services.http_pool import HttpTransport
+
+class TestRokuText(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockEcpServer(port=0, latency_ms=2).start()
+        self.transport = HttpTransport()
+        self.roku = RokuController("127.0.0.1", port=self.server.port, transport=self.transport)
+
+    def tearDown(self):
+        self.roku.close()
+        self.transport.close()
+        self.server.stop()
+
+    def _typed(self):
+        return [path.split("/keypress/", 1)[1] for _, path in self.server.requests if "/keypress/" in path]
+
+    def test_send_text_uses_literal_keys_in_order(self):
+        """Each character is sent URL-quoted as a Lit_ key, and backspace as Backspace."""
+        self.assertTrue(self.roku.send_text("Hi é\b"))
+        self.assertEqual(self._typed(), ["Lit_H", "Lit_i", "Lit_%20", "Lit_%C3%A9", "Backspace"])
+
+    def test_stream_applies_backpressure_without_losing_order(self):
+        """A full buffer accepts fewer characters, and waiting lets the rest through in order."""
+        stream = TextStream(self.roku, max_pending=4)
+        accepted = stream.write("abcdefghij")
+        self.assertLess(accepted, 10)
+        # Waiting for room lets the rest through, still in order
+        self.assertEqual(stream.write("abcdefghij"[accepted:], timeout=2), 10 - accepted)
+        self.assertTrue(stream.drain(timeout=2))
+        self.assertEqual(self._typed(), ["Lit_" + c for c in "abcdefghij"])
+        stream.close()
+
+    def test_sync_sends_edits_and_reports_what_the_tv_has(self):
+        """sync() sends only the edit and returns the text the TV will hold."""
+        stream = TextStream(self.roku, max_pending=8)
+        self.assertEqual(stream.sync("star"), "star")
+        self.assertEqual(stream.sync("stop"), "stop")
+        self.assertTrue(stream.drain(timeout=2))
+        self.assertEqual(self._typed(), ["Lit_s", "Lit_t", "Lit_a", "Lit_r", "Backspace", "Backspace", "Lit_o", "Lit_p"])
+        # A paste bigger than the buffer is cut to what was accepted
+        self.server.latency_ms = 50
+        result = stream.sync("stop" + "x" * 20)
+        self.assertTrue(result.startswith("stop"))
+        self.assertLess(len(result), 24)
+        self.assertEqual(stream.text, result)
+        stream.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.scheduler import Scheduler, next_daily
+
+class _Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "schedule.json")
+        self.clock = _Clock()
+        self.ran, self.warmed = [], []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scheduler(self, **kwargs):
+        return Scheduler(self.path, self.ran.append, on_prewarm=self.warmed.append,
+                         prewarm_s=15, clock=self.clock, **kwargs)
+
+    def _tick(self, scheduler, seconds):
+        self.clock.now += seconds
+        with scheduler._cond:
+            prewarm, due = scheduler._collect(self.clock.now)
+        self.warmed.extend(prewarm)
+        self.ran.extend(due)
+
+    def test_prewarm_then_run_in_due_order(self):
+        """Each job is prewarmed before it is due, and jobs run in due order."""
+        s = Scheduler(self.path, None, on_prewarm=lambda j: None, prewarm_s=15, clock=self.clock)
+        late = s.add_in(2, 'power_off', label="late")
+        early = s.add_in(1, 'power_off', label="early")
+        self._tick(s, 50)
+        self.assertEqual(self.warmed, [early])
+        self.assertEqual(self.ran, [])
+        self._tick(s, 10)
+        self.assertEqual(self.ran, [early])
+        self._tick(s, 60)
+        self.assertEqual(self.ran, [early, late])
+        self.assertEqual(s.jobs(), [])
+
+    def test_cancel(self):
+        """A cancelled job neither prewarms nor runs."""
+        s = self._scheduler()
+        job = s.add_in(1, 'power_off')
+        self.assertTrue(s.cancel(job.job_id))
+        self._tick(s, 120)
+        self.assertEqual((self.ran, self.warmed), ([], []))
+
+    def test_jobs_survive_restart_and_catch_up(self):
+        """A job that came due while the app was killed runs on restart within the grace."""
+        job = self._scheduler().add_in(5, 'power_off')
+        # App was killed; it starts again 2 minutes after the job was due
+        self.clock.now += 7 * 60
+        restarted = self._scheduler()
+        self.assertEqual([j.job_id for j in restarted.jobs()], [job.job_id])
+        self._tick(restarted, 0)
+        self.assertEqual([j.job_id for j in self.ran], [job.job_id])
+
+    def test_stale_one_off_jobs_are_dropped(self):
+        """A one-off job far past the grace is dropped instead of run."""
+        self._scheduler(late_grace=600).add_in(5, 'power_off')
+        self.clock.now += 24 * 3600
+        restarted = self._scheduler(late_grace=600)
+        self._tick(restarted, 0)
+        self.assertEqual(self.ran, [])
+        self.assertEqual(restarted.jobs(), [])
+
+    def test_daily_job_reschedules(self):
+        """After running, a daily job moves to the same time the next day."""
+        s = self._scheduler()
+        job = s.add_daily("23:30", 'power_off')
+        first_due = job.due
+        self._tick(s, first_due - self.clock.now)
+        self.assertEqual(self.ran, [job])
+        self.assertAlmostEqual(s.jobs()[0].due - first_due, 86400, delta=3600)  # DST may shift an hour
+
+    def test_next_daily_is_strictly_after_now(self):
+        """The next daily occurrence is later than now and at the requested local time."""
+        due = next_daily("07:00", self.clock.now)
+        self.assertGreater(due, self.clock.now)
+        self.assertLessEqual(due - self.clock.now, 86400 + 3600)
+        self.assertEqual(time.strftime("%H:%M", time.localtime(due)), "07:00")
+
+    def test_timer_thread_runs_job(self):
+        """The background thread runs a job at its due time."""
+        fired = threading.Event()
+        s = Scheduler(self.path, lambda job: fired.set())
+        s.start()
+        try:
+            s.add(action='power_off', due=time.time() + 0.05)
+            self.assertTrue(fired.wait(2))
+        finally:
+            s.stop()
+
+if __name__ == '__main__':
+    unittest.main()
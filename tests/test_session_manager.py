@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import MockEcpServer
+from controllers.base_controller import RemoteController
+from controllers.ir_controller import IRController
+from controllers.roku_controller import RokuController
+from services.http_pool import HttpTransport
+from services.session_manager import SessionManager
+
+class _SlowController(RemoteController):
+    """Records how many sends overlap."""
+    SEND_S = 0.1
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, ip):
+        super().__init__(ip, "Slow TV")
+        self.sent = []
+
+    def connect(self):
+        return True
+
+    def send_key(self, key_code):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(cls.SEND_S)
+        with cls.lock:
+            cls.in_flight -= 1
+        self.sent.append(key_code)
+        return True
+
+    def launch_app(self, app_id):
+        return True
+
+class TestSessionManager(unittest.TestCase):
+
+    def setUp(self):
+        _SlowController.in_flight = _SlowController.peak = 0
+        self.manager = SessionManager(max_sessions=3, group_concurrency=2)
+
+    def tearDown(self):
+        self.manager.close_all()
+
+    def _open(self, ip):
+        return self.manager.open({'ip': ip, 'name': f"TV {ip}"}, _SlowController(ip))
+
+    def test_switching_keeps_sessions_open(self):
+        """Switching TVs keeps the other session and its controller open."""
+        first = self._open("10.0.0.1")
+        second = self._open("10.0.0.2")
+        self.manager.activate(first.key)
+        self.assertIs(self.manager.active, first)
+        self.assertIs(self.manager.activate(second.key), second)
+        self.assertIs(self.manager.get(first.key).controller, first.controller)
+
+    def test_group_runs_in_parallel_with_bounded_concurrency(self):
+        """A group command reaches every TV in parallel, at most max_parallel at a time."""
+        sessions = [self._open(f"10.0.0.{i}") for i in range(1, 4)]
+        start = time.perf_counter()
+        results = self.manager.group('send_key', 'power').result(timeout=2)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(results, {s.key: True for s in sessions})
+        self.assertEqual(_SlowController.peak, 2)
+        # Overlapping sends finish well before three in a row would
+        self.assertLess(elapsed, 3 * _SlowController.SEND_S)
+
+    def test_lru_eviction_spares_active_session(self):
+        """Past the session limit the least recently used idle TV is closed, never the active one."""
+        first = self._open("10.0.0.1")
+        self.manager.activate(first.key)
+        for i in range(2, 5):
+            self._open(f"10.0.0.{i}")
+        keys = {s.key for s in self.manager.sessions()}
+        self.assertEqual(len(keys), 3)
+        self.assertIn(first.key, keys)
+        self.assertNotIn("10.0.0.2", keys)
+
+    def test_power_off_all_uses_discrete_key_and_sends_ir_once(self):
+        """Roku TVs get PowerOff, and TVs sharing one blaster get a single IR toggle."""
+        server = MockEcpServer(port=0).start()
+        transport = HttpTransport()
+        try:
+            roku = RokuController("127.0.0.1", port=server.port, transport=transport)
+            self.manager.open({'ip': "127.0.0.1"}, roku)
+            ir_a, ir_b = IRController("127.0.0.9:1"), IRController("127.0.0.9:1")
+            ir_a.send_key = ir_b.send_key = _CountingSend()
+            self.manager.open({'ip': "10.0.0.7"}, ir_a)
+            self.manager.open({'ip': "10.0.0.8"}, ir_b)
+            results = self.manager.power_off_all().result(timeout=2)
+        finally:
+            transport.close()
+            server.stop()
+        self.assertIn(("POST", "/keypress/PowerOff"), server.requests)
+        self.assertEqual(ir_a.send_key.calls, 1)
+        self.assertEqual(len(results), 2)
+
+class _CountingSend:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, key):
+        self.calls += 1
+        return True
+
+if __name__ == '__main__':
+    unittest.main()
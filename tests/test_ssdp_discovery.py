@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import socket
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_servers import MockSSDPResponder
+from discovery.ssdp_discovery import SSDPDiscovery
+
+def _free_udp_port():
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    return port
+
+class TestSSDPDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.port = _free_udp_port()
+        # Two TVs answering from different loopback addresses
+        self.responders = [MockSSDPResponder(port=self.port, reply_ip=ip).start()
+                           for ip in ("127.0.0.1", "127.0.0.2")]
+        self.discovery = SSDPDiscovery(ssdp_port=self.port, interface_ip="127.0.0.1")
+
+    def tearDown(self):
+        for responder in self.responders:
+            responder.stop()
+
+    def test_devices_are_streamed_as_they_arrive(self):
+        """on_device hears each TV while the scan is still listening."""
+        self.discovery._get_roku_device_name = lambda ip: None
+        streamed = []
+        start = time.monotonic()
+        devices = self.discovery.discover(
+            timeout=0.5, on_device=lambda d: streamed.append((d['ip'], time.monotonic() - start)))
+        self.assertEqual(sorted(ip for ip, _ in streamed), ["127.0.0.1", "127.0.0.2"])
+        self.assertTrue(all(at < 0.4 for _, at in streamed))
+        self.assertEqual(sorted(d['ip'] for d in devices), ["127.0.0.1", "127.0.0.2"])
+
+    def test_slow_name_fetch_does_not_block_the_receive_loop(self):
+        """A TV whose name lookup hangs doesn't hold back the next TV's answer."""
+        both_seen = threading.Event()
+        streamed = []
+
+        def on_device(device):
+            streamed.append((device['ip'], device['name']))
+            if len({ip for ip, _ in streamed}) == 2:
+                both_seen.set()
+
+        def slow_name(ip):
+            # Only returns once the other TV has been streamed
+            both_seen.wait(2)
+            return "Living Room " + ip
+
+        self.discovery._get_roku_device_name = slow_name
+        start = time.monotonic()
+        devices = self.discovery.discover(timeout=0.5, on_device=on_device)
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual({name for _, name in streamed[:2]}, {"TCL Roku TV"})
+        self.assertEqual(sorted(name for _, name in streamed[2:]),
+                         ["Living Room 127.0.0.1", "Living Room 127.0.0.2"])
+        self.assertEqual(sorted(d['name'] for d in devices), ["Living Room 127.0.0.1", "Living Room 127.0.0.2"])
+
+    def test_resolver_pool_is_shut_down(self):
+        """No name lookup thread outlives discover()."""
+        self.discovery._get_roku_device_name = lambda ip: time.sleep(0.2) or "Bedroom"
+        devices = self.discovery.discover(timeout=0.1)
+        self.assertEqual({d['name'] for d in devices}, {"Bedroom"})
+        self.assertEqual([t.name for t in threading.enumerate() if t.name.startswith("ssdp-resolve")], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import subprocess
+import ast
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.startup import StartupTimeline
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# main.py's top-level project imports. Modules that need kivy can't be
+# imported here, so their own project imports stand in for them.
+KIVY_BOUND = {'utils.storage': ('utils.device_registry',), 'utils.ui_utils': ()}
+EAGER_MODULES = (
+    'utils.startup', 'services.scheduler', 'services.session_manager', 'services.transport_manager',
+    'services.health_monitor', 'services.executor', 'services.input_dispatcher', 'utils.device_registry',
+    'utils.constants', 'utils.logger', 'utils.telemetry',
+)
+
+class TestStartupTimeline(unittest.TestCase):
+
+    def test_marks_once_and_notifies_hooks(self):
+        """Each phase is recorded once and reported to hooks in order."""
+        timeline = StartupTimeline()
+        seen = []
+        timeline.add_hook(lambda phase, ms: seen.append(phase))
+        self.assertIsNotNone(timeline.mark('import'))
+        self.assertIsNone(timeline.mark('import'))
+        timeline.mark('build')
+        self.assertEqual(seen, ['import', 'build'])
+        self.assertEqual(list(timeline.phases()), ['import', 'build'])
+        self.assertLessEqual(timeline.elapsed('import'), timeline.elapsed('build'))
+
+    def test_late_hook_replays_reached_phases(self):
+        """A hook added after a phase was reached still hears about it."""
+        timeline = StartupTimeline()
+        timeline.mark('import')
+        seen = []
+        timeline.add_hook(lambda phase, ms: seen.append(phase))
+        self.assertEqual(seen, ['import'])
+
+    def test_failing_hook_does_not_break_startup(self):
+        """An exception in a hook does not stop the phase from being marked."""
+        timeline = StartupTimeline()
+        timeline.add_hook(lambda phase, ms: 1 / 0)
+        self.assertIsNotNone(timeline.mark('build'))
+
+    def test_over_budget(self):
+        """Phases slower than their budget are reported."""
+        timeline = StartupTimeline(budget_ms={'import': 0})
+        timeline.mark('import')
+        self.assertIn('import', timeline.over_budget())
+
+    def test_eager_startup_modules_stay_light(self):
+        """What main.py imports up front must not pull in requests, controllers or discovery."""
+        code = ("import sys; import " + ", ".join(EAGER_MODULES) + "; "
+                "heavy = [m for m in sys.modules if m == 'requests' or m.startswith(('controllers', 'discovery'))]; "
+                "print(','.join(heavy))")
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(out.stdout.strip(), "")
+
+    def test_eager_module_list_matches_main(self):
+        """EAGER_MODULES lists every project module main.py imports at the top level."""
+        with open(os.path.join(ROOT, "main.py")) as f:
+            tree = ast.parse(f.read())
+        imported = {node.module for node in tree.body if isinstance(node, ast.ImportFrom)}
+        imported |= {alias.name for node in tree.body if isinstance(node, ast.Import) for alias in node.names}
+        project = {m for m in imported if m.split('.')[0] in ('controllers', 'discovery', 'services', 'utils')}
+        self.assertEqual(project - set(KIVY_BOUND), set(EAGER_MODULES) - {dep for deps in KIVY_BOUND.values() for dep in deps})
+
+if __name__ == '__main__':
+    unittest.main()
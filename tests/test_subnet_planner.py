@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from discovery.subnet_planner import SubnetPlanner, parse_arp_table
+
+ARP = """IP address       HW type     Flags       HW address            Mask     Device
+192.168.18.1     0x1         0x2         aa:bb:cc:00:00:01     *        wlan0
+192.168.18.57    0x1         0x2         24:0a:c4:12:34:56     *        wlan0
+192.168.18.60    0x1         0x0         00:00:00:00:00:00     *        wlan0
+10.9.9.9         0x1         0x2         aa:bb:cc:00:00:02     *        eth1
+"""
+
+class TestSubnetPlanner(unittest.TestCase):
+
+    def test_parse_arp_keeps_resolved_entries(self):
+        """Incomplete ARP entries are dropped."""
+        self.assertEqual([ip for ip, _, _ in parse_arp_table(ARP)], ["192.168.18.1", "192.168.18.57", "10.9.9.9"])
+
+    def test_order_known_then_arp_then_dhcp_range(self):
+        """Known blasters come first, then ARP neighbours, then the rest of the subnet."""
+        planner = SubnetPlanner(interfaces=[("wlan0", "192.168.18.23", "255.255.255.0")],
+                                known_ips=["192.168.18.200", "172.16.0.5"],
+                                arp_entries=parse_arp_table(ARP))
+        hosts = planner.plan()
+        self.assertEqual(hosts[:3], ["192.168.18.200", "192.168.18.57", "192.168.18.100"])
+        # Own address, gateway, network/broadcast and foreign subnets are never probed
+        for ip in ("192.168.18.23", "192.168.18.1", "192.168.18.0", "192.168.18.255", "172.16.0.5", "10.9.9.9"):
+            self.assertNotIn(ip, hosts)
+        self.assertEqual(len(hosts), 254 - 2)  # every host but ourselves and the gateway
+        self.assertEqual(len(set(hosts)), len(hosts))
+
+    def test_wider_prefix_covers_every_block_local_first(self):
+        """A /22 is swept in full, starting with the phone's own /24."""
+        planner = SubnetPlanner(interfaces=[("wlan0", "10.0.2.50", "255.255.252.0")], arp_entries=[])
+        hosts = planner.plan()
+        self.assertEqual(len(hosts), 1022 - 2)
+        self.assertTrue(hosts[0].startswith("10.0.2."))
+        self.assertIn("10.0.1.0", hosts)
+        self.assertIn("10.0.3.254", hosts)
+        self.assertNotIn("10.0.3.255", hosts)
+
+    def test_huge_prefix_is_clipped(self):
+        """A /16 is cut down to the blocks around the phone's address."""
+        planner = SubnetPlanner(interfaces=[("eth0", "172.16.40.9", "255.255.0.0")], arp_entries=[], max_prefix=22)
+        hosts = planner.plan()
+        self.assertLessEqual(len(hosts), 1022)
+        self.assertTrue(all(h.startswith(("172.16.40.", "172.16.41.", "172.16.42.", "172.16.43.")) for h in hosts))
+
+    def test_offline_without_interfaces_uses_known_ips(self):
+        """With no usable interface only previously seen blasters are probed."""
+        planner = SubnetPlanner(interfaces=[], known_ips=["192.168.1.50"], arp_entries=[])
+        self.assertEqual(planner.plan(), ["192.168.1.50"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import transport_manager
+from services.transport_manager import TransportManager
+from utils.telemetry import Histogram, Telemetry
+
+class _Path:
+    def __init__(self, ok):
+        self.ok = ok
+
+    def send_key(self, key):
+        return self.ok
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_counters_histograms_and_spans(self):
+        """Counters add up, histograms bucket latencies and spans time a block."""
+        t = Telemetry()
+        t.incr("transport.hedge")
+        t.incr("transport.hedge", 2)
+        for ms in (3, 4, 40, 400):
+            t.observe("cmd.ecp.send_key", ms)
+        with t.span("discovery.ssdp"):
+            pass
+        snap = t.snapshot()
+        self.assertEqual(snap['counters']["transport.hedge"], 3)
+        hist = snap['histograms']["cmd.ecp.send_key"]
+        self.assertEqual(hist['count'], 4)
+        self.assertEqual(hist['max_ms'], 400)
+        self.assertEqual(hist['p50_ms'], 5)
+        self.assertIn("discovery.ssdp", snap['histograms'])
+        self.assertGreater(snap['gauges']['threads'], 0)
+        self.assertEqual(t.recent_events()[-1]['name'], "discovery.ssdp")
+
+    def test_disabled_records_nothing(self):
+        """With telemetry off, every call is a no-op."""
+        t = Telemetry(enabled=False)
+        t.incr("a")
+        t.observe("b", 1.0)
+        with t.span("c"):
+            pass
+        snap = t.snapshot()
+        self.assertEqual((snap['counters'], snap['histograms']), ({}, {}))
+        self.assertEqual(t.recent_events(), [])
+
+    def test_ring_buffer_is_bounded_and_exported(self):
+        """Only the newest events are kept, and they appear in the export and report."""
+        t = Telemetry(ring_size=5)
+        for i in range(20):
+            t.event('fallback', f"ecp->ir {i}")
+        self.assertEqual(len(t.recent_events()), 5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = t.export(os.path.join(tmp, "telemetry.json"))
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data['events'][-1]['name'], "ecp->ir 19")
+        self.assertIn("Recent events", t.format_report())
+
+    def test_histogram_percentile_capped_at_max(self):
+        """A percentile never exceeds the largest recorded value."""
+        h = Histogram()
+        h.add(120.0)
+        self.assertEqual(h.percentile(95), 120.0)
+
+    def test_transport_manager_reports_latency_and_fallback(self):
+        """A failed ECP press counts as a failure and a fallback, and IR latency is recorded."""
+        t = Telemetry()
+        with mock.patch.object(transport_manager, 'telemetry', t):
+            manager = TransportManager()
+            manager.set_path('ecp', _Path(False))
+            manager.set_path('ir', _Path(True))
+            self.assertEqual(manager.execute('send_key', 'power'), 'ir')
+            manager.shutdown()
+        snap = t.snapshot()
+        self.assertEqual(snap['counters']["cmd.ecp.fail"], 1)
+        self.assertEqual(snap['counters']["transport.fallback"], 1)
+        self.assertIn("cmd.ir.send_key", snap['histograms'])
+
+if __name__ == '__main__':
+    unittest.main()
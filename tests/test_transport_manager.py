@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.transport_manager import TransportManager
+
+class _FakePath:
+    def __init__(self, delay=0.0, ok=True):
+        self.delay = delay
+        self.ok = ok
+        self.sent = []
+
+    def send_key(self, key_code):
+        time.sleep(self.delay)
+        self.sent.append(key_code)
+        return self.ok
+
+    def launch_app(self, app_id):
+        return self.send_key(f"app:{app_id}")
+
+class TestTransportManager(unittest.TestCase):
+
+    def test_slow_wifi_is_hedged_with_ir(self):
+        """IR fires when ECP hasn't answered within hedge_after_ms."""
+        tm = TransportManager(hedge_after_ms=20)
+        ecp, ir = _FakePath(delay=0.3), _FakePath()
+        tm.set_path('ecp', ecp)
+        tm.set_path('ir', ir)
+        start = time.perf_counter()
+        self.assertEqual(tm.execute('send_key', 'home'), 'ir')
+        self.assertLess(time.perf_counter() - start, 0.25)
+        tm.shutdown()
+
+    def test_navigation_keys_are_not_hedged(self):
+        """A slow select is not doubled by an IR copy."""
+        tm = TransportManager(hedge_after_ms=20)
+        ecp, ir = _FakePath(delay=0.1), _FakePath()
+        tm.set_path('ecp', ecp)
+        tm.set_path('ir', ir)
+        for key in ('select', 'up', 'vol_up'):
+            self.assertEqual(tm.execute('send_key', key), 'ecp')
+        self.assertEqual(ir.sent, [])
+        tm.shutdown()
+
+    def test_unmeasured_path_ranks_behind_measured_one(self):
+        """After the first ECP press, an unmeasured IR path does not take over."""
+        tm = TransportManager()
+        tm.set_path('ecp', _FakePath())
+        tm.set_path('ir', _FakePath())
+        self.assertEqual(tm.ranked_paths(), ['ecp', 'ir'])
+        tm._stats['ecp'].record_success(30)
+        self.assertEqual(tm.ranked_paths(), ['ecp', 'ir'])
+        tm._stats['ir'].record_success(10)
+        self.assertEqual(tm.ranked_paths(), ['ir', 'ecp'])
+        tm.shutdown()
+
+    def test_toggle_keys_are_not_hedged(self):
+        """Power is only sent once, even when the Wi-Fi path is slow."""
+        tm = TransportManager(hedge_after_ms=20)
+        ecp, ir = _FakePath(delay=0.1), _FakePath()
+        tm.set_path('ecp', ecp)
+        tm.set_path('ir', ir)
+        self.assertEqual(tm.execute('send_key', 'power'), 'ecp')
+        self.assertEqual(ir.sent, [])
+        tm.shutdown()
+
+    def test_failover_and_recovery(self):
+        """A failing Wi-Fi path is skipped, then retried after the cooldown."""
+        tm = TransportManager(failure_threshold=1, retry_after=0.05)
+        ecp, ir = _FakePath(ok=False), _FakePath()
+        tm.set_path('ecp', ecp)
+        tm.set_path('ir', ir)
+        self.assertEqual(tm.execute('send_key', 'up'), 'ir')
+        self.assertEqual(tm.ranked_paths()[0], 'ir')
+
+        ecp.ok = True
+        time.sleep(0.06)
+        self.assertEqual(tm.execute('send_key', 'down'), 'ecp')
+        tm.shutdown()
+
+    def test_measured_wifi_path_is_preferred_again_after_recovery(self):
+        """ECP measured, then failed, is tried first again once its cooldown ends."""
+        tm = TransportManager(failure_threshold=1, retry_after=0.05)
+        ecp, ir = _FakePath(delay=0.06), _FakePath(delay=0.02)
+        tm.set_path('ecp', ecp)
+        tm.set_path('ir', ir)
+        # ECP is measured slower than IR will be, then drops out
+        self.assertEqual(tm.execute('send_key', 'up'), 'ecp')
+        ecp.ok = False
+        self.assertEqual(tm.execute('send_key', 'down'), 'ir')
+        self.assertEqual(tm.ranked_paths(), ['ir', 'ecp'])
+
+        ecp.ok, ecp.delay = True, 0.0
+        time.sleep(0.06)
+        for key in ('up', 'down', 'left'):
+            self.assertEqual(tm.execute('send_key', key), 'ecp')
+        self.assertEqual(ir.sent, ['down'])
+        tm.shutdown()
+
+    def test_launch_prefers_wifi_paths(self):
+        """App launches avoid IR even when IR is measured faster."""
+        tm = TransportManager()
+        tm.set_path('ecp', _FakePath())
+        tm.set_path('ir', _FakePath())
+        tm._stats['ecp'].record_success(50)
+        tm._stats['ir'].record_success(5)
+        self.assertEqual(tm.ranked_paths('send_key')[0], 'ir')
+        self.assertEqual(tm.ranked_paths('launch_app')[0], 'ecp')
+        tm.shutdown()
+
+    def test_paths_without_the_method_are_skipped(self):
+        """A keydown never goes to IR, and IR is not marked down for it."""
+        class _Holdable(_FakePath):
+            def send_keydown(self, key_code):
+                return self.send_key("down:" + key_code)
+
+        tm = TransportManager(failure_threshold=1)
+        ecp, ir = _Holdable(), _FakePath()
+        tm.set_path('ecp', ecp)
+        tm.set_path('ir', ir)
+        self.assertEqual(tm.ranked_paths('send_keydown'), ['ecp'])
+        ecp.ok = False
+        self.assertIsNone(tm.execute('send_keydown', 'up'))
+        self.assertEqual(tm._stats['ir'].failures, 0)
+        tm.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ DISCOVERY_TIMEOUT = 3.0
 # Key Mappings (Internal internal_key -> Roku key string)
 KEY_MAP_ROKU = {
     "power": "Power",
+    "power_off": "PowerOff",
     "home": "Home",
     "back": "Back",
     "select": "Select",
@@ -24,6 +25,41 @@ KEY_MAP_ROKU = {
     "enter": "Enter",
 }
 
+# Android KeyEvent codes for the Android TV Remote v2 protocol
+KEY_MAP_ANDROID = {
+    "power": 26,        # KEYCODE_POWER
+    "power_off": 223,   # KEYCODE_SLEEP, a discrete standby
+    "home": 3,
+    "back": 4,
+    "select": 23,       # KEYCODE_DPAD_CENTER
+    "up": 19,
+    "down": 20,
+    "left": 21,
+    "right": 22,
+    "play": 85,         # KEYCODE_MEDIA_PLAY_PAUSE, a toggle like Roku's Play
+    "pause": 85,
+    "rev": 89,
+    "fwd": 90,
+    "vol_up": 24,
+    "vol_down": 25,
+    "mute": 164,        # KEYCODE_VOLUME_MUTE
+    "enter": 66,
+}
+
+# Deep links that open the default launcher apps on Android TV
+ANDROID_APP_LINKS = {
+    "12": "https://www.netflix.com/title",
+    "837": "https://www.youtube.com",
+    "13": "https://app.primevideo.com",
+}
+
+# Launcher tiles shown before a TV's app catalog has been cached
+DEFAULT_LAUNCHER_APPS = [
+    {'app_id': "12", 'text': "Netflix", 'icon': ""},
+    {'app_id': "837", 'text': "YouTube", 'icon': ""},
+    {'app_id': "13", 'text': "Prime", 'icon': ""},
+]
+
 # TCL IR Codes (Placeholders - based on common NEC codes for TCL)
 # Format: PROTOCOL_HEX
 TCL_IR_CODES = {
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from services.network_service import check_reachability
+from utils.logger import logger
+
+class DeviceRegistry:
+    """Persistent cache of every TV and IR blaster seen on the network.
+
+    Entries are keyed by IP and carry MAC, type, model, last-seen time and
+    the discovery method. Entries older than the TTL are ignored for warm
+    start and dropped on the next revalidation.
+    """
+
+    DEFAULT_TTL = 7 * 24 * 3600
+    # Cheap TCP probe port per device type
+    PROBE_PORTS = {
+        'roku': 8060,
+        'ir': 80,
+        'android': 8008,
+    }
+    FIELDS = ('ip', 'mac', 'type', 'name', 'model', 'method')
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._devices = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+            return {e['ip']: e for e in entries if e.get('ip')}
+        except Exception as e:
+            logger.error(f"Device registry load error: {e}")
+            return {}
+
+    def save(self):
+        # Snapshot and write under one lock so concurrent saves neither share
+        # the temp file nor replace a newer file with an older snapshot
+        with self._save_lock:
+            with self._lock:
+                entries = [dict(e) for e in self._devices.values()]
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"Device registry save error: {e}")
+
+    def record(self, device_info, connected=False):
+        """Insert or refresh a device. Unknown fields keep their cached value."""
+        ip = device_info.get('ip')
+        if not ip:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._devices.setdefault(ip, {'ip': ip})
+            for field in self.FIELDS:
+                if device_info.get(field):
+                    entry[field] = device_info[field]
+            entry['last_seen'] = now
+            if connected:
+                entry['last_connected'] = now
+            entry = dict(entry)
+        self.save()
+        return entry
+
+    def get(self, ip):
+        with self._lock:
+            entry = self._devices.get(ip)
+            return dict(entry) if entry else None
+
+    def is_fresh(self, entry, now=None):
+        now = now if now is not None else time.time()
+        return now - entry.get('last_seen', 0) <= self.ttl
+
+    def devices(self, dev_type=None, include_expired=False):
+        """Cached devices, most recently seen first."""
+        now = time.time()
+        with self._lock:
+            entries = [dict(e) for e in self._devices.values()]
+        if dev_type:
+            entries = [e for e in entries if e.get('type') == dev_type]
+        if not include_expired:
+            entries = [e for e in entries if self.is_fresh(e, now)]
+        return sorted(entries, key=lambda e: e.get('last_seen', 0), reverse=True)
+
+    def warm_start_candidate(self):
+        """The last TV the user actually connected to, if still within TTL."""
+        connected = [e for e in self.devices() if e.get('last_connected') and e.get('type') != 'ir']
+        if not connected:
+            return None
+        return max(connected, key=lambda e: e['last_connected'])
+
+    def revalidate(self, probe=check_reachability):
+        """Probe cached devices and refresh last_seen for those that answer.
+
+        Blocking; callers run it on a background thread. Expired entries that
+        don't answer are dropped. Returns the list of reachable entries.
+        """
+        alive = []
+        now = time.time()
+        with self._lock:
+            entries = [dict(e) for e in self._devices.values()]
+
+        for entry in entries:
+            port = self.PROBE_PORTS.get(entry.get('type'))
+            if port and probe(entry['ip'], port):
+                alive.append(entry)
+
+        alive_ips = {e['ip'] for e in alive}
+        with self._lock:
+            for ip in list(self._devices):
+                entry = self._devices[ip]
+                if ip in alive_ips:
+                    entry['last_seen'] = now
+                elif not self.is_fresh(entry, now):
+                    del self._devices[ip]
+        self.save()
+        logger.info(f"Device cache revalidated: {len(alive)}/{len(entries)} reachable")
+        return alive
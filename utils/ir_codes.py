@@ -0,0 +1,222 @@
+"""Compact, array-backed IR code tables indexed by (brand, model, key).
+
+Binary layout (little endian):
+    header   <4sHHIII  magic b"IRCT", version, flags, string count,
+                       record count, raw timing word count
+    strings  u8 length + UTF-8 bytes, one per brand/model/key name
+    records  <HHHBBQ   brand, model, key string ids, protocol, bits, value
+                       sorted by (brand, model, key)
+    raw      u16 timing words in microseconds
+
+For RAW codes `bits` holds the carrier in kHz and `value` packs the
+offset (high 32 bits) and length (low 32 bits) into the raw pool. Pronto
+hex is converted to RAW at compile time. Records are read in place with
+struct.unpack_from, so a large table costs one bytes buffer rather than
+one Python object per code.
+"""
+import os
+import struct
+import threading
+from array import array
+from utils.constants import TCL_IR_CODES
+from utils.logger import logger
+
+MAGIC = b"IRCT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")
+RECORD = struct.Struct("<HHHBBQ")
+
+PROTOCOLS = {'NEC': 1, 'SAMSUNG': 2, 'RC5': 3, 'RC6': 4, 'SONY': 5, 'RAW': 0xF0}
+PROTOCOL_NAMES = {v: k for k, v in PROTOCOLS.items()}
+DEFAULT_BITS = {'NEC': 32, 'SAMSUNG': 32, 'RC5': 13, 'RC6': 20, 'SONY': 12}
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "ir_codes.bin")
+
+
+def pronto_to_raw(pronto):
+    """Convert learned Pronto hex ("0000 006D ...") to (carrier_khz, [usec, ...])."""
+    words = [int(w, 16) for w in pronto.split()]
+    if len(words) < 4 or words[0] != 0 or not words[1]:
+        raise ValueError("Only learned (0000) Pronto codes are supported")
+    carrier_hz = 1000000.0 / (words[1] * 0.241246)
+    count = (words[2] + words[3]) * 2
+    period_us = 1000000.0 / carrier_hz
+    timings = [min(0xFFFF, int(round(w * period_us))) for w in words[4:4 + count]]
+    return int(round(carrier_hz / 1000.0)), timings
+
+
+def parse_code(code):
+    """Parse "NEC_0x40BF12ED", "RC5_0x0C:13", "RAW_38_9000,4500,..." or "PRONTO_0000 ..."."""
+    protocol, _, payload = code.partition('_')
+    protocol = protocol.upper()
+    if protocol == 'PRONTO':
+        khz, timings = pronto_to_raw(payload)
+        return 'RAW', khz, timings
+    if protocol == 'RAW':
+        khz, _, body = payload.partition('_')
+        return 'RAW', int(khz), [int(t) for t in body.split(',') if t]
+    if protocol not in PROTOCOLS:
+        raise ValueError(f"Unknown IR protocol in {code!r}")
+    value, _, bits = payload.partition(':')
+    return protocol, int(bits) if bits else DEFAULT_BITS[protocol], int(value, 16)
+
+
+def compile_code_table(entries):
+    """Build the binary table from (brand, model, key, code) tuples."""
+    strings = {}
+
+    def sid(name):
+        return strings.setdefault(name.lower(), len(strings))
+
+    records = []
+    raw_pool = array('H')
+    for brand, model, key, code in entries:
+        protocol, bits, value = parse_code(code)
+        if protocol == 'RAW':
+            timings = value
+            value = (len(raw_pool) << 32) | len(timings)
+            raw_pool.extend(timings)
+        records.append((sid(brand), sid(model), sid(key), PROTOCOLS[protocol], bits, value))
+
+    # Sort by names so lookups can bisect without an in-memory index
+    names = sorted(strings, key=strings.get)
+    records.sort(key=lambda r: (names[r[0]], names[r[1]], names[r[2]]))
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, 0, len(names), len(records), len(raw_pool)))
+    for name in names:
+        encoded = name.encode('utf-8')
+        out += bytes([len(encoded)]) + encoded
+    for record in records:
+        out += RECORD.pack(*record)
+    if raw_pool.itemsize != 2:
+        raise RuntimeError("array('H') must be 16-bit")
+    if struct.pack('=H', 1) != struct.pack('<H', 1):
+        raw_pool.byteswap()
+    out += raw_pool.tobytes()
+    return bytes(out)
+
+
+class IRCodeTable:
+    """Lazy reader for a compiled table; the file is only read on first lookup."""
+
+    def __init__(self, path=None, data=None):
+        self.path = path
+        self._data = data
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @classmethod
+    def from_entries(cls, entries):
+        return cls(data=compile_code_table(entries))
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self._data is None:
+                with open(self.path, 'rb') as f:
+                    self._data = f.read()
+            magic, version, _, n_strings, n_records, n_raw = HEADER.unpack_from(self._data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not an IR code table")
+            offset = HEADER.size
+            self._names = []
+            for _ in range(n_strings):
+                length = self._data[offset]
+                self._names.append(self._data[offset + 1:offset + 1 + length].decode('utf-8'))
+                offset += 1 + length
+            self._ids = {name: i for i, name in enumerate(self._names)}
+            self._records_at = offset
+            self._count = n_records
+            self._raw_at = offset + n_records * RECORD.size
+            self._loaded = True
+
+    def __len__(self):
+        self._ensure_loaded()
+        return self._count
+
+    def _record(self, index):
+        return RECORD.unpack_from(self._data, self._records_at + index * RECORD.size)
+
+    def _name_key(self, index):
+        brand, model, key = self._record(index)[:3]
+        return self._names[brand], self._names[model], self._names[key]
+
+    def _bisect(self, target):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, brand, model, key):
+        """Wire-format code string for the blaster, or None."""
+        self._ensure_loaded()
+        target = (brand.lower(), model.lower(), key.lower())
+        index = self._bisect(target)
+        if index < self._count and self._name_key(index) == target:
+            return self._to_wire(self._record(index))
+        return None
+
+    def keys(self, brand, model):
+        """Key names available for a brand/model, in sorted order."""
+        self._ensure_loaded()
+        prefix = (brand.lower(), model.lower())
+        index = self._bisect(prefix + ('',))
+        found = []
+        while index < self._count:
+            name_key = self._name_key(index)
+            if name_key[:2] != prefix:
+                break
+            found.append(name_key[2])
+            index += 1
+        return found
+
+    def models(self, brand):
+        self._ensure_loaded()
+        brand = brand.lower()
+        return sorted({self._names[r[1]] for r in (self._record(i) for i in range(self._count))
+                       if self._names[r[0]] == brand})
+
+    def _to_wire(self, record):
+        _, _, _, protocol, bits, value = record
+        name = PROTOCOL_NAMES.get(protocol)
+        if name == 'RAW':
+            start, length = value >> 32, value & 0xFFFFFFFF
+            timings = struct.unpack_from(f"<{length}H", self._data, self._raw_at + start * 2)
+            return f"RAW_{bits}_{','.join(map(str, timings))}"
+        if bits == DEFAULT_BITS.get(name):
+            return f"{name}_0x{value:X}"
+        return f"{name}_0x{value:X}:{bits}"
+
+
+def builtin_entries():
+    """The TCL codes from constants, as compile_code_table entries."""
+    return [("tcl", "default", key, code) for key, code in TCL_IR_CODES.items()]
+
+
+_default_table = None
+
+def default_code_table():
+    """Shared table from data/ir_codes.bin, or the built-in TCL codes if it's missing."""
+    global _default_table
+    if _default_table is None:
+        if os.path.exists(DEFAULT_TABLE_PATH):
+            _default_table = IRCodeTable(DEFAULT_TABLE_PATH)
+        else:
+            logger.warning("IR code table not found, using built-in TCL codes")
+            _default_table = IRCodeTable.from_entries(builtin_entries())
+    return _default_table
+
+
+if __name__ == '__main__':
+    # Regenerate data/ir_codes.bin: python -m utils.ir_codes
+    with open(DEFAULT_TABLE_PATH, 'wb') as f:
+        f.write(compile_code_table(builtin_entries()))
+    print(f"Wrote {len(builtin_entries())} codes to {DEFAULT_TABLE_PATH}")
@@ -0,0 +1,86 @@
+"""Cold start phase timings.
+
+main.py marks each phase as it is reached:
+
+    import              module imports done
+    build               widget tree built
+    first_frame         first frame on screen
+    first_device_ready  first controller connected
+
+Hooks registered with add_hook(callback) get callback(phase, elapsed_ms)
+for every mark, so startup timings can be shipped to logs or telemetry
+without the app knowing where they go. Phases over their budget are
+logged as warnings.
+"""
+import threading
+import time
+from utils.logger import logger
+
+# Cold start budget on a low-end phone, in ms since the process imported main
+BUDGET_MS = {
+    'import': 400,
+    'build': 900,
+    'first_frame': 1500,
+    'first_device_ready': 4000,
+}
+
+
+class StartupTimeline:
+    """Records the first time each startup phase is reached."""
+
+    def __init__(self, budget_ms=None):
+        self.budget_ms = dict(BUDGET_MS if budget_ms is None else budget_ms)
+        self._start = time.perf_counter()
+        self._marks = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, callback):
+        """callback(phase, elapsed_ms); called immediately for phases already reached."""
+        with self._lock:
+            self._hooks.append(callback)
+            reached = list(self._marks.items())
+        for phase, elapsed_ms in reached:
+            self._call(callback, phase, elapsed_ms)
+
+    def mark(self, phase):
+        """Record phase once. Returns the elapsed ms, or None if it was already marked."""
+        elapsed_ms = (time.perf_counter() - self._start) * 1000.0
+        with self._lock:
+            if phase in self._marks:
+                return None
+            self._marks[phase] = elapsed_ms
+            hooks = list(self._hooks)
+
+        budget = self.budget_ms.get(phase)
+        if budget is not None and elapsed_ms > budget:
+            logger.warning(f"Startup: {phase} at {elapsed_ms:.0f} ms (budget {budget} ms)")
+        else:
+            logger.info(f"Startup: {phase} at {elapsed_ms:.0f} ms")
+        for hook in hooks:
+            self._call(hook, phase, elapsed_ms)
+        return elapsed_ms
+
+    @staticmethod
+    def _call(hook, phase, elapsed_ms):
+        try:
+            hook(phase, elapsed_ms)
+        except Exception as e:
+            logger.error(f"Startup hook failed: {e}")
+
+    def elapsed(self, phase):
+        return self._marks.get(phase)
+
+    def phases(self):
+        """{phase: elapsed_ms} in the order they were reached."""
+        with self._lock:
+            return dict(self._marks)
+
+    def over_budget(self):
+        with self._lock:
+            return {p: ms for p, ms in self._marks.items()
+                    if p in self.budget_ms and ms > self.budget_ms[p]}
+
+
+# Shared timeline, started when main.py first imports this module
+timeline = StartupTimeline()
@@ -1,10 +1,13 @@
 import json
 import os
 from kivy.app import App
+from utils.device_registry import DeviceRegistry
 from utils.logger import logger
 
 class Storage:
     """Handles persistence of device settings and last connected device."""
+
+    _registry = None
     
     @staticmethod
     def _get_path():
@@ -29,3 +32,15 @@ class Storage:
             except Exception as e:
                 logger.error(f"Storage Load Error: {e}")
         return None
+
+    @staticmethod
+    def data_path(*parts):
+        """Path under the app data directory, e.g. for caches."""
+        return os.path.join(App.get_running_app().user_data_dir, *parts)
+
+    @classmethod
+    def device_registry(cls):
+        """Shared cache of every device seen, stored next to config.json."""
+        if cls._registry is None:
+            cls._registry = DeviceRegistry(cls.data_path("devices.json"))
+        return cls._registry
@@ -0,0 +1,214 @@
+"""In-process performance telemetry: counters, histograms, gauges and spans.
+
+Hot paths report into the shared `telemetry` instance:
+
+    telemetry.incr("transport.hedge")
+    telemetry.observe("cmd.ecp.send_key", latency_ms)
+    with telemetry.span("discovery.ssdp"):
+        ...
+
+Every call checks `enabled` first, so a disabled instance costs one
+attribute lookup per call and span() hands back a shared no-op context.
+Histograms use fixed millisecond buckets, so memory stays flat however
+many samples arrive. Recent spans and events are also kept in a ring
+buffer that export() writes to a JSON file alongside the aggregates.
+Set SMARTREMOTE_TELEMETRY=0 to disable it.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from utils.logger import logger
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+class Histogram:
+    """Bucketed latency distribution with exact count/sum/min/max."""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.counts[bisect_left(BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th sample (capped at max)."""
+        if not self.count:
+            return None
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                bound = BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else None,
+            'min_ms': round(self.min, 2) if self.min is not None else None,
+            'max_ms': round(self.max, 2) if self.max is not None else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+        }
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('_telemetry', 'name', 'start')
+
+    def __init__(self, telemetry, name):
+        self._telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000.0
+        self._telemetry.observe(self.name, elapsed_ms)
+        self._telemetry.event('span', self.name, elapsed_ms, error=exc_type.__name__ if exc_type else None)
+        return False
+
+
+class Telemetry:
+    """Thread-safe metric registry with a ring buffer of recent events."""
+
+    def __init__(self, enabled=True, ring_size=500):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._events = deque(maxlen=ring_size)
+        self._started = time.time()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def incr(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, value_ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(value_ms)
+
+    def gauge(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def event(self, kind, name, value=None, **fields):
+        """Append a timestamped record to the ring buffer, e.g. a fallback."""
+        if not self.enabled:
+            return
+        record = {'ts': round(time.time(), 3), 'kind': kind, 'name': name}
+        if value is not None:
+            record['value'] = round(value, 3)
+        record.update((k, v) for k, v in fields.items() if v is not None)
+        with self._lock:
+            self._events.append(record)
+
+    def span(self, name):
+        """Context manager timing a block into the `name` histogram."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name)
+
+    def snapshot(self):
+        # Thread count is sampled here rather than polled in the background
+        self.gauge('threads', threading.active_count())
+        with self._lock:
+            return {
+                'started': self._started,
+                'uptime_s': round(time.time() - self._started, 1),
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'histograms': {k: h.as_dict() for k, h in self._histograms.items()},
+            }
+
+    def recent_events(self, limit=None):
+        with self._lock:
+            events = list(self._events)
+        return events[-limit:] if limit else events
+
+    def export(self, path):
+        """Write aggregates plus the event ring buffer as JSON. Returns the path or None."""
+        data = self.snapshot()
+        data['events'] = self.recent_events()
+        try:
+            with open(path + ".tmp", 'w') as f:
+                json.dump(data, f, indent=1)
+            os.replace(path + ".tmp", path)
+            return path
+        except OSError as e:
+            logger.error("Telemetry export failed: %s", e)
+            return None
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+            self._events.clear()
+
+    def format_report(self):
+        """Plain-text summary for the diagnostics screen."""
+        snap = self.snapshot()
+        lines = [f"Uptime {snap['uptime_s']} s, threads {snap['gauges'].get('threads')}", ""]
+        if snap['histograms']:
+            lines.append("Latency (count / p50 / p95 / max ms)")
+            for name in sorted(snap['histograms']):
+                h = snap['histograms'][name]
+                lines.append(f"  {name}: {h['count']} / {h['p50_ms']} / {h['p95_ms']} / {h['max_ms']}")
+            lines.append("")
+        if snap['counters']:
+            lines.append("Counters")
+            lines.extend(f"  {name}: {snap['counters'][name]}" for name in sorted(snap['counters']))
+            lines.append("")
+        events = self.recent_events(10)
+        if events:
+            lines.append("Recent events")
+            for e in reversed(events):
+                value = f" {e['value']:.1f} ms" if 'value' in e else ""
+                lines.append(f"  {time.strftime('%H:%M:%S', time.localtime(e['ts']))} {e['kind']} {e['name']}{value}")
+        return "\n".join(lines)
+
+
+telemetry = Telemetry(enabled=os.environ.get("SMARTREMOTE_TELEMETRY", "1") != "0")
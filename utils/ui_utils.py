@@ -1,5 +1,8 @@
 from kivy.uix.popup import Popup
 from kivy.uix.label import Label
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.textinput import TextInput
 from kivy.metrics import dp
 from kivy.clock import Clock
 
@@ -15,3 +18,39 @@ def show_error(message):
         popup.open()
     
     Clock.schedule_once(_open_popup, 0)
+
+def ask_text(title, message, on_submit, button_text="OK", on_cancel=None):
+    """Popup with a single text field, safe from any thread.
+
+    on_submit(text) runs on the UI thread when the button is pressed. With
+    on_cancel the popup gets a Cancel button that calls it instead.
+    """
+    def _open_popup(dt):
+        content = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(10))
+        content.add_widget(Label(text=message, halign='center', text_size=(dp(350), None)))
+        field = TextInput(multiline=False, size_hint_y=None, height=dp(44))
+        buttons = BoxLayout(spacing=dp(10), size_hint_y=None, height=dp(44))
+        button = Button(text=button_text)
+        content.add_widget(field)
+        content.add_widget(buttons)
+        popup = Popup(title=title, content=content, size_hint=(None, None), size=(dp(400), dp(280)),
+                      auto_dismiss=False)
+
+        def submit(*args):
+            popup.dismiss()
+            on_submit(field.text.strip())
+
+        def cancel(*args):
+            popup.dismiss()
+            on_cancel()
+
+        if on_cancel:
+            cancel_button = Button(text="Cancel")
+            cancel_button.bind(on_release=cancel)
+            buttons.add_widget(cancel_button)
+        buttons.add_widget(button)
+        button.bind(on_release=submit)
+        field.bind(on_text_validate=submit)
+        popup.open()
+
+    Clock.schedule_once(_open_popup, 0)